@@ -0,0 +1,56 @@
+"""
+Actions per second the SQLite game store takes from many tables.
+
+    python -m benchmarks.game_store_throughput [--tables N] [--actions N] [--path FILE]
+
+Random actions of `tables` games are recorded round robin (the games are not
+played, only the store is measured). Reports the rate the callers see, which
+is what the games wait for, and the rate until everything is committed.
+"""
+from __future__ import annotations
+import argparse
+import os
+import random
+import tempfile
+import time
+from terra_futura.actions import ACTIONS
+from terra_futura.game_store import GameStore
+from terra_futura.factories import CardCatalog, GamePool
+
+
+def measure(path: str, tables: int, actions: int) -> tuple[float, float]:
+    """(recorded, committed) actions per second."""
+    rng = random.Random(0)
+    pool = GamePool(CardCatalog.load(), capacity=0)
+    game = pool.acquire(2, rng)
+    moves = [(rng.randint(1, 2), rng.choice(ACTIONS)) for _ in range(1000)]
+    with GameStore(path) as store:
+        gameIds = [f"table{index}" for index in range(tables)]
+        for gameId in gameIds:
+            store.start(gameId, game)
+        store.flush()
+        started = time.perf_counter()
+        for index in range(actions):
+            playerId, action = moves[index % len(moves)]
+            store.record(gameIds[index % tables], playerId, action, index // tables // 4 + 1)
+        recorded = time.perf_counter() - started
+        store.flush()
+        committed = time.perf_counter() - started
+    return actions / recorded, actions / committed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tables", type=int, default=1000)
+    parser.add_argument("--actions", type=int, default=200_000)
+    parser.add_argument("--path", help="database file (a temporary one by default)")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.path or os.path.join(directory, "games.db")
+        recorded, committed = measure(path, args.tables, args.actions)
+    print(f"{args.actions} actions of {args.tables} tables: "
+          f"{recorded:,.0f} recorded/s, {committed:,.0f} committed/s")
+
+
+if __name__ == "__main__":
+    main()
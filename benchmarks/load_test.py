@@ -0,0 +1,160 @@
+"""
+Load test of the game server with simulated clients.
+
+    python -m benchmarks.load_test [--clients N] [--games G] [--players P]
+                                   [--connect HOST:PORT] [--report FILE]
+
+Starts a GameServer in this process on localhost (or connects to a running one)
+and lets `clients` bots play `games` games each. A bot creates a table, joins
+all seats and plays random legal actions (takeCard, activateCard,
+turnFinished, ...) until the game ends. Reports p50/p95/p99 latency of the
+action requests, actions per second and the delay between sending and
+receiving observer notifications, and writes the report as JSON.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Optional
+from terra_futura.server import GameServer
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+@dataclass
+class Measurements:
+    latencies: list[float] = field(default_factory=list)
+    fanOut: list[float] = field(default_factory=list)
+    actions: int = 0
+    rejected: int = 0
+    games: int = 0
+
+
+class BotClient:
+    """One connection, replies are matched to requests by id."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                 measurements: Measurements, rng: random.Random) -> None:
+        self._reader = reader
+        self._writer = writer
+        self._measurements = measurements
+        self._rng = rng
+        self._pending: dict[int, asyncio.Future[dict[str, Any]]] = {}
+        self._nextId = 0
+        self._readTask = asyncio.get_running_loop().create_task(self._read())
+
+    async def _read(self) -> None:
+        while line := await self._reader.readline():
+            message = json.loads(line)
+            if message.get("event") == "state":
+                self._measurements.fanOut.append(time.time() - message["time"])
+                continue
+            future = self._pending.pop(message["id"], None)
+            if future is not None and not future.done():
+                future.set_result(message)
+
+    async def request(self, **request: Any) -> dict[str, Any]:
+        self._nextId += 1
+        request["id"] = self._nextId
+        future: asyncio.Future[dict[str, Any]] = asyncio.get_running_loop().create_future()
+        self._pending[self._nextId] = future
+        self._writer.write(json.dumps(request).encode() + b"\n")
+        await self._writer.drain()
+        return await future
+
+    async def playGame(self, players: int) -> None:
+        table = (await self.request(op="create", players=players, seed=self._rng.getrandbits(32)))["table"]
+        for player in range(1, players + 1):
+            await self.request(op="join", table=table, player=player)
+        while True:
+            legal = await self.request(op="legalActions", table=table)
+            if not legal["actions"]:
+                break
+            started = time.perf_counter()
+            reply = await self.request(**self._rng.choice(legal["actions"]))
+            self._measurements.latencies.append(time.perf_counter() - started)
+            self._measurements.actions += 1
+            if reply.get("result") is False:
+                self._measurements.rejected += 1
+            if reply.get("state") == "Finish":
+                break
+        await self.request(op="close", table=table)
+        self._measurements.games += 1
+
+    async def close(self) -> None:
+        self._writer.close()
+        await self._readTask
+
+
+async def run(clients: int, games: int, players: int, connect: Optional[str] = None,
+              seed: int = 0) -> dict[str, Any]:
+    server: Optional[GameServer] = None
+    if connect is None:
+        server = GameServer()
+        listening = await server.startTcp()
+        host, port = listening.sockets[0].getsockname()[:2]
+    else:
+        host, portText = connect.rsplit(":", 1)
+        port = int(portText)
+
+    measurements = Measurements()
+    rng = random.Random(seed)
+
+    async def bot() -> None:
+        reader, writer = await asyncio.open_connection(host, port)
+        client = BotClient(reader, writer, measurements, random.Random(rng.getrandbits(64)))
+        try:
+            for _ in range(games):
+                await client.playGame(players)
+        finally:
+            await client.close()
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(bot() for _ in range(clients)))
+    finally:
+        if server is not None:
+            await server.close()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "clients": clients, "players": players, "games": measurements.games,
+        "actions": measurements.actions, "rejected": measurements.rejected,
+        "seconds": elapsed, "actionsPerSecond": measurements.actions / elapsed if elapsed else 0.0,
+        "latency": {name: percentile(measurements.latencies, fraction) * 1000
+                    for name, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))},
+        "fanOut": {name: percentile(measurements.fanOut, fraction) * 1000
+                   for name, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))},
+        "notifications": len(measurements.fanOut),
+    }
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(description="Load test of the game server")
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--games", type=int, default=1, help="games per client")
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--connect", help="HOST:PORT of a running server")
+    parser.add_argument("--report", default="load_report.json")
+    arguments = parser.parse_args(argv)
+
+    report = asyncio.run(run(arguments.clients, arguments.games, arguments.players, arguments.connect))
+    with open(arguments.report, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(f"{report['actions']} actions in {report['seconds']:.2f} s "
+          f"({report['actionsPerSecond']:.0f}/s), {report['games']} games")
+    print("latency ms  " + "  ".join(f"{name} {value:.2f}" for name, value in report["latency"].items()))
+    print("fan-out ms  " + "  ".join(f"{name} {value:.2f}" for name, value in report["fanOut"].items()))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
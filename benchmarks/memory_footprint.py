@@ -0,0 +1,116 @@
+"""
+Memory footprint of many concurrent mid-game games.
+
+    python -m benchmarks.memory_footprint [--games N] [--turn T] [--budget BYTES] [--top K]
+
+Builds `games` mid-game Game objects with 2-4 players (copies of a few randomly
+played games, so grids are populated and cards carry resources and pollution),
+traces their allocations with tracemalloc and reports the resident size (of an
+untraced run), the bytes per game and the top allocation sites. Exits with status 1 when the bytes
+per game exceed the budget.
+"""
+from __future__ import annotations
+import argparse
+import gc
+import os
+import random
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from typing import Optional
+from terra_futura.card import Card
+from terra_futura.game import Game
+from .memory_per_game import DISTINCT, playedGames
+
+BUDGET = 20_000     # bytes per game
+
+
+@dataclass(frozen=True)
+class Footprint:
+    games: int
+    traced: int
+    residentBefore: Optional[int]
+    residentAfter: Optional[int]
+    resources: int
+    pollution: int
+    top: tuple[tuple[str, int, int], ...]    # site, bytes, blocks
+
+    @property
+    def bytesPerGame(self) -> float:
+        return self.traced / self.games
+
+
+def residentSize() -> Optional[int]:
+    """Resident set size of the process in bytes (None where /proc is missing)."""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _cards(game: Game) -> list[Card]:
+    cards = []
+    for player in game.players:
+        for position in player.grid.positions:
+            card = player.grid.getCard(position)
+            if isinstance(card, Card):
+                cards.append(card)
+    return cards
+
+
+def measure(games: int = 10_000, turn: int = 5, top: int = 10, seed: int = 0) -> Footprint:
+    rng = random.Random(seed)
+    played = [game for players in (2, 3, 4) for game in playedGames(DISTINCT, players, rng, turn)]
+    # resident size without the tracing overhead of tracemalloc
+    gc.collect()
+    residentBefore = residentSize()
+    kept = [played[index % len(played)].clone() for index in range(games)]
+    residentAfter = residentSize()
+    del kept
+    gc.collect()
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        kept = [played[index % len(played)].clone() for index in range(games)]
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    statistics = after.compare_to(before, "lineno")
+    sites = tuple((str(statistic.traceback), statistic.size_diff, statistic.count_diff)
+                  for statistic in statistics[:top])
+    cards = [card for game in kept for card in _cards(game)]
+    return Footprint(games, sum(statistic.size_diff for statistic in statistics),
+                     residentBefore, residentAfter,
+                     sum(len(card.resources) for card in cards), sum(card.pollution for card in cards), sites)
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1] if __doc__ else None)
+    parser.add_argument("--games", type=int, default=10_000)
+    parser.add_argument("--turn", type=int, default=5)
+    parser.add_argument("--budget", type=int, default=BUDGET, help="bytes per game")
+    parser.add_argument("--top", type=int, default=10)
+    arguments = parser.parse_args(argv)
+
+    footprint = measure(arguments.games, arguments.turn, arguments.top)
+    print(f"games: {footprint.games} at turn {arguments.turn}, "
+          f"{footprint.resources} resources and {footprint.pollution} pollution on grid cards")
+    print(f"traced: {footprint.traced} bytes, {footprint.bytesPerGame:.0f} bytes per game")
+    if footprint.residentBefore is not None and footprint.residentAfter is not None:
+        print(f"resident: {footprint.residentAfter} bytes "
+              f"(+{footprint.residentAfter - footprint.residentBefore} for the games)")
+    print("top allocation sites:")
+    for site, size, blocks in footprint.top:
+        print(f"  {size:>12} B {blocks:>9} blocks  {site}")
+    if footprint.bytesPerGame > arguments.budget:
+        print(f"over budget: {footprint.bytesPerGame:.0f} > {arguments.budget} bytes per game")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
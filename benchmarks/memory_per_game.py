@@ -0,0 +1,59 @@
+"""
+Bytes per fully populated game at turn 9.
+
+    python -m benchmarks.memory_per_game [games] [players]
+
+Plays a few random games from the card catalog until turn 9, then traces the
+memory of `games` copies of them (Game.clone copies all per-game state and
+shares only the immutable card effects, like games dealt from the catalog).
+"""
+from __future__ import annotations
+import gc
+import random
+import sys
+import tracemalloc
+from terra_futura.factories import CardCatalog, GamePool
+from terra_futura.game import Game
+from terra_futura.simple_types import GameState
+
+TURN = 9
+DISTINCT = 20
+
+
+def playToTurn(game: Game, rng: random.Random, turn: int = TURN) -> Game:
+    while game.turnNumber < turn and game.state != GameState.Finish:
+        actions = game.legalActions()
+        if not actions:
+            break
+        rng.choice(actions).apply(game, game.actingPlayerId)
+    return game
+
+
+def playedGames(count: int, players: int, rng: random.Random, turn: int = TURN) -> list[Game]:
+    pool = GamePool(CardCatalog.load(), capacity=0)
+    return [playToTurn(pool.acquire(players, rng), rng, turn) for _ in range(count)]
+
+
+def bytesPerGame(games: int = 10_000, players: int = 4, seed: int = 0) -> float:
+    played = playedGames(DISTINCT, players, random.Random(seed))
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        kept = [played[index % len(played)].clone() for index in range(games)]
+        gc.collect()
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert len(kept) == games
+    return (after - before) / games
+
+
+def main(argv: list[str]) -> None:
+    games = int(argv[0]) if argv else 10_000
+    players = int(argv[1]) if len(argv) > 1 else 4
+    print(f"{bytesPerGame(games, players):.0f} bytes per {players}-player game at turn {TURN}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,63 @@
+"""
+Throughput of thread-safe tables played on several workers.
+
+    python -m benchmarks.table_scaling [--tables N] [--workers 1,2,4] [--mode thread|process]
+
+Every worker plays its share of `tables` thread-safe games with random legal
+actions. Reports actions per second and the speedup over one worker. Threads
+only scale on a free-threaded interpreter, processes scale everywhere.
+"""
+from __future__ import annotations
+import argparse
+import random
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from terra_futura.factories import CardCatalog, GamePool
+from terra_futura.simple_types import GameState
+
+
+def playTables(seeds: list[int]) -> int:
+    """Plays one thread-safe game per seed to the end, returns the number of actions."""
+    pool = GamePool(CardCatalog.load(), capacity=1, threadSafe=True)
+    actions = 0
+    for seed in seeds:
+        rng = random.Random(seed)
+        game = pool.acquire(2, rng)
+        while game.state != GameState.Finish:
+            legal = game.legalActions()
+            if not legal:
+                break
+            rng.choice(legal).apply(game, game.actingPlayerId)
+            actions += 1
+        pool.release(game)
+    return actions
+
+
+def throughput(tables: int, workers: int, mode: str) -> float:
+    shares = [list(range(worker, tables, workers)) for worker in range(workers)]
+    executor: Executor = (ThreadPoolExecutor(workers) if mode == "thread" else ProcessPoolExecutor(workers))
+    with executor:
+        if mode == "process":
+            list(executor.map(playTables, [[] for _ in range(workers)]))     # start the workers
+        started = time.perf_counter()
+        actions = sum(executor.map(playTables, shares))
+        return actions / (time.perf_counter() - started)
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(description="Throughput of thread-safe tables")
+    parser.add_argument("--tables", type=int, default=64)
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--mode", choices=("thread", "process"), default="process")
+    arguments = parser.parse_args(argv)
+
+    baseline = 0.0
+    for workers in (int(count) for count in arguments.workers.split(",")):
+        rate = throughput(arguments.tables, workers, arguments.mode)
+        baseline = baseline or rate
+        print(f"{arguments.mode} x{workers}: {rate:.0f} actions/s, speedup {rate / baseline:.2f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,85 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from enum import Enum, auto
+from typing import Optional, TYPE_CHECKING
+from .simple_types import Deck, CardSource, GridPosition, Resource
+
+if TYPE_CHECKING:
+    from .game import Game
+
+
+class ActionKind(Enum):
+    TakeCard = auto()
+    DiscardLastCard = auto()
+    ActivateCard = auto()
+    ActivateCardAssistance = auto()
+    SelectReward = auto()
+    TurnFinished = auto()
+    SelectActivationPattern = auto()
+    SelectScoring = auto()
+
+
+@dataclass(frozen=True)
+class Action:
+    """
+    One call of TerraFuturaInterface without the player id.
+    - TakeCard: deck, cardIndex (1..4), position
+    - DiscardLastCard: deck
+    - ActivateCard: position, option (effect option, paid by AutoPay)
+    - SelectReward: resource
+    - SelectActivationPattern, SelectScoring: cardIndex (0/1)
+    ActivateCardAssistance only describes the transition, the assisting card
+    cannot be given here, so it is never applied nor listed as legal.
+    """
+    kind: ActionKind
+    deck: Optional[Deck] = None
+    cardIndex: int = 0
+    position: Optional[GridPosition] = None
+    option: int = 0
+    resource: Optional[Resource] = None
+
+    def apply(self, game: Game, playerId: int) -> bool:
+        """Performs the action, returns whether the game accepted it."""
+        if self.kind == ActionKind.TakeCard:
+            assert self.deck is not None and self.position is not None
+            return game.takeCard(playerId, CardSource(self.deck, self.cardIndex), self.cardIndex, self.position)
+        if self.kind == ActionKind.DiscardLastCard:
+            assert self.deck is not None
+            return game.discardLastCardFromDeck(playerId, self.deck)
+        if self.kind == ActionKind.ActivateCard:
+            assert self.position is not None
+            return game.activateCardAutoPay(playerId, self.position, self.option)
+        if self.kind == ActionKind.SelectReward:
+            assert self.resource is not None
+            before = game.state
+            game.selectReward(playerId, self.resource)
+            return before != game.state
+        if self.kind == ActionKind.TurnFinished:
+            return game.turnFinished(playerId)
+        if self.kind == ActionKind.SelectActivationPattern:
+            return game.selectActivationPattern(playerId, self.cardIndex)
+        if self.kind == ActionKind.SelectScoring:
+            return game.selectScoring(playerId, self.cardIndex)
+        return False
+
+
+ALL_POSITIONS: tuple[GridPosition, ...] = tuple(GridPosition(x, y) for x in range(-2, 3) for y in range(-2, 3))
+PILE_INDICES = (1, 2, 3, 4)
+MAX_OPTIONS = 4
+
+# Fixed discrete encoding: action number i is ACTIONS[i]
+ACTIONS: tuple[Action, ...] = (
+    tuple(Action(ActionKind.TakeCard, deck=deck, cardIndex=index, position=position)
+          for deck in Deck for index in PILE_INDICES for position in ALL_POSITIONS)
+    + tuple(Action(ActionKind.DiscardLastCard, deck=deck) for deck in Deck)
+    + tuple(Action(ActionKind.ActivateCard, position=position, option=option)
+            for position in ALL_POSITIONS for option in range(MAX_OPTIONS))
+    + tuple(Action(ActionKind.SelectReward, resource=resource) for resource in Resource)
+    + (Action(ActionKind.TurnFinished),)
+    + tuple(Action(ActionKind.SelectActivationPattern, cardIndex=card) for card in (0, 1))
+    + tuple(Action(ActionKind.SelectScoring, cardIndex=card) for card in (0, 1))
+)
+ACTION_INDEX: dict[Action, int] = {action: index for index, action in enumerate(ACTIONS)}
+ACTION_COUNT = len(ACTIONS)
+
+
@@ -0,0 +1,192 @@
+from __future__ import annotations
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Optional
+from .simple_types import Resource, GridPosition, Points
+from .interfaces import Effect
+from .grid import Grid
+from .player import Player
+from .scoring_method import ScoringMethod
+from .process_action import ProcessAction
+from .auto_pay import AutoPay, cardOptions
+from .canonical import EvaluationCache, GridKey, gridKey
+
+ScoringSpec = tuple[list[Resource], Points]
+ScoringsKey = tuple[tuple[tuple[Resource, ...], int], ...]
+
+# scores per canonical grid (translated grids score the same)
+SCORE_CACHE: EvaluationCache[tuple[GridKey, ScoringsKey], tuple[int, ...]] = EvaluationCache()
+
+
+def scoringsKey(scorings: list[ScoringSpec]) -> ScoringsKey:
+    return tuple((tuple(resources), points.value) for resources, points in scorings)
+
+
+@dataclass(frozen=True)
+class PatternEvaluation:
+    """Score of the grid after the final activations of one pattern, per scoring method."""
+    pattern: int
+    scores: tuple[int, ...]
+    complete: bool
+
+    @property
+    def bestScoring(self) -> int:
+        return max(range(len(self.scores)), key=lambda index: self.scores[index])
+
+    @property
+    def bestScore(self) -> int:
+        return self.scores[self.bestScoring]
+
+
+@dataclass(frozen=True)
+class ActivationAdvice:
+    evaluations: tuple[PatternEvaluation, ...]
+
+    @property
+    def complete(self) -> bool:
+        return all(evaluation.complete for evaluation in self.evaluations)
+
+    @property
+    def best(self) -> PatternEvaluation:
+        return max(self.evaluations, key=lambda evaluation: evaluation.bestScore)
+
+    @property
+    def bestPattern(self) -> int:
+        return self.best.pattern
+
+    @property
+    def bestScoring(self) -> int:
+        return self.best.bestScoring
+
+    @property
+    def bestScore(self) -> int:
+        return self.best.bestScore
+
+
+def score(grid: Grid, scorings: list[ScoringSpec]) -> tuple[int, ...]:
+    """Points the grid would get with each of the scoring methods."""
+    key = (gridKey(grid), scoringsKey(scorings))
+    cached = SCORE_CACHE.get(key)
+    if cached is not None:
+        return cached
+    result: list[int] = []
+    for resources, points in scorings:
+        method = ScoringMethod(resources, points, grid)
+        method.selectThisMethodAndCalculate()
+        assert method.calculatedTotal is not None
+        result.append(method.calculatedTotal.value)
+    SCORE_CACHE.put(key, tuple(result))
+    return tuple(result)
+
+
+def _activate(grid: Grid, position: GridPosition, effect: Effect) -> bool:
+    """Try to use `effect` of the card on `position`, paying from the grid."""
+    card = grid.getCard(position)
+    assert card is not None
+    payment = AutoPay().pay(grid, position, effect)
+    if payment is None:
+        return False
+    return ProcessAction().activateCard(card, grid, payment.inputs, payment.outputs, payment.pollution)
+
+
+def simulatePattern(index: int, grid: Grid, pattern: list[GridPosition],
+                    scorings: list[ScoringSpec], deadline: float,
+                    progress: Optional[Callable[[PatternEvaluation], None]] = None) -> PatternEvaluation:
+    """
+    Greedily performs the activations allowed by the pattern on `grid`.
+    Every activation uses the option that maximises the best score (or is skipped).
+    Stops at `deadline` (time.time()) and reports the score reached so far.
+    The score after every position is also passed to `progress`.
+    """
+    grid.setActivationPattern(pattern)
+    current = score(grid, scorings)
+    for position in pattern:
+        if time.time() >= deadline:
+            return PatternEvaluation(index, current, False)
+        if not grid.canBeActivated(position):
+            continue
+        card = grid.getCard(position)
+        assert card is not None
+        best: Optional[Grid] = None
+        for option in cardOptions(card):
+            candidate = grid.clone()
+            if not _activate(candidate, position, option):
+                continue
+            candidateScore = score(candidate, scorings)
+            if max(candidateScore) > max(current):
+                best, current = candidate, candidateScore
+        if best is not None:
+            grid = best
+        grid.setActivated(position)
+        if progress is not None:
+            progress(PatternEvaluation(index, current, False))
+    return PatternEvaluation(index, current, True)
+
+
+class _Progress:
+    """Latest partial evaluation of every pattern, published by the workers."""
+
+    def __init__(self) -> None:
+        self.latest: dict[int, PatternEvaluation] = {}
+
+    def __call__(self, evaluation: PatternEvaluation) -> None:
+        self.latest[evaluation.pattern] = evaluation
+
+
+class ActivationPatternAdvisor:
+    """
+    Suggests which of the two activation patterns (and scoring method) to pick.
+
+    Both patterns are simulated on a clone of the player's grid on separate workers.
+    If the time budget runs out, patterns that did not finish are reported with
+    the best score reached so far (complete=False), as published by thread
+    workers after every activation (process workers cannot publish theirs,
+    their unfinished patterns keep the current score). Complete simulations are
+    cached by the canonical key of the grid and pattern.
+    """
+
+    def __init__(self, timeBudget: float = 1.0, executor: Optional[Executor] = None,
+                 cache: Optional[EvaluationCache[tuple[GridKey, ScoringsKey], tuple[int, ...]]] = None) -> None:
+        if timeBudget < 0:
+            raise ValueError("Time budget must be >= 0")
+        self._timeBudget = timeBudget
+        self._executor = executor
+        self._cache = cache if cache is not None else EvaluationCache(10_000)
+
+    @property
+    def cache(self) -> EvaluationCache[tuple[GridKey, ScoringsKey], tuple[int, ...]]:
+        return self._cache
+
+    def advise(self, player: Player) -> ActivationAdvice:
+        deadline = time.time() + self._timeBudget
+        scorings: list[ScoringSpec] = [(method.resources, method.pointsPerCombination)
+                                       for method in player.scoring_methods]
+        baseline = score(player.grid.clone(), scorings)
+        keys = [(gridKey(player.grid, [pattern]), scoringsKey(scorings)) for pattern in player.activation_patterns]
+        cached = [self._cache.get(key) for key in keys]
+
+        progress = _Progress()
+        executor = self._executor or ThreadPoolExecutor(max_workers=len(player.activation_patterns))
+        try:
+            futures = {index: executor.submit(simulatePattern, index, player.grid.clone(), pattern.pattern,
+                                              scorings, deadline, progress)
+                       for index, pattern in enumerate(player.activation_patterns) if cached[index] is None}
+            done, _ = wait(futures.values(), timeout=max(0.0, deadline - time.time()))
+        finally:
+            if self._executor is None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        evaluations: list[PatternEvaluation] = []
+        for index, scores in enumerate(cached):
+            future = futures.get(index)
+            if scores is not None:
+                evaluations.append(PatternEvaluation(index, scores, True))
+            elif future is not None and future in done and future.exception() is None:
+                evaluation = future.result()
+                if evaluation.complete:
+                    self._cache.put(keys[index], evaluation.scores)
+                evaluations.append(evaluation)
+            else:
+                evaluations.append(progress.latest.get(index, PatternEvaluation(index, baseline, False)))
+        return ActivationAdvice(tuple(evaluations))
@@ -1,22 +1,35 @@
 from __future__ import annotations
 import json
-from typing import List, Tuple, Any
+from typing import List, Sequence, Tuple, Any
 from terra_futura.interfaces import InterfaceGrid
 from terra_futura.simple_types import GridPosition
 
 class ActivationPattern:
-    _pattern: list[GridPosition]
+    __slots__ = ("_pattern", "_selected", "_grid")
+    _pattern: Tuple[GridPosition, ...]     # never changes, shared by clones
     _selected: bool
     _grid: InterfaceGrid
 
-    def __init__(self, grid: InterfaceGrid, pattern: List[GridPosition]):
+    def __init__(self, grid: InterfaceGrid, pattern: Sequence[GridPosition]):
         self._grid = grid
-        self._pattern = pattern.copy()
+        self._pattern = tuple(pattern)
         self._selected = False
 
+    def clone(self, grid: InterfaceGrid) -> ActivationPattern:
+        pattern = ActivationPattern(grid, self._pattern)
+        pattern._selected = self._selected
+        return pattern
+
+    def reset(self) -> None:
+        self._selected = False
+
+    @property
+    def pattern(self) -> List[GridPosition]:
+        return list(self._pattern)
+
     def select(self) -> None:
         assert self._selected is False
-        self._grid.setActivationPattern(self._pattern)
+        self._grid.setActivationPattern(list(self._pattern))
         self._selected = True
 
     def is_selected(self) -> bool:
@@ -0,0 +1,287 @@
+"""
+Statistics over archives of recorded games.
+
+An archive is any directory tree containing GameJournal game directories
+(start snapshot and action log). Games are found lazily, sent to a process
+pool in chunks with a bounded number in flight and replayed one record at a
+time, so memory does not grow with the archive. Each worker returns partial
+counts that are merged in the parent:
+
+- per card: how often it was offered (visible in a pile when a card was
+  taken), taken, taken by a winner and inactive at the end of the game
+- per scoring method: games and total score of the players who chose it
+- per turn: resources on the grids of all players at the end of the turn
+
+    python -m terra_futura.analytics ARCHIVE OUTPUT [--workers N] [--catalog cards.json]
+
+writes the tables as columnar .npz files (one array per column) to OUTPUT.
+"""
+from __future__ import annotations
+import argparse
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Union
+import numpy as np
+from .simple_types import Deck, GameState, Resource
+from .interfaces import InterfaceCard
+from .card import Card, CardTemplate, effectSignature
+from .scoring_method import ScoringMethod
+from .game import Game
+from .actions import ActionKind, PILE_INDICES
+from .environment import finalScore
+from .factories import DEFAULT_CATALOG, CardCatalog
+from .snapshot import GameCodec
+from .persistence import LOG, START, iterLog, loadSnapshot
+
+_RESOURCES = tuple(Resource)
+_NAMES: dict[CardTemplate, str] = {}
+
+
+def cardName(card: InterfaceCard) -> str:
+    """Effect signature of the card (computed once per catalog card)."""
+    template = card.template if isinstance(card, Card) else None
+    if template is None:
+        return effectSignature(card)
+    name = _NAMES.get(template)
+    if name is None:
+        name = _NAMES[template] = effectSignature(card)
+    return name
+
+
+def scoringName(method: ScoringMethod) -> str:
+    return "+".join(resource.name for resource in method.resources) + f":{method.pointsPerCombination.value}"
+
+
+def _add(mine: Optional[list[int]], theirs: list[int]) -> list[int]:
+    return theirs.copy() if mine is None else [a + b for a, b in zip(mine, theirs)]
+
+
+@dataclass
+class CardCounts:
+    offered: int = 0
+    taken: int = 0
+    finishedTaken: int = 0      # taken in games played to the end
+    won: int = 0
+    deactivated: int = 0
+
+
+@dataclass
+class Statistics:
+    games: int = 0
+    finished: int = 0
+    failed: int = 0
+    actions: int = 0
+    cards: dict[str, CardCounts] = field(default_factory=dict)
+    scorings: dict[str, list[int]] = field(default_factory=dict)       # name -> [games, total score]
+    turns: dict[int, list[int]] = field(default_factory=dict)          # turn -> [samples, totals by resource]
+
+    def card(self, name: str) -> CardCounts:
+        counts = self.cards.get(name)
+        if counts is None:
+            counts = self.cards[name] = CardCounts()
+        return counts
+
+    def merge(self, other: Statistics) -> None:
+        self.games += other.games
+        self.finished += other.finished
+        self.failed += other.failed
+        self.actions += other.actions
+        for name, counts in other.cards.items():
+            mine = self.card(name)
+            mine.offered += counts.offered
+            mine.taken += counts.taken
+            mine.finishedTaken += counts.finishedTaken
+            mine.won += counts.won
+            mine.deactivated += counts.deactivated
+        for method, values in other.scorings.items():
+            self.scorings[method] = _add(self.scorings.get(method), values)
+        for turn, values in other.turns.items():
+            self.turns[turn] = _add(self.turns.get(turn), values)
+
+    def write(self, directory: Union[str, Path]) -> list[Path]:
+        """cards.npz, scorings.npz and resources.npz in `directory`."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        names = sorted(self.cards)
+        cards: dict[str, Any] = {
+            column: np.array([getattr(self.cards[name], column) for name in names], dtype=np.int64)
+            for column in ("offered", "taken", "finishedTaken", "won", "deactivated")}
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cards.update(card=np.array(names, dtype=str),
+                         takeRate=cards["taken"] / cards["offered"],
+                         winRate=cards["won"] / cards["finishedTaken"],
+                         deactivationRate=cards["deactivated"] / cards["finishedTaken"])
+        methods = sorted(self.scorings)
+        games = np.array([self.scorings[method][0] for method in methods], dtype=np.int64)
+        totals = np.array([self.scorings[method][1] for method in methods], dtype=np.int64)
+        scorings: dict[str, Any] = {"method": np.array(methods, dtype=str), "games": games,
+                                    "averageScore": totals / np.maximum(games, 1)}
+        turns = sorted(self.turns)
+        rows = np.array([self.turns[turn] for turn in turns], dtype=np.int64).reshape(len(turns), 1 + len(_RESOURCES))
+        resources: dict[str, Any] = {"turn": np.array(turns, dtype=np.int64), "samples": rows[:, 0]}
+        for index, resource in enumerate(_RESOURCES):
+            resources[resource.name] = rows[:, 1 + index] / np.maximum(rows[:, 0], 1)
+        paths = []
+        for name, columns in (("cards.npz", cards), ("scorings.npz", scorings), ("resources.npz", resources)):
+            np.savez(directory / name, **columns)
+            paths.append(directory / name)
+        return paths
+
+
+def _sampleResources(statistics: Statistics, game: Game, turn: int) -> None:
+    row = statistics.turns.get(turn)
+    if row is None:
+        row = statistics.turns[turn] = [0] * (1 + len(_RESOURCES))
+    for player in game.players:
+        grid = player.grid
+        row[0] += 1
+        for position in grid.positions:
+            card = grid.getCard(position)
+            assert card is not None
+            for resource in card.resources:
+                row[1 + _RESOURCES.index(resource)] += 1
+
+
+def analyseGame(directory: Path, codec: Optional[GameCodec] = None,
+                statistics: Optional[Statistics] = None) -> Statistics:
+    """
+    Replays one recorded game and adds its counts to `statistics`. The counts
+    are collected apart and only added once the whole game replayed, so a
+    game failing with ValueError leaves `statistics` unchanged.
+    """
+    total = statistics
+    statistics = Statistics()
+    game, count = loadSnapshot(directory / START, codec)
+    if count != 0:
+        raise ValueError(f"{directory / START} is not the start of the game")
+    taken: list[tuple[int, str, InterfaceCard]] = []
+    chosen: dict[int, str] = {}
+    turn = game.turnNumber
+    actions = 0
+    for playerId, action in iterLog(directory / LOG):
+        card: Optional[InterfaceCard] = None
+        if action.kind == ActionKind.TakeCard:
+            assert action.deck is not None
+            for deck in Deck:
+                pile = game.pile(deck)
+                for index in PILE_INDICES:
+                    visible = pile.getCard(index)
+                    if visible is not None:
+                        statistics.card(cardName(visible)).offered += 1
+            card = game.pile(action.deck).getCard(action.cardIndex)
+        elif action.kind == ActionKind.SelectScoring:
+            player = next((player for player in game.players if player.id == playerId), None)
+            if player is None or not 0 <= action.cardIndex < len(player.scoring_methods):
+                raise ValueError(f"Logged action {action} of player {playerId} does not fit the game")
+            chosen[playerId] = scoringName(player.scoring_methods[action.cardIndex])
+        if not action.apply(game, playerId):
+            raise ValueError(f"Logged action {action} of player {playerId} was rejected on replay")
+        actions += 1
+        if card is not None:
+            taken.append((playerId, cardName(card), card))
+            statistics.card(cardName(card)).taken += 1
+        if game.turnNumber != turn:
+            _sampleResources(statistics, game, turn)
+            turn = game.turnNumber
+
+    statistics.games += 1
+    statistics.actions += actions
+    if game.state == GameState.Finish:
+        statistics.finished += 1
+        _sampleResources(statistics, game, turn)
+        scores = {player.id: finalScore(game, player.id) for player in game.players}
+        best = max(scores.values())
+        for playerId, name, card in taken:
+            counts = statistics.card(name)
+            counts.finishedTaken += 1
+            counts.won += scores[playerId] == best
+            counts.deactivated += not card.isActive()
+        for playerId, name in chosen.items():
+            row = statistics.scorings.setdefault(name, [0, 0])
+            row[0] += 1
+            row[1] += scores[playerId]
+    if total is None:
+        return statistics
+    total.merge(statistics)
+    return total
+
+
+def gameDirectories(archive: Union[str, Path]) -> Iterator[Path]:
+    """Recorded games under `archive` in path order, found while walking it."""
+    for root, directories, files in os.walk(archive):
+        if START in files and LOG in files:
+            directories.clear()
+            yield Path(root)
+        directories.sort()
+
+
+_CODECS: dict[str, GameCodec] = {}
+
+
+def _analyseChunk(directories: list[str], catalog: str) -> Statistics:
+    """Worker processes keep one codec per catalog."""
+    if catalog not in _CODECS:
+        _CODECS[catalog] = GameCodec(CardCatalog.load(catalog))
+    statistics = Statistics()
+    for directory in directories:
+        try:
+            analyseGame(Path(directory), _CODECS[catalog], statistics)
+        except (OSError, ValueError):
+            statistics.failed += 1
+    return statistics
+
+
+def _chunks(directories: Iterable[Path], size: int) -> Iterator[list[str]]:
+    iterator = iter(directories)
+    while chunk := [str(directory) for directory in islice(iterator, size)]:
+        yield chunk
+
+
+def analyseArchive(archive: Union[str, Path], workers: Optional[int] = None,
+                   catalog: Union[str, Path] = DEFAULT_CATALOG, chunkSize: int = 64) -> Statistics:
+    """
+    Statistics of all games under `archive`. Games go to `workers` processes
+    (all cores by default, 1 analyses in this process) in chunks of
+    `chunkSize`, at most two chunks per worker are queued. Games that cannot
+    be read or replayed are counted as failed.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunks(gameDirectories(archive), chunkSize)
+    total = Statistics()
+    if workers == 1:
+        for chunk in chunks:
+            total.merge(_analyseChunk(chunk, str(catalog)))
+        return total
+    with ProcessPoolExecutor(workers) as executor:
+        pending: set[Future[Statistics]] = set()
+        for chunk in chunks:
+            pending.add(executor.submit(_analyseChunk, chunk, str(catalog)))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    total.merge(future.result())
+        for future in pending:
+            total.merge(future.result())
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Statistics over archives of recorded games.")
+    parser.add_argument("archive")
+    parser.add_argument("output")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--catalog", default=str(DEFAULT_CATALOG))
+    parser.add_argument("--chunk", type=int, default=64)
+    args = parser.parse_args()
+    statistics = analyseArchive(args.archive, args.workers, args.catalog, args.chunk)
+    for path in statistics.write(args.output):
+        print(path)
+    print(f"{statistics.games} games ({statistics.finished} finished, {statistics.failed} failed), "
+          f"{statistics.actions} actions")
+
+
+if __name__ == "__main__":
+    main()
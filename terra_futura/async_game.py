@@ -0,0 +1,166 @@
+from __future__ import annotations
+import asyncio
+import inspect
+import logging
+from typing import Any, Awaitable, Callable, Optional, Protocol, TypeVar, Union
+from .simple_types import CardSource, Deck, GridPosition, Resource
+from .interfaces import TerraFuturaObserverInterface
+from .game import Game
+from .actions import Action
+
+T = TypeVar("T")
+_LOGGER = logging.getLogger(__name__)
+
+
+class AsyncObserver(Protocol):
+    async def notify(self, game_state: str) -> None:
+        ...
+
+
+Observer = Union[TerraFuturaObserverInterface, AsyncObserver]
+
+
+class AsyncGameObserver:
+    """
+    GameObserverInterface that does not deliver inline: notifyAll only queues the
+    states, a delivery task passes them to the observers in order and awaits
+    coroutine observers. Build the Game with it to keep slow observers off the
+    game's critical path. An observer that raises is logged and skipped for
+    that state, the others and later states are still delivered.
+    """
+
+    def __init__(self, observers: Optional[dict[int, Observer]] = None) -> None:
+        self._observers: dict[int, Observer] = dict(observers or {})
+        self._queue: asyncio.Queue[Optional[dict[int, str]]] = asyncio.Queue()
+        self._task: Optional[asyncio.Task[None]] = None
+
+    @property
+    def observers(self) -> dict[int, Observer]:
+        return self._observers.copy()
+
+    def subscribe(self, playerId: int, observer: Observer) -> None:
+        self._observers[playerId] = observer
+
+    def unsubscribe(self, playerId: int, observer: Observer) -> None:
+        if self._observers.get(playerId) is observer:
+            del self._observers[playerId]
+
+    def notifyAll(self, newState: dict[int, str]) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._deliver())
+        self._queue.put_nowait(newState)
+
+    async def _deliver(self) -> None:
+        while True:
+            newState = await self._queue.get()
+            try:
+                if newState is None:
+                    return
+                for playerId, state in newState.items():
+                    observer = self._observers.get(playerId)
+                    if observer is None:
+                        continue
+                    try:
+                        delivered = observer.notify(state)
+                        if inspect.isawaitable(delivered):
+                            await delivered
+                    except Exception:
+                        _LOGGER.exception("Observer of player %d failed", playerId)
+            finally:
+                self._queue.task_done()
+
+    async def drain(self) -> None:
+        """Waits until all queued states were delivered."""
+        if self._task is not None:
+            await self._queue.join()
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._queue.put_nowait(None)
+            await self._task
+            self._task = None
+
+
+class AsyncGame:
+    """
+    Coroutine facade of a Game for asyncio hosts.
+
+    Calls are queued and run one after another by a task owning the game, so
+    the calls of one game keep their order while different games interleave
+    freely, and the game needs no locks. With an AsyncGameObserver (that the
+    game notifies) the calls return without waiting for the observers.
+    """
+
+    def __init__(self, game: Game, observer: Optional[AsyncGameObserver] = None) -> None:
+        self._game = game
+        self._observer = observer
+        self._inbox: asyncio.Queue[Optional[tuple[Callable[[Game], Any], asyncio.Future[Any]]]] = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    @property
+    def game(self) -> Game:
+        """The wrapped game, only touch it through call() while the facade runs."""
+        return self._game
+
+    @property
+    def observer(self) -> Optional[AsyncGameObserver]:
+        return self._observer
+
+    async def _run(self) -> None:
+        while True:
+            item = await self._inbox.get()
+            if item is None:
+                return
+            command, future = item
+            if future.cancelled():
+                continue
+            try:
+                future.set_result(command(self._game))
+            except Exception as error:
+                future.set_exception(error)
+
+    def call(self, command: Callable[[Game], T]) -> Awaitable[T]:
+        """Queues `command(game)`, the result is awaited."""
+        future: asyncio.Future[T] = asyncio.get_running_loop().create_future()
+        self._inbox.put_nowait((command, future))
+        return future
+
+    async def close(self) -> None:
+        """Runs the queued calls, delivers the queued states and stops."""
+        self._inbox.put_nowait(None)
+        await self._task
+        if self._observer is not None:
+            await self._observer.close()
+
+    async def takeCard(self, playerId: int, source: CardSource, cardIndex: int, destination: GridPosition) -> bool:
+        return await self.call(lambda game: game.takeCard(playerId, source, cardIndex, destination))
+
+    async def discardLastCardFromDeck(self, playerId: int, deck: Deck) -> bool:
+        return await self.call(lambda game: game.discardLastCardFromDeck(playerId, deck))
+
+    async def activateCard(self, playerId: int, card: GridPosition,
+                           inputs: list[tuple[Resource, GridPosition]],
+                           outputs: list[tuple[Resource, GridPosition]],
+                           pollution: list[GridPosition], otherPlayerId: Optional[int],
+                           otherCard: Optional[GridPosition]) -> None:
+        await self.call(lambda game: game.activateCard(playerId, card, inputs, outputs, pollution,
+                                                       otherPlayerId, otherCard))
+
+    async def activateCardAutoPay(self, playerId: int, card: GridPosition, option: int) -> bool:
+        return await self.call(lambda game: game.activateCardAutoPay(playerId, card, option))
+
+    async def selectReward(self, playerId: int, resource: Resource) -> None:
+        await self.call(lambda game: game.selectReward(playerId, resource))
+
+    async def turnFinished(self, playerId: int) -> bool:
+        return await self.call(lambda game: game.turnFinished(playerId))
+
+    async def selectActivationPattern(self, playerId: int, card: int) -> bool:
+        return await self.call(lambda game: game.selectActivationPattern(playerId, card))
+
+    async def selectScoring(self, playerId: int, card: int) -> bool:
+        return await self.call(lambda game: game.selectScoring(playerId, card))
+
+    async def legalActions(self) -> tuple[int, tuple[Action, ...]]:
+        """Acting player and the actions they can play."""
+        return await self.call(lambda game: (game.actingPlayerId, game.legalActions()))
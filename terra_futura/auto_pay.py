@@ -0,0 +1,147 @@
+from __future__ import annotations
+from collections import Counter
+from dataclasses import dataclass
+from typing import Optional
+from .simple_types import Resource, GridPosition
+from .interfaces import Effect, InterfaceCard, InterfaceGrid
+from .scoring_method import BASE_SCORES
+from .effect_or import EffectOr
+from .transformation_fixed import TransformationFixed
+from .arbitrary_basic import ArbitraryBasic
+
+Source = tuple[Resource, GridPosition]
+
+
+@dataclass(frozen=True)
+class Payment:
+    """Arguments for ProcessAction.activateCard."""
+    inputs: list[tuple[Resource, GridPosition]]
+    outputs: list[tuple[Resource, GridPosition]]
+    pollution: list[GridPosition]
+
+
+def effectOptions(effect: Optional[Effect]) -> list[Effect]:
+    """Leaf effects a player may choose from when activating a card."""
+    if effect is None:
+        return []
+    if isinstance(effect, EffectOr):
+        return [option for child in effect.effects for option in effectOptions(child)]
+    return [effect]
+
+
+def cardOptions(card: InterfaceCard) -> list[Effect]:
+    """Options of the upper effect followed by options of the lower effect."""
+    return effectOptions(card.upperEffect) + effectOptions(card.lowerEffect)
+
+
+def freeSlots(card: InterfaceCard) -> int:
+    """Number of pollution cubes the card can take right now."""
+    for slots in range(card.pollutionSpacesL, 0, -1):
+        if card.canPlacePollution(slots):
+            return slots
+    return 0
+
+
+class AutoPay:
+    """
+    Chooses where to pay the inputs of an effect from and where to put its pollution.
+
+    The payment is a min-cost transportation problem: resource units lying on
+    the grid supply the units required by the effect. Fixed effects require
+    given types, so the problem splits into one problem per type, arbitrary
+    effects accept any unit. In both cases taking the cheapest units is an
+    optimal flow. A unit costs its scoring value (only matters for arbitrary
+    effects) plus a penalty if its card can still be activated this turn,
+    so cards that are done for the turn are emptied first.
+
+    Pollution goes to free slots first; a cube that would deactivate a card
+    costs as much as the card is worth (its resources, the -1 for an inactive
+    card and the activation it still has). Cards that pay or receive resources
+    in this activation are never deactivated.
+    """
+    ACTIVATION_PENALTY = 10
+
+    def pay(self, grid: InterfaceGrid, card: GridPosition, effect: Effect) -> Optional[Payment]:
+        """Cheapest payment of `effect` of the card on `card`, None if it cannot be paid."""
+        positions = [GridPosition(row, col) for row in range(-2, 3) for col in range(-2, 3)
+                     if grid.getCard(GridPosition(row, col)) is not None]
+        if isinstance(effect, TransformationFixed):
+            inputs = self._fixedInputs(grid, positions, card, effect.from_)
+        elif isinstance(effect, ArbitraryBasic):
+            inputs = self._arbitraryInputs(grid, positions, card, effect.from_)
+        else:
+            return None
+        if inputs is None:
+            return None
+
+        protected = {position for _, position in inputs} | {card}
+        pollution = self._pollution(grid, positions, protected, effect.pollution)
+        if pollution is None:
+            return None
+        return Payment(inputs, [(resource, card) for resource in effect.to], pollution)
+
+    def _sourceCost(self, grid: InterfaceGrid, card: GridPosition, position: GridPosition) -> int:
+        if position != card and grid.canBeActivated(position):
+            return self.ACTIVATION_PENALTY
+        return 0
+
+    def _units(self, grid: InterfaceGrid, positions: list[GridPosition]) -> list[Source]:
+        units: list[Source] = []
+        for position in positions:
+            source = grid.getCard(position)
+            if source is not None and source.isActive():
+                units.extend((resource, position) for resource in source.resources)
+        return units
+
+    def _fixedInputs(self, grid: InterfaceGrid, positions: list[GridPosition],
+                     card: GridPosition, wanted: list[Resource]) -> Optional[list[Source]]:
+        units = self._units(grid, positions)
+        inputs: list[Source] = []
+        for resource, count in Counter(wanted).items():
+            candidates = sorted((unit for unit in units if unit[0] == resource),
+                                key=lambda unit: self._sourceCost(grid, card, unit[1]))
+            if len(candidates) < count:
+                return None
+            inputs.extend(candidates[:count])
+        return inputs
+
+    def _arbitraryInputs(self, grid: InterfaceGrid, positions: list[GridPosition],
+                         card: GridPosition, count: int) -> Optional[list[Source]]:
+        units = sorted(self._units(grid, positions),
+                       key=lambda unit: BASE_SCORES[unit[0]] + self._sourceCost(grid, card, unit[1]))
+        if len(units) < count:
+            return None
+        return units[:count]
+
+    def _cardValue(self, grid: InterfaceGrid, position: GridPosition, card: InterfaceCard) -> int:
+        value = 1 + sum(BASE_SCORES[resource] for resource in card.resources)
+        if grid.canBeActivated(position):
+            value += self.ACTIVATION_PENALTY
+        return value
+
+    def _pollution(self, grid: InterfaceGrid, positions: list[GridPosition],
+                   protected: set[GridPosition], amount: int) -> Optional[list[GridPosition]]:
+        # cubes on one card only get more expensive, so placing them one by one
+        # on the currently cheapest card is optimal
+        slots: dict[GridPosition, int] = {}
+        values: dict[GridPosition, int] = {}
+        for position in positions:
+            target = grid.getCard(position)
+            if target is None:
+                continue
+            slots[position] = freeSlots(target)
+            values[position] = self._cardValue(grid, position, target)
+
+        placed: Counter[GridPosition] = Counter()
+        for _ in range(amount):
+            costs: dict[GridPosition, int] = {}
+            for position, free in slots.items():
+                left = free - placed[position]
+                if left > 1:
+                    costs[position] = -left
+                elif left == 1 and position not in protected:
+                    costs[position] = values[position]
+            if not costs:
+                return None
+            placed[min(costs, key=lambda position: costs[position])] += 1
+        return list(placed.elements())
@@ -0,0 +1,108 @@
+"""
+Grids that differ only by translation are strategically identical: the 3x3
+limit is always stricter than the -2..2 window (the first card is in the
+center), scoring does not look at positions. Keys below shift the occupied
+footprint (and activation patterns with it) so that its corner is (0,0).
+"""
+from __future__ import annotations
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Generic, Hashable, Optional, Sequence, TypeVar
+from .simple_types import Resource
+from .interfaces import InterfaceCard
+from .card import Card, effectSignature
+from .grid import Grid
+from .activation_pattern import ActivationPattern
+from .player import Player
+
+CardKey = tuple[str, tuple[int, ...], int]
+CellKey = tuple[int, int, CardKey, int]
+PatternKey = tuple[tuple[tuple[int, int], ...], bool]
+GridKey = tuple[tuple[CellKey, ...], tuple[PatternKey, ...]]
+
+_RESOURCES = tuple(Resource)
+
+
+def canonicalOffset(grid: Grid) -> tuple[int, int]:
+    positions = grid.positions
+    if not positions:
+        return 0, 0
+    return min(position.x for position in positions), min(position.y for position in positions)
+
+
+def cardKey(card: InterfaceCard) -> CardKey:
+    """Effects, resource counts and pollution of the card."""
+    counts = tuple(card.resources.count(resource) for resource in _RESOURCES)
+    pollution = card.pollution if isinstance(card, Card) else 0
+    return effectSignature(card), counts, pollution
+
+
+def gridKey(grid: Grid, patterns: Sequence[ActivationPattern] = ()) -> GridKey:
+    dx, dy = canonicalOffset(grid)
+    cells: list[CellKey] = []
+    for position in grid.positions:
+        card = grid.getCard(position)
+        assert card is not None
+        cells.append((position.x - dx, position.y - dy, cardKey(card), grid.remainingActivations(position)))
+    cells.sort(key=lambda cell: (cell[0], cell[1]))
+    return tuple(cells), tuple(
+        (tuple(sorted((position.x - dx, position.y - dy) for position in pattern.pattern)), pattern.is_selected())
+        for pattern in patterns)
+
+
+PlayerKey = tuple[int, GridKey, tuple[Optional[int], ...], bool]
+
+
+def playerKey(player: Player) -> PlayerKey:
+    scores = tuple(method.calculatedTotal.value if method.calculatedTotal is not None else None
+                   for method in player.scoring_methods)
+    return player.id, gridKey(player.grid, player.activation_patterns), scores, player.hasBeenAssisted
+
+
+def keyHash(key: Hashable) -> int:
+    """Non-zero 64-bit hash of a key, stable across processes (unlike hash())."""
+    digest = hashlib.blake2b(repr(key).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little") or 1
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class EvaluationCache(Generic[K, V]):
+    """Bounded LRU cache counting hits and misses, safe to share between threads."""
+
+    def __init__(self, capacity: int = 100_000) -> None:
+        if capacity < 1:
+            raise ValueError("Capacity must be positive")
+        self._capacity = capacity
+        self._entries: OrderedDict[K, V] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hitRate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key: K) -> Optional[V]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: K, value: V) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self._capacity:
+                self._entries.popitem(last=False)
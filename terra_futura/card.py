@@ -1,9 +1,43 @@
 from __future__ import annotations
 
-from typing import List, Optional
+from dataclasses import dataclass
+from typing import List, Optional, Union
 from collections import Counter
 from .interfaces import Effect, Resource, InterfaceCard
 
+def effectSignature(card: Union[InterfaceCard, CardTemplate]) -> str:
+    """Identifies cards with the same effects and pollution spaces."""
+    upper = card.upperEffect.state() if card.upperEffect else "No effect"
+    lower = card.lowerEffect.state() if card.lowerEffect else "No effect"
+    return f"{upper}|{lower}|{card.pollutionSpacesL}"
+
+
+@dataclass(frozen=True, eq=False)
+class CardTemplate:
+    """
+    The printed, immutable part of a card, shared by all copies of it
+    (see factories.CardCatalog). Resources and pollution live on Card.
+    Templates are interned, so they compare by identity.
+    """
+    pollutionSpacesL: int
+    upperEffect: Optional[Effect]
+    lowerEffect: Optional[Effect]
+    hasAssistance: bool
+    signatureId: int
+
+
+_BLANK = CardTemplate(0, None, None, False, 0)
+
+
+def _handMade(pollutionSpacesL: int, upperEffect: Optional[Effect], lowerEffect: Optional[Effect]) -> CardTemplate:
+    """Template of a card built by hand, signature id 0 marks it as not dealt from a catalog."""
+    if pollutionSpacesL == 0 and upperEffect is None and lowerEffect is None:
+        return _BLANK
+    upper = upperEffect.hasAssistance() if upperEffect else False
+    lower = lowerEffect.hasAssistance() if lowerEffect else False
+    return CardTemplate(pollutionSpacesL, upperEffect, lowerEffect, upper or lower, 0)
+
+
 class Card(InterfaceCard):
     """
     Terra Futura Card implementation.
@@ -20,6 +54,9 @@ class Card(InterfaceCard):
         0..1 upperEffect: Effect
         0..1 lowerEffect: Effect
     """
+    # weak references for the observation encoder cache; the printed part
+    # (pollution spaces, effects) is read from the shared template
+    __slots__ = ("_pollution", "_version", "_printed", "__weakref__")
 
     def __init__(
         self,
@@ -30,15 +67,57 @@ class Card(InterfaceCard):
         # resources stored on this card (produced by its effects)
         self.resources: List[Resource] = []
 
-        # how many pollution spaces the card has (top-right icon)
-        self.pollutionSpacesL: int = pollutionSpacesL
-
         # current pollution state
         self._pollution: int = 0   # pollution cubes on safe spaces
 
-        # optional effects
-        self.upperEffect: Optional[Effect] = upperEffect
-        self.lowerEffect: Optional[Effect] = lowerEffect
+        # increased on every change of resources or pollution
+        self._version: int = 0
+
+        # pollution spaces (top-right icon) and optional effects, a template of
+        # its own for cards built by hand
+        self._printed: CardTemplate = _handMade(pollutionSpacesL, upperEffect, lowerEffect)
+
+    def reset(self) -> None:
+        """Back to the initial state (no resources, no pollution) for reuse in another game."""
+        self.resources.clear()
+        self._pollution = 0
+        self._version += 1
+
+    @classmethod
+    def fromTemplate(cls, template: CardTemplate) -> Card:
+        """New card in its initial state, the printed part is the template itself."""
+        card = cls()
+        card._printed = template
+        return card
+
+    @property
+    def template(self) -> Optional[CardTemplate]:
+        """Printed part shared with other copies, None for cards built by hand."""
+        return self._printed if self._printed.signatureId else None
+
+    @property
+    def pollutionSpacesL(self) -> int:
+        return self._printed.pollutionSpacesL
+
+    @pollutionSpacesL.setter
+    def pollutionSpacesL(self, value: int) -> None:
+        self._printed = _handMade(value, self.upperEffect, self.lowerEffect)
+
+    @property
+    def upperEffect(self) -> Optional[Effect]:
+        return self._printed.upperEffect
+
+    @upperEffect.setter
+    def upperEffect(self, value: Optional[Effect]) -> None:
+        self._printed = _handMade(self.pollutionSpacesL, value, self.lowerEffect)
+
+    @property
+    def lowerEffect(self) -> Optional[Effect]:
+        return self._printed.lowerEffect
+
+    @lowerEffect.setter
+    def lowerEffect(self, value: Optional[Effect]) -> None:
+        self._printed = _handMade(self.pollutionSpacesL, self.upperEffect, value)
 
     # ------------------------------------------------------------------
     # Pollution logic (Terra Futura rules)
@@ -48,6 +127,10 @@ class Card(InterfaceCard):
     def pollution(self) -> int:
         return self._pollution
 
+    @property
+    def version(self) -> int:
+        return self._version
+
     @property
     def is_active(self) -> bool:
         """
@@ -92,6 +175,7 @@ class Card(InterfaceCard):
         use_slots = min(free_slots, amount)
 
         self._pollution += use_slots
+        self._version += 1
         # self.is_active will now reflect center pollution automatically
 
     # ------------------------------------------------------------------
@@ -113,6 +197,7 @@ class Card(InterfaceCard):
         if not self.canPutResources(resources):
             raise ValueError("Cannot add resources to an inactive card.")
         self.resources.extend(resources)
+        self._version += 1
 
     def canGetResources(self, resources: List[Resource]) -> bool:
         """
@@ -147,6 +232,7 @@ class Card(InterfaceCard):
                 new_contents.append(r)
 
         self.resources = new_contents
+        self._version += 1
 
     # ------------------------------------------------------------------
     # Effect integration
@@ -181,9 +267,7 @@ class Card(InterfaceCard):
         """
         True if any of this card's effects involve Assistance.
         """
-        upper = self.upperEffect.hasAssistance() if self.upperEffect else False
-        lower = self.lowerEffect.hasAssistance() if self.lowerEffect else False
-        return upper or lower
+        return self._printed.hasAssistance
 
     def state(self) -> str:
         """
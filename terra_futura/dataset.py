@@ -0,0 +1,196 @@
+"""
+Training data exported from archives of recorded games.
+
+Every logged action of every game becomes one row: the grids of all seats
+(GridEncoder features and card ids, seats beyond the player count are zero)
+and the position before the action, the action and the final score of the
+player who played it. Columns are .npy files written through
+np.lib.format.open_memmap, games.npy holds the rows of every game:
+
+    grids.npy       float32 (rows, 4, CHANNELS, 5, 5)
+    signatures.npy  int16   (rows, 4, 5, 5)    CardTemplate.signatureId, index into cards.json
+    states.npy      int8    (rows,)            index into GameState
+    turns.npy       int16   (rows,)
+    seats.npy       int8    (rows,)            seat of the acting player
+    actions.npy     int16   (rows,)            index into actions.ACTIONS
+    scores.npy      int16   (rows,)            final score of the acting player, 0 if unfinished
+    games.npy       (start, stop, players, finished) per game
+
+TrainingData maps the files read-only, so jobs slice minibatches straight
+from the page cache.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional, Union
+import numpy as np
+import numpy.typing as npt
+from .simple_types import GameConfig, GameState
+from .actions import ACTION_INDEX
+from .observation import CHANNELS, SIDE, GridEncoder
+from .environment import finalScore
+from .factories import DEFAULT_CATALOG, CardCatalog
+from .snapshot import GameCodec
+from .persistence import LOG, START, iterLog, loadSnapshot, logLength
+from .analytics import gameDirectories
+
+SEATS = GameConfig().maxPlayers
+GAME_DTYPE = np.dtype([("start", np.int64), ("stop", np.int64), ("players", np.int8), ("finished", np.bool_)])
+COLUMNS: dict[str, tuple[Any, tuple[int, ...]]] = {
+    "grids": (np.float32, (SEATS, CHANNELS, SIDE, SIDE)),
+    "signatures": (np.int16, (SEATS, SIDE, SIDE)),
+    "states": (np.int8, ()),
+    "turns": (np.int16, ()),
+    "seats": (np.int8, ()),
+    "actions": (np.int16, ()),
+    "scores": (np.int16, ()),
+}
+_STATES = tuple(GameState)
+
+
+@dataclass(frozen=True)
+class ExportSummary:
+    games: int
+    rows: int
+    failed: int
+
+
+def _truncate(path: Path, rows: int) -> None:
+    """Rewrites an .npy file with only its first `rows` rows."""
+    source = np.load(path, mmap_mode="r")
+    temporary = path.with_suffix(".tmp.npy")
+    target = np.lib.format.open_memmap(temporary, mode="w+", dtype=source.dtype, shape=(rows,) + source.shape[1:])
+    for start in range(0, rows, 65536):
+        target[start:start + 65536] = source[start:min(rows, start + 65536)]
+    target.flush()
+    del source, target
+    os.replace(temporary, path)
+
+
+def exportArchive(archive: Union[str, Path], output: Union[str, Path],
+                  catalog: Union[str, Path] = DEFAULT_CATALOG) -> ExportSummary:
+    """
+    Writes the rows of all games under `archive` to `output`. Row counts come
+    from the log sizes, so the columns are allocated once. Games that cannot
+    be replayed are left out (and the columns shrunk at the end).
+    """
+    output = Path(output)
+    output.mkdir(parents=True, exist_ok=True)
+    cards = CardCatalog.load(catalog)
+    codec = GameCodec(cards)
+    directories = list(gameDirectories(archive))
+    total = sum(logLength(directory / LOG) for directory in directories)
+    columns = {name: np.lib.format.open_memmap(output / f"{name}.npy", mode="w+", dtype=dtype,
+                                               shape=(total,) + shape)
+               for name, (dtype, shape) in COLUMNS.items()}
+    games = np.lib.format.open_memmap(output / "games.npy", mode="w+", dtype=GAME_DTYPE, shape=(len(directories),))
+    # plain ndarray views of the mappings, indexing np.memmap objects is slow
+    views = {name: np.asarray(column) for name, column in columns.items()}
+    encoder = GridEncoder()
+    row = written = failed = 0
+    for directory in directories:
+        try:
+            stop = _exportGame(directory, codec, encoder, views, games, written, row, total)
+        except (OSError, ValueError):
+            failed += 1
+            continue
+        row = stop
+        written += 1
+
+    for array in list(columns.values()) + [games]:
+        array.flush()
+    del columns, views, games
+    if row < total:
+        for name in COLUMNS:
+            _truncate(output / f"{name}.npy", row)
+    if written < len(directories):
+        _truncate(output / "games.npy", written)
+    with open(output / "cards.json", "w", encoding="utf-8") as file:
+        json.dump([None] + cards.signatures(), file, indent=0)
+    return ExportSummary(written, row, failed)
+
+
+def _exportGame(directory: Path, codec: GameCodec, encoder: GridEncoder, columns: dict[str, npt.NDArray[Any]],
+                games: npt.NDArray[Any], index: int, start: int, total: int) -> int:
+    game, count = loadSnapshot(directory / START, codec)
+    if count != 0:
+        raise ValueError(f"{directory / START} is not the start of the game")
+    if len(game.players) > SEATS:
+        raise ValueError(f"Only games of at most {SEATS} players can be exported")
+    seatOf = {player.id: seat for seat, player in enumerate(game.players)}
+    grids, signatures = columns["grids"], columns["signatures"]
+    row = start
+    for playerId, action in iterLog(directory / LOG):
+        if row >= total:
+            raise ValueError("More log records than counted")
+        for seat, player in enumerate(game.players):
+            encoder.encode(player.grid, grids[row, seat], signatures[row, seat])
+        grids[row, len(game.players):] = 0.0
+        signatures[row, len(game.players):] = 0
+        columns["states"][row] = _STATES.index(game.state)
+        columns["turns"][row] = game.turnNumber
+        acting = seatOf.get(playerId)
+        if acting is None:
+            raise ValueError(f"Logged action {action} of unknown player {playerId}")
+        columns["seats"][row] = acting
+        columns["actions"][row] = ACTION_INDEX[action]
+        if not action.apply(game, playerId):
+            raise ValueError(f"Logged action {action} of player {playerId} was rejected on replay")
+        row += 1
+    finished = game.state == GameState.Finish
+    scores = np.array([finalScore(game, player.id) if finished else 0 for player in game.players], dtype=np.int16)
+    columns["scores"][start:row] = scores[columns["seats"][start:row]]
+    games[index] = (start, row, len(game.players), finished)
+    return row
+
+
+class TrainingData:
+    """Read-only mappings of an exported directory."""
+
+    def __init__(self, directory: Union[str, Path]) -> None:
+        directory = Path(directory)
+        self.columns: dict[str, npt.NDArray[Any]] = {
+            name: np.load(directory / f"{name}.npy", mmap_mode="r") for name in COLUMNS}
+        self.games: npt.NDArray[Any] = np.load(directory / "games.npy", mmap_mode="r")
+        with open(directory / "cards.json", encoding="utf-8") as file:
+            self.cards: list[Optional[str]] = json.load(file)      # signature of every card id
+
+    def __len__(self) -> int:
+        return len(self.columns["actions"])
+
+    def rows(self, indices: Union[slice, npt.NDArray[np.integer[Any]]]) -> dict[str, npt.NDArray[Any]]:
+        """Columns of the given rows (copied out of the mappings)."""
+        return {name: np.asarray(column[indices]) for name, column in self.columns.items()}
+
+    def game(self, index: int) -> dict[str, npt.NDArray[Any]]:
+        start, stop = int(self.games[index]["start"]), int(self.games[index]["stop"])
+        return self.rows(slice(start, stop))
+
+    def sample(self, rng: np.random.Generator, size: int,
+               finishedOnly: bool = False) -> dict[str, npt.NDArray[Any]]:
+        """Random minibatch (rows sorted, which keeps the reads sequential)."""
+        if finishedOnly:
+            games = self.games[self.games["finished"]]
+            lengths = games["stop"] - games["start"]
+            picked = rng.choice(len(games), size=size, p=lengths / lengths.sum())
+            indices = games["start"][picked] + (rng.random(size) * lengths[picked]).astype(np.int64)
+        else:
+            indices = rng.integers(0, len(self), size=size)
+        return self.rows(np.sort(indices))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Exports recorded games as memory-mapped training data.")
+    parser.add_argument("archive")
+    parser.add_argument("output")
+    parser.add_argument("--catalog", default=str(DEFAULT_CATALOG))
+    args = parser.parse_args()
+    summary = exportArchive(args.archive, args.output, args.catalog)
+    print(f"{summary.games} games, {summary.rows} rows, {summary.failed} failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+from __future__ import annotations
+import random
+from typing import Any, Callable, Optional
+import numpy as np
+import numpy.typing as npt
+from .simple_types import GameState
+from .game import Game
+from .actions import ACTIONS, ACTION_INDEX, ACTION_COUNT
+from .observation import GridEncoder, CHANNELS, SIDE
+
+Observation = npt.NDArray[np.float32]
+Mask = npt.NDArray[np.bool_]
+GameFactory = Callable[[random.Random], Game]
+
+_STATES = tuple(GameState)
+# grid features (see GridEncoder), card signature ids, state one-hot, turn number, player count
+_FEATURES = CHANNELS * SIDE * SIDE
+_SIGNATURES = _FEATURES + SIDE * SIDE
+OBSERVATION_SIZE = _SIGNATURES + SIDE * SIDE + len(_STATES) + 2
+
+
+def finalScore(game: Game, playerId: int) -> int:
+    for player in game.players:
+        if player.id == playerId:
+            for method in player.scoring_methods:
+                if method.calculatedTotal is not None:
+                    return method.calculatedTotal.value
+    return 0
+
+
+class TerraFuturaEnv:
+    """
+    Gym-style environment, all seats are played by the agent (self-play).
+
+    Actions are numbers into actions.ACTIONS, observations describe the game
+    from the point of view of the acting player. The reward is the final score
+    of the player who made the last action of the game, 0 otherwise.
+    """
+
+    def __init__(self, gameFactory: GameFactory, maxSteps: int = 1000,
+                 encoder: Optional[GridEncoder] = None) -> None:
+        self._gameFactory = gameFactory
+        self._encoder = encoder or GridEncoder()
+        self._maxSteps = maxSteps
+        self._steps = 0
+        self._game: Optional[Game] = None
+
+    @property
+    def game(self) -> Game:
+        if self._game is None:
+            raise RuntimeError("Call reset() first")
+        return self._game
+
+    @property
+    def actionCount(self) -> int:
+        return ACTION_COUNT
+
+    @property
+    def observationSize(self) -> int:
+        return OBSERVATION_SIZE
+
+    def reset(self, seed: Optional[int] = None, out: Optional[Observation] = None) -> tuple[Observation, dict[str, Any]]:
+        self._game = self._gameFactory(random.Random(seed))
+        self._steps = 0
+        return self.observe(out), {"player": self._game.actingPlayerId}
+
+    def step(self, action: int, out: Optional[Observation] = None
+             ) -> tuple[Observation, float, bool, bool, dict[str, Any]]:
+        game = self.game
+        playerId = game.actingPlayerId
+        if not ACTIONS[action].apply(game, playerId):
+            raise ValueError(f"Illegal action {ACTIONS[action]}")
+        self._steps += 1
+
+        terminated = game.state == GameState.Finish
+        truncated = not terminated and self._steps >= self._maxSteps
+        info: dict[str, Any] = {"player": game.actingPlayerId}
+        reward = 0.0
+        if terminated:
+            info["scores"] = {player.id: finalScore(game, player.id) for player in game.players}
+            reward = float(info["scores"][playerId])
+        return self.observe(out), reward, terminated, truncated, info
+
+    def actionMask(self, out: Optional[Mask] = None) -> Mask:
+        if out is None:
+            out = np.zeros(ACTION_COUNT, dtype=np.bool_)
+        else:
+            out.fill(False)
+        for action in self.game.legalActions():
+            out[ACTION_INDEX[action]] = True
+        return out
+
+    def observe(self, out: Optional[Observation] = None) -> Observation:
+        """Writes the observation into `out` (allocated if not given)."""
+        if out is None:
+            out = np.zeros(OBSERVATION_SIZE, dtype=np.float32)
+        game = self.game
+        player = next(player for player in game.players if player.id == game.actingPlayerId)
+        self._encoder.encode(player.grid, out[:_FEATURES].reshape(CHANNELS, SIDE, SIDE),
+                             out[_FEATURES:_SIGNATURES].reshape(SIDE, SIDE))
+
+        base = _SIGNATURES + SIDE * SIDE
+        out[base:].fill(0.0)
+        out[base + _STATES.index(game.state)] = 1.0
+        out[base + len(_STATES)] = game.turnNumber
+        out[base + len(_STATES) + 1] = len(game.players)
+        return out
+
+
+class VectorTerraFuturaEnv:
+    """
+    Steps `count` independent games per call.
+
+    Observations, masks, rewards and flags live in preallocated arrays that
+    are overwritten in place by every step (and returned, not copied).
+    Finished games are reset automatically, their row then holds the first
+    observation of the next game while `terminated`/`truncated` and `rewards`
+    describe the finished one.
+    """
+
+    def __init__(self, gameFactory: GameFactory, count: int, maxSteps: int = 1000) -> None:
+        if count < 1:
+            raise ValueError("At least one environment")
+        encoder = GridEncoder()
+        self.envs = [TerraFuturaEnv(gameFactory, maxSteps, encoder) for _ in range(count)]
+        self.observations: Observation = np.zeros((count, OBSERVATION_SIZE), dtype=np.float32)
+        self.masks: Mask = np.zeros((count, ACTION_COUNT), dtype=np.bool_)
+        self.rewards: Observation = np.zeros(count, dtype=np.float32)
+        self.terminated: Mask = np.zeros(count, dtype=np.bool_)
+        self.truncated: Mask = np.zeros(count, dtype=np.bool_)
+        self._seeds = random.Random()
+
+    def reset(self, seed: Optional[int] = None) -> Observation:
+        self._seeds = random.Random(seed)
+        for index, env in enumerate(self.envs):
+            self._reset(index, env)
+        self.rewards.fill(0.0)
+        self.terminated.fill(False)
+        self.truncated.fill(False)
+        return self.observations
+
+    def _reset(self, index: int, env: TerraFuturaEnv) -> None:
+        env.reset(self._seeds.getrandbits(64), self.observations[index])
+        env.actionMask(self.masks[index])
+
+    def step(self, actions: npt.NDArray[np.integer[Any]]) -> tuple[Observation, Observation, Mask, Mask]:
+        for index, env in enumerate(self.envs):
+            _, reward, terminated, truncated, _ = env.step(int(actions[index]), self.observations[index])
+            self.rewards[index] = reward
+            self.terminated[index] = terminated
+            self.truncated[index] = truncated
+            if terminated or truncated:
+                self._reset(index, env)
+            else:
+                env.actionMask(self.masks[index])
+        return self.observations, self.rewards, self.terminated, self.truncated
@@ -0,0 +1,140 @@
+"""
+Evaluations (visit count and total value) of positions kept in a file between
+runs, see EvaluationStore.
+"""
+from __future__ import annotations
+import fcntl
+import mmap
+import os
+import struct
+from types import TracebackType
+from typing import Optional, Type
+
+_MAGIC = b"TFEVAL01"
+_HEADER = struct.Struct("<8sQQ")      # magic, capacity, count
+_RECORD = struct.Struct("<QQd")       # key (0 = empty), visits, total value
+_VALUE = struct.Struct("<Qd")
+
+
+class EvaluationStore:
+    """
+    Fixed-size open-addressing (linear probing) hash table in a memory-mapped file.
+
+    Keys are non-zero 64-bit hashes (see canonical.keyHash), records hold the
+    visit count and the total value of a position. Any number of processes may
+    open the file read-only, one process at a time may open it for writing
+    (guarded by an exclusive flock). A record is published by writing its key
+    last, so readers never see a key without its value; an update of an existing
+    record may be seen half-done, which only makes the estimate slightly stale.
+    When the table is `MAX_LOAD` full, new keys are dropped. An existing file
+    keeps its capacity.
+    """
+    MAX_LOAD = 0.75
+
+    def __init__(self, path: str, capacity: int = 1 << 20, writable: bool = False) -> None:
+        if capacity < 1 or capacity & (capacity - 1):
+            raise ValueError("Capacity must be a power of two")
+        self._path = path
+        self._writable = writable
+        self.hits = 0
+        self.misses = 0
+        if writable:
+            self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError as error:
+                os.close(self._fd)
+                raise RuntimeError(f"{path} is already open for writing") from error
+            if os.fstat(self._fd).st_size == 0:
+                os.ftruncate(self._fd, _HEADER.size + capacity * _RECORD.size)
+                os.pwrite(self._fd, _HEADER.pack(_MAGIC, capacity, 0), 0)
+        else:
+            self._fd = os.open(path, os.O_RDONLY)
+        self._map = mmap.mmap(self._fd, 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        magic, capacity, _ = _HEADER.unpack_from(self._map, 0)
+        self._capacity = int(capacity)
+        if magic != _MAGIC or len(self._map) != _HEADER.size + self._capacity * _RECORD.size:
+            self.close()
+            raise ValueError(f"{path} is not an evaluation store")
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def writable(self) -> bool:
+        return self._writable
+
+    def __len__(self) -> int:
+        _, _, count = _HEADER.unpack_from(self._map, 0)
+        return int(count)
+
+    @property
+    def hitRate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def _find(self, key: int) -> tuple[int, bool]:
+        """Offset of the record with `key` (True) or of the empty slot ending the probe (False)."""
+        if key <= 0 or key >= 1 << 64:
+            raise ValueError("Key must be a non-zero 64-bit number")
+        mask = self._capacity - 1
+        slot = key & mask
+        for _ in range(self._capacity):
+            offset = _HEADER.size + slot * _RECORD.size
+            stored: int = _RECORD.unpack_from(self._map, offset)[0]
+            if stored == key:
+                return offset, True
+            if stored == 0:
+                return offset, False
+            slot = (slot + 1) & mask
+        return -1, False
+
+    def get(self, key: int) -> Optional[tuple[int, float]]:
+        """(visits, total value) stored for `key`."""
+        offset, found = self._find(key)
+        if not found:
+            self.misses += 1
+            return None
+        self.hits += 1
+        _, visits, value = _RECORD.unpack_from(self._map, offset)
+        return visits, value
+
+    def add(self, key: int, visits: int, value: float) -> bool:
+        """Adds to the record of `key`, False if the key was dropped (table full)."""
+        if not self._writable:
+            raise RuntimeError("Store is open read-only")
+        offset, found = self._find(key)
+        if found:
+            _, oldVisits, oldValue = _RECORD.unpack_from(self._map, offset)
+            _VALUE.pack_into(self._map, offset + 8, oldVisits + visits, oldValue + value)
+            return True
+        count = len(self)
+        if offset < 0 or count + 1 > self.MAX_LOAD * self._capacity:
+            return False
+        _VALUE.pack_into(self._map, offset + 8, visits, value)
+        struct.pack_into("<Q", self._map, offset, key)
+        struct.pack_into("<Q", self._map, 16, count + 1)
+        return True
+
+    def flush(self) -> None:
+        if self._writable:
+            self._map.flush()
+
+    def close(self) -> None:
+        if self._map.closed:
+            return
+        self.flush()
+        self._map.close()
+        os.close(self._fd)
+
+    def __enter__(self) -> EvaluationStore:
+        return self
+
+    def __exit__(self, excType: Optional[Type[BaseException]], exc: Optional[BaseException],
+                 traceback: Optional[TracebackType]) -> None:
+        self.close()
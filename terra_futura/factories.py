@@ -0,0 +1,245 @@
+from __future__ import annotations
+import json
+import random
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Any, Callable, Mapping, Optional, Union
+from .simple_types import Deck, GameConfig, GridPosition, Points, Resource
+from .interfaces import Effect, GameObserverInterface, InterfaceCard, InterfacePile
+from .card import Card, CardTemplate, effectSignature
+from .transformation_fixed import TransformationFixed
+from .arbitrary_basic import ArbitraryBasic
+from .effect_or import EffectOr
+from .pile import Pile
+from .grid import Grid
+from .activation_pattern import ActivationPattern
+from .scoring_method import ScoringMethod
+from .player import Player
+from .game import Game
+from .game_observer import GameObserver
+from .move_card import MoveCard
+from .process_action import ProcessAction
+from .process_action_assistance import ProcessActionAssistance
+from .select_reward import SelectReward
+
+DEFAULT_CATALOG = Path(__file__).parent / "data" / "cards.json"
+
+
+class CardCatalog:
+    """
+    Level I and Level II decks loaded from a JSON file.
+
+    The file maps deck names (Deck members) to lists of cards:
+
+        {"count": 2, "pollutionSpaces": 1, "upper": <effect>, "lower": <effect or null>}
+
+    where an effect is one of
+
+        {"type": "fixed", "from": ["RED"], "to": ["GOODS"], "pollution": 0}
+        {"type": "arbitrary", "from": 2, "to": ["FOOD"], "pollution": 1}
+        {"type": "or", "effects": [<effect>, ...]}
+
+    Equal effects are built once and shared, every distinct card becomes one
+    CardTemplate. Dealing a deck only allocates the Card objects (resources,
+    pollution), the printed part is shared with the templates.
+    """
+
+    def __init__(self, decks: dict[Deck, list[tuple[CardTemplate, int]]]) -> None:
+        self._decks = decks
+
+    @classmethod
+    def load(cls, path: Union[str, Path] = DEFAULT_CATALOG) -> CardCatalog:
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+        return cls.fromData(data)
+
+    @classmethod
+    def fromData(cls, data: dict[str, Any]) -> CardCatalog:
+        effects: dict[str, Effect] = {}
+        templates: dict[str, CardTemplate] = {}
+        decks: dict[Deck, list[tuple[CardTemplate, int]]] = {}
+        for deckName, cards in data.items():
+            try:
+                deck = Deck[deckName]
+            except KeyError as error:
+                raise ValueError(f"Unknown deck {deckName}") from error
+            entries = decks.setdefault(deck, [])
+            for spec in cards:
+                upper = _effect(spec.get("upper"), effects)
+                lower = _effect(spec.get("lower"), effects)
+                card = Card(int(spec["pollutionSpaces"]), upper, lower)
+                signature = effectSignature(card)
+                if signature not in templates:
+                    templates[signature] = CardTemplate(card.pollutionSpacesL, upper, lower,
+                                                        card.hasAssistance(), len(templates) + 1)
+                count = int(spec.get("count", 1))
+                if count < 1:
+                    raise ValueError("Card count must be positive")
+                entries.append((templates[signature], count))
+        return cls(decks)
+
+    @property
+    def decks(self) -> tuple[Deck, ...]:
+        return tuple(self._decks)
+
+    def templates(self, deck: Deck) -> tuple[CardTemplate, ...]:
+        """Distinct cards of the deck."""
+        return tuple(dict.fromkeys(template for template, _ in self._decks.get(deck, [])))
+
+    def signatures(self) -> list[str]:
+        """effectSignature of every template in the order of their ids (the first has id 1)."""
+        templates = {template for entries in self._decks.values() for template, _ in entries}
+        return [effectSignature(template) for template in sorted(templates, key=lambda template: template.signatureId)]
+
+    def size(self, deck: Deck) -> int:
+        return sum(count for _, count in self._decks.get(deck, []))
+
+    def cardsNeeded(self, playerCount: int, rounds: int = GameConfig().rounds) -> int:
+        """Cards a game can use up: every turn a player may discard one card and takes one."""
+        return 2 * playerCount * rounds
+
+    def supports(self, playerCount: int, rounds: int = GameConfig().rounds) -> bool:
+        """Whether the decks cannot run out before the last turn of a game."""
+        return sum(self.size(deck) for deck in self._decks) >= self.cardsNeeded(playerCount, rounds)
+
+    def deal(self, deck: Deck) -> list[Card]:
+        """Fresh cards of the whole deck, in catalog order."""
+        return [Card.fromTemplate(template) for template, count in self._decks.get(deck, [])
+                for _ in range(count)]
+
+    def pile(self, deck: Deck, rng: Optional[random.Random] = None) -> Pile:
+        """Shuffled pile of the deck with four cards turned face up."""
+        cards: list[InterfaceCard] = list(self.deal(deck))
+        if rng is not None:
+            rng.shuffle(cards)
+        return Pile(cards[:Pile.VISIBLE], cards[Pile.VISIBLE:])
+
+
+def _resources(names: list[str]) -> list[Resource]:
+    return [Resource[name] for name in names]
+
+
+def _effect(spec: Optional[dict[str, Any]], effects: dict[str, Effect]) -> Optional[Effect]:
+    """Builds the effect or returns the equal one built before."""
+    if spec is None:
+        return None
+    key = json.dumps(spec, sort_keys=True)
+    if key in effects:
+        return effects[key]
+    kind = spec.get("type")
+    effect: Effect
+    if kind == "fixed":
+        effect = TransformationFixed(_resources(spec["from"]), _resources(spec["to"]), int(spec.get("pollution", 0)))
+    elif kind == "arbitrary":
+        effect = ArbitraryBasic(int(spec["from"]), _resources(spec["to"]), int(spec.get("pollution", 0)))
+    elif kind == "or":
+        effect = EffectOr([option for option in (_effect(child, effects) for child in spec["effects"])
+                           if option is not None])
+    else:
+        raise ValueError(f"Unknown effect type {kind}")
+    effects[key] = effect
+    return effect
+
+
+def defaultPlayer(playerId: int) -> Player:
+    """Player with the middle row and column as activation patterns and two scoring methods."""
+    grid = Grid()
+    patterns = [ActivationPattern(grid, [GridPosition(-1, 0), GridPosition(0, 0), GridPosition(1, 0)]),
+                ActivationPattern(grid, [GridPosition(0, -1), GridPosition(0, 0), GridPosition(0, 1)])]
+    scorings = [ScoringMethod([Resource.GOODS, Resource.FOOD], Points(5), grid),
+                ScoringMethod([Resource.RED, Resource.GREEN, Resource.YELLOW], Points(3), grid)]
+    return Player(playerId, patterns, scorings, grid)
+
+
+def _shuffle(cards: list[InterfaceCard], rng: random.Random) -> None:
+    """Shuffle that does not depend on the previous order of the cards."""
+    cards.sort(key=lambda card: card.template.signatureId
+               if isinstance(card, Card) and card.template is not None else 0)
+    rng.shuffle(cards)
+
+
+@dataclass
+class _Table:
+    game: Game
+    piles: dict[Deck, Pile]
+    cards: dict[Deck, list[InterfaceCard]]
+
+
+class GamePool:
+    """
+    Recycles finished games for simulations.
+
+    acquire() returns a released game of the same player count after resetting
+    its players, grids, patterns, scorings and cards and reshuffling the decks,
+    or builds a new one from the catalog (which must hold enough cards for the
+    player count, see CardCatalog.supports()). New and recycled games are dealt the
+    same for the same `rng`, one stream shuffling the decks in turn or a
+    stream per deck (see seeding.GameSeeds). At most `capacity` released games are
+    kept, further released games are left to the garbage collector. With
+    `threadSafe` the games are built in thread-safe mode.
+    """
+
+    def __init__(self, catalog: CardCatalog, capacity: int = 64,
+                 playerFactory: Callable[[int], Player] = defaultPlayer, threadSafe: bool = False) -> None:
+        if capacity < 0:
+            raise ValueError("Capacity must be >= 0")
+        self._catalog = catalog
+        self._capacity = capacity
+        self._playerFactory = playerFactory
+        self._threadSafe = threadSafe
+        self._free: dict[int, list[_Table]] = {}
+        self._tables: dict[int, _Table] = {}      # id(game) -> table of games handed out
+        self.created = 0
+        self.reused = 0
+
+    def __len__(self) -> int:
+        """Number of released games waiting for reuse."""
+        return sum(len(tables) for tables in self._free.values())
+
+    def acquire(self, playerCount: int, rng: Union[random.Random, Mapping[Deck, random.Random], None] = None,
+                gameObserver: Optional[GameObserverInterface] = None) -> Game:
+        if not self._catalog.supports(playerCount):
+            raise ValueError(f"The decks hold too few cards for {playerCount} players, "
+                             f"a game can use up {self._catalog.cardsNeeded(playerCount)}")
+        if isinstance(rng, Mapping):
+            missing = [deck.name for deck in self._catalog.decks if deck not in rng]
+            if missing:
+                raise ValueError(f"No random stream for decks {missing}")
+            shufflers = dict(rng)
+        else:
+            shufflers = dict.fromkeys(self._catalog.decks, rng or random.Random())
+        free = self._free.get(playerCount)
+        if free:
+            table = free.pop()
+            table.game.reset(gameObserver or GameObserver({}))
+            for deck, deckCards in table.cards.items():
+                for card in deckCards:
+                    if isinstance(card, Card):
+                        card.reset()
+                _shuffle(deckCards, shufflers[deck])
+                table.piles[deck].reset(deckCards)
+            self.reused += 1
+        else:
+            cards: dict[Deck, list[InterfaceCard]] = {deck: list(self._catalog.deal(deck))
+                                                      for deck in self._catalog.decks}
+            piles: dict[Deck, Pile] = {}
+            for deck, deckCards in cards.items():
+                _shuffle(deckCards, shufflers[deck])
+                piles[deck] = Pile(deckCards[:Pile.VISIBLE], deckCards[Pile.VISIBLE:])
+            gamePiles: dict[Deck, InterfacePile] = dict(piles)
+            game = Game([self._playerFactory(playerId) for playerId in range(1, playerCount + 1)],
+                        gamePiles, MoveCard(), ProcessAction(),
+                        ProcessActionAssistance(), SelectReward(), gameObserver or GameObserver({}),
+                        threadSafe=self._threadSafe)
+            table = _Table(game, piles, cards)
+            self.created += 1
+        self._tables[id(table.game)] = table
+        return table.game
+
+    def release(self, game: Game) -> None:
+        """Returns a game from acquire(), it must not be used afterwards."""
+        table = self._tables.pop(id(game), None)
+        if table is None:
+            raise ValueError("Game does not come from this pool")
+        if len(self) < self._capacity:
+            self._free.setdefault(len(game.players), []).append(table)
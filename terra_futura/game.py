@@ -1,14 +1,64 @@
-from typing import Optional
+from __future__ import annotations
+import copy
+import functools
+import random
+import threading
+from typing import Optional, Callable, Hashable, Iterable, TypeVar, ParamSpec
 from .player import Player
-from .simple_types import GameState, Deck, CardSource, GridPosition, Resource
-from .interfaces import TerraFuturaInterface, GameObserverInterface, InterfacePile, InterfaceMoveCard, ProcessActionInterface, ProcessActionAssistanceInterface, InterfaceSelectReward
+from .simple_types import GameState, Deck, CardSource, GridPosition, Resource, GameConfig
+from .interfaces import TerraFuturaInterface, GameObserverInterface, InterfacePile, InterfaceCard, InterfaceMoveCard, ProcessActionInterface, ProcessActionAssistanceInterface, InterfaceSelectReward
 from .grid import Grid
+from .pile import Pile
+from .select_reward import SelectReward
+from .game_observer import GameObserver
+from .auto_pay import AutoPay, cardOptions
+from .actions import Action, ActionKind, ALL_POSITIONS, PILE_INDICES, MAX_OPTIONS
+from .state_machine import sharedMachine
+from .canonical import cardKey, playerKey
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+def _synchronized(method: Callable[P, R]) -> Callable[P, R]:
+    """
+    In thread-safe mode runs the method under the game's lock. States produced
+    meanwhile are queued in order when the outermost call ends and delivered
+    to the observer after the lock is released (see Game._deliver).
+    """
+    @functools.wraps(method)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        game = args[0]
+        assert isinstance(game, Game)
+        lock = game._lock
+        if lock is None:
+            return method(*args, **kwargs)
+        with lock:
+            game._lockDepth += 1
+            try:
+                result = method(*args, **kwargs)
+            finally:
+                game._lockDepth -= 1
+                if game._lockDepth == 0 and game._pending:
+                    assert game._deliveryLock is not None
+                    with game._deliveryLock:
+                        game._outbox.extend(game._pending)
+                    game._pending.clear()
+        if game._outbox:
+            game._deliver()
+        return result
+    return wrapper
+
 
 class Game(TerraFuturaInterface):
+    __slots__ = ("_machine", "_players", "_piles", "_moveCard", "_processAction", "_processActionAssistance",
+                 "_selectReward", "_gameObserver", "_autoPay", "_assistanceUsed", "_state", "_onTurn",
+                 "_turnNumber", "_legalActions", "_legalActionSet", "_lock", "_lockDepth", "_pending",
+                 "_deliveryLock", "_outbox", "_delivering")
     _state: GameState
     _players: list[Player]
     _piles: dict[Deck, InterfacePile]
-    _turnNumber: int = 0
+    _turnNumber: int
     _gameObserver: GameObserverInterface
     _moveCard: InterfaceMoveCard
     _processAction: ProcessActionInterface
@@ -18,11 +68,16 @@ class Game(TerraFuturaInterface):
     def __init__(self, players: list[Player], piles: dict[Deck, InterfacePile], 
                  moveCard: InterfaceMoveCard, processAction: ProcessActionInterface, 
                  processActionAssistance: ProcessActionAssistanceInterface, 
-                 selectReward: InterfaceSelectReward, gameObserver: GameObserverInterface) -> None:
-        
+                 selectReward: InterfaceSelectReward, gameObserver: GameObserverInterface,
+                 autoPay: Optional[AutoPay] = None, config: GameConfig = GameConfig(),
+                 threadSafe: bool = False) -> None:
+        """
+        With `threadSafe` every call validates and commits under a per-game lock,
+        observer states are built under it and delivered after it is released.
+        """
+
         
-        if len(players) < 2 or len(players) > 4:
-            raise ValueError("Number of players not in interval 2..4")
+        self._machine = sharedMachine(len(players), config)
         if len(piles) != 2:
             raise ValueError("Wrong number of decks")
             
@@ -33,6 +88,7 @@ class Game(TerraFuturaInterface):
         self._processActionAssistance = processActionAssistance
         self._selectReward = selectReward
         self._gameObserver = gameObserver
+        self._autoPay = autoPay or AutoPay()
         self._assistanceUsed: bool = False
 
         self._state = GameState.TakeCardNoCardDiscarded
@@ -40,6 +96,16 @@ class Game(TerraFuturaInterface):
         self._turnNumber: int = 1
         self._moveCard = moveCard
 
+        self._legalActions: Optional[tuple[Action, ...]] = None
+        self._legalActionSet: Optional[frozenset[Action]] = None
+
+        self._lock: Optional[threading.RLock] = threading.RLock() if threadSafe else None
+        self._lockDepth = 0
+        self._pending: list[dict[int, str]] = []
+        self._deliveryLock: Optional[threading.Lock] = threading.Lock() if threadSafe else None
+        self._outbox: list[dict[int, str]] = []
+        self._delivering = False
+
     
     @property
     def currentPlayerId(self) -> int:
@@ -52,11 +118,150 @@ class Game(TerraFuturaInterface):
     @property
     def turnNumber(self) -> int:
         return self._turnNumber
+
+    @property
+    def config(self) -> GameConfig:
+        return self._machine.config
     
     @property
     def players(self) -> list[Player]:
         return self._players
+
+    def pile(self, deck: Deck) -> InterfacePile:
+        return self._piles[deck]
     
+    @property
+    def actingPlayerId(self) -> int:
+        """Player who is expected to act, the assisting player while selecting a reward."""
+        if self._state == GameState.SelectReward:
+            return self._selectReward.player
+        return self.currentPlayerId
+
+    @_synchronized
+    def legalActions(self) -> tuple[Action, ...]:
+        """Actions the acting player can currently perform, cached until the next state change."""
+        if self._legalActions is None:
+            player = self._getPlayer(self.actingPlayerId)
+            if player is None:
+                self._legalActions = ()
+            else:
+                self._legalActions = tuple(action for kind in self._machine.allowedKinds(self._state)
+                                           for action in _LEGAL_ACTION_GENERATORS[kind](self, player))
+        return self._legalActions
+
+    @_synchronized
+    def isLegal(self, action: Action) -> bool:
+        if self._legalActionSet is None:
+            self._legalActionSet = frozenset(self.legalActions())
+        return action in self._legalActionSet
+
+    def _legalTakeCard(self, player: Player) -> Iterable[Action]:
+        free = sorted(player.grid.placeablePositions, key=lambda position: (position.x, position.y))
+        for deck, pile in self._piles.items():
+            for index in PILE_INDICES:
+                if pile.getCard(index) is not None:
+                    for position in free:
+                        yield Action(ActionKind.TakeCard, deck=deck, cardIndex=index, position=position)
+
+    def _legalDiscard(self, player: Player) -> Iterable[Action]:
+        for deck, pile in self._piles.items():
+            if pile.getCard(1) is not None:
+                yield Action(ActionKind.DiscardLastCard, deck=deck)
+
+    def _legalActivateCard(self, player: Player) -> Iterable[Action]:
+        grid = player.grid
+        for position in ALL_POSITIONS:
+            card = grid.getCard(position)
+            if card is None or not grid.canBeActivated(position):
+                continue
+            for option, effect in enumerate(cardOptions(card)[:MAX_OPTIONS]):
+                if self._autoPay.pay(grid, position, effect) is not None:
+                    yield Action(ActionKind.ActivateCard, position=position, option=option)
+
+    def _legalActivateCardAssistance(self, player: Player) -> Iterable[Action]:
+        # assistance needs the other player's card, clients call activateCard directly
+        return ()
+
+    def _legalSelectReward(self, player: Player) -> Iterable[Action]:
+        for resource in Resource:
+            if self._selectReward.canSelectReward(resource):
+                yield Action(ActionKind.SelectReward, resource=resource)
+
+    def _legalTurnFinished(self, player: Player) -> Iterable[Action]:
+        yield Action(ActionKind.TurnFinished)
+
+    def _legalSelectActivationPattern(self, player: Player) -> Iterable[Action]:
+        for card, pattern in enumerate(player.activation_patterns):
+            if not pattern.is_selected():
+                yield Action(ActionKind.SelectActivationPattern, cardIndex=card)
+
+    def _legalSelectScoring(self, player: Player) -> Iterable[Action]:
+        for card in (0, 1):
+            yield Action(ActionKind.SelectScoring, cardIndex=card)
+
+    @_synchronized
+    def clone(self, rng: Optional[random.Random] = None,
+              gameObserver: Optional[GameObserverInterface] = None) -> Game:
+        """
+        Independent copy of the game for simulations. Collaborators without state
+        and card effects are shared. With `rng` the hidden cards of the piles are
+        reshuffled (a determinisation of the unknown cards). The copy notifies
+        `gameObserver`, nobody by default.
+        """
+        clone = copy.copy(self)
+        cards: dict[int, InterfaceCard] = {}
+        clone._players = [player.clone(cards) for player in self._players]
+        clone._piles = {deck: pile.clone(rng) if isinstance(pile, Pile) else copy.deepcopy(pile)
+                        for deck, pile in self._piles.items()}
+        clone._selectReward = (self._selectReward.clone(cards) if isinstance(self._selectReward, SelectReward)
+                               else copy.deepcopy(self._selectReward))
+        clone._gameObserver = gameObserver or GameObserver({})
+        clone._lock = None          # copies are for one thread (and picklable)
+        clone._lockDepth = 0
+        clone._pending = []
+        clone._deliveryLock = None
+        clone._outbox = []
+        clone._delivering = False
+        # cached legal actions stay valid, they do not depend on hidden cards
+        return clone
+
+    @_synchronized
+    def reset(self, gameObserver: Optional[GameObserverInterface] = None) -> None:
+        """
+        Starts a new game with the same players and piles. Players are reset, the
+        piles have to be refilled by the caller (see factories.GamePool).
+        """
+        for player in self._players:
+            player.reset()
+        if isinstance(self._selectReward, SelectReward):
+            self._selectReward.reset()
+        if gameObserver is not None:
+            self._gameObserver = gameObserver
+        self._assistanceUsed = False
+        self._state = GameState.TakeCardNoCardDiscarded
+        self._onTurn = 0
+        self._turnNumber = 1
+        self._legalActions = None
+        self._legalActionSet = None
+
+    @_synchronized
+    def canonicalKey(self) -> Hashable:
+        """
+        Hashable key equal for games that only differ by translations of the grids
+        (see canonical.py). Hidden pile cards are only counted, so determinisations
+        of the same position share the key.
+        """
+        piles = []
+        for deck in sorted(self._piles, key=lambda deck: deck.value):
+            pile = self._piles[deck]
+            visible = [pile.getCard(index) for index in PILE_INDICES]
+            piles.append((tuple(cardKey(card) for card in visible if card is not None),
+                          pile.hiddenCount if isinstance(pile, Pile) else -1))
+        reward = ((self._selectReward.player, tuple(self._selectReward.selection))
+                  if isinstance(self._selectReward, SelectReward) else None)
+        return (self._state, self._turnNumber, self._onTurn, self._assistanceUsed, reward,
+                tuple(piles), tuple(playerKey(player) for player in self._players))
+
     def _getPlayer(self, id: int) -> Optional[Player]:
         for player in self._players:
             if player.id == id:
@@ -74,45 +279,84 @@ class Game(TerraFuturaInterface):
         if self._onTurn == 0:
             self._turnNumber += 1
 
+    def _allows(self, kind: ActionKind) -> bool:
+        return self._machine.allows(self._state, kind)
+
+    def _transition(self, kind: ActionKind) -> None:
+        transition = self._machine.transition(self._state, kind, self._turnNumber, self._onTurn)
+        assert transition is not None
+        if transition.advance:
+            self._advanceTurn()
+        self._state = transition.nextState
+        self._stateChanged()
+
+    def _stateChanged(self) -> None:
+        self._legalActions = None
+        self._legalActionSet = None
+        self._notifyObservers()
+
     def _notifyObservers(self) -> None:
+        # simulations and replays have nobody to tell, skip rendering the states
+        if isinstance(self._gameObserver, GameObserver) and not self._gameObserver.hasObservers():
+            return
         state: dict[int, str] = {}
         for player in self.players:
             state[player.id] = self._getPlayerState(player.id)
         
-        self._gameObserver.notifyAll(state)
+        if self._lock is not None:
+            self._pending.append(state)
+        else:
+            self._gameObserver.notifyAll(state)
+
+    def _deliver(self) -> None:
+        """
+        Notifies the observer of the queued states. One thread at a time
+        delivers, and it also takes over states queued by other threads
+        meanwhile, so observers get the states of the game in order.
+        """
+        assert self._deliveryLock is not None
+        while True:
+            with self._deliveryLock:
+                if self._delivering or not self._outbox:
+                    return
+                self._delivering = True
+                states, self._outbox = self._outbox, []
+            try:
+                for state in states:
+                    self._gameObserver.notifyAll(state)
+            finally:
+                with self._deliveryLock:
+                    self._delivering = False
 
     def _getPlayerState(self, player_id: int) -> str:
         player = self._getPlayer(player_id)
         if player is None:
             return "{}"
         grid_state = player.grid.state()
-        return f'{{"state": "{self._state.value}", "on_turn": {self.onTurn}, "turn": {self.turnNumber}, "grid": {grid_state}}}'
+        return f'{{"state": "{self._state.value}", "on_turn": {self.onTurn()}, "turn": {self.turnNumber}, "grid": {grid_state}}}'
 
+    @_synchronized
     def discardLastCardFromDeck(self, playerId: int, deck: Deck) -> bool:
         if not self.isPlayerOnTurn(playerId):
             return False
         
-        if self.state != GameState.TakeCardNoCardDiscarded:
+        if not self._allows(ActionKind.DiscardLastCard):
             return False
         
         pile = self._piles.get(deck)
-        if pile is None:
-            # maybe not needed
+        if pile is None or pile.getCard(1) is None:
             return False
         
         pile.removeLastCard()
-        self._state = GameState.TakeCardCardDiscarded
-        self._notifyObservers()
+        self._transition(ActionKind.DiscardLastCard)
         return True
     
+    @_synchronized
     def takeCard(self, playerId: int, source: CardSource, cardIndex: int, destination: GridPosition) -> bool:
         if not self.isPlayerOnTurn(playerId):
             return False
         
-        if self._state not in {
-            GameState.TakeCardNoCardDiscarded,
-            GameState.TakeCardCardDiscarded,
-        }:
+        if not self._allows(ActionKind.TakeCard):
             return False
         
         pile = self._piles.get(source.deck)
@@ -128,30 +372,58 @@ class Game(TerraFuturaInterface):
         if not self._moveCard.moveCard(pile, cardIndex, destination, grid):
             return False
         
-        self._state = GameState.ActivateCard
-        self._notifyObservers()
+        self._transition(ActionKind.TakeCard)
         return True
     
+    @_synchronized
     def activateCard(self, playerId: int, card: GridPosition, 
                      inputs: list[tuple[Resource, GridPosition]], 
                      outputs: list[tuple[Resource, GridPosition]], 
                      pollution: list[GridPosition], otherPlayerId: int | None, 
                      otherCard: GridPosition | None) -> None:
+        self._activateCard(playerId, card, inputs, outputs, pollution, otherPlayerId, otherCard)
+
+    @_synchronized
+    def activateCardAutoPay(self, playerId: int, card: GridPosition, option: int) -> bool:
+        """
+        Activates the card using its `option`-th effect (options of the upper effect
+        first, then the lower one). Inputs and pollution are chosen by AutoPay.
+        """
+        player = self._getPlayer(playerId)
+        if player is None:
+            return False
+        card_obj = player.grid.getCard(card)
+        if card_obj is None:
+            return False
+        options = cardOptions(card_obj)
+        if option < 0 or option >= len(options):
+            return False
+        payment = self._autoPay.pay(player.grid, card, options[option])
+        if payment is None:
+            return False
+        return self._activateCard(playerId, card, payment.inputs, payment.outputs,
+                                  payment.pollution, None, None)
+
+    def _activateCard(self, playerId: int, card: GridPosition,
+                      inputs: list[tuple[Resource, GridPosition]],
+                      outputs: list[tuple[Resource, GridPosition]],
+                      pollution: list[GridPosition], otherPlayerId: int | None,
+                      otherCard: GridPosition | None) -> bool:
         if not self.isPlayerOnTurn(playerId):
-            return
+            return False
         
-        if self._state != GameState.ActivateCard:
-            return
+        if not self._allows(ActionKind.ActivateCard):
+            return False
         
         player = self._getPlayer(playerId)
         if player is None:
-            return
+            return False
         
         grid = player.grid
         
         card_obj = grid.getCard(card)
-        if card_obj is None:
-            return
+        if card_obj is None or not grid.canBeActivated(card):
+            return False
         
         isAssistance = otherPlayerId is not None and otherCard is not None
         if isAssistance:
@@ -160,14 +432,14 @@ class Game(TerraFuturaInterface):
             
             otherPlayer = self._getPlayer(otherPlayerId)
             if otherPlayer is None:
-                return
+                return False
             
             otherGrid = otherPlayer.grid
 
             assisting_card = otherGrid.getCard(otherCard)
 
             if assisting_card is None:
-                return
+                return False
             
             if not self._processActionAssistance.activateCard(
                 card_obj,
@@ -178,10 +450,10 @@ class Game(TerraFuturaInterface):
                 outputs,
                 pollution
             ):
-                return
+                return False
             
             self._assistanceUsed = True
-            self._state = GameState.SelectReward
+            self._selectReward.setReward(otherPlayerId, assisting_card, [resource for resource, _ in inputs])
         else:
             if not self._processAction.activateCard(
                 card_obj,
@@ -190,12 +462,15 @@ class Game(TerraFuturaInterface):
                 outputs,
                 pollution,
             ):
-                return
+                return False
         
-        self._notifyObservers()
+        grid.setActivated(card)
+        self._transition(ActionKind.ActivateCardAssistance if isAssistance else ActionKind.ActivateCard)
+        return True
 
+    @_synchronized
     def selectReward(self, playerId: int, resource: Resource) -> None:
-        if self._state != GameState.SelectReward:
+        if not self._allows(ActionKind.SelectReward):
             return
         
         if self._selectReward.player != playerId:
@@ -206,15 +481,15 @@ class Game(TerraFuturaInterface):
         
         self._selectReward.selectReward(resource)
         
-        self._state = GameState.ActivateCard
-        self._notifyObservers()
+        self._transition(ActionKind.SelectReward)
         return
     
+    @_synchronized
     def turnFinished(self, playerId: int) -> bool:
         if not self.isPlayerOnTurn(playerId):
             return False
         
-        if self._state != GameState.ActivateCard:
+        if not self._allows(ActionKind.TurnFinished):
             return False
         
         player = self._getPlayer(playerId)
@@ -223,32 +498,15 @@ class Game(TerraFuturaInterface):
         grid = player.grid
 
         grid.endTurn()
-        
-        if self._turnNumber < 9:
-            self._state = GameState.TakeCardNoCardDiscarded
-            self._advanceTurn()
-        elif self._turnNumber == 9:
-            # Last regular turn
-            self._advanceTurn()
-            if self._onTurn == 0:
-                self._state = GameState.SelectActivationPattern
-            else:
-                self._state = GameState.TakeCardNoCardDiscarded
-        else:
-            self._advanceTurn()
-            if self._onTurn == 0:
-                self._state = GameState.SelectScoringMethod
-            else:
-                self._state = GameState.SelectActivationPattern
-
-        self._notifyObservers()
+        self._transition(ActionKind.TurnFinished)
         return True
 
+    @_synchronized
     def selectActivationPattern(self, playerId: int, card: int) -> bool:
         if not self.isPlayerOnTurn(playerId):
             return False
         
-        if self._state != GameState.SelectActivationPattern:
+        if not self._allows(ActionKind.SelectActivationPattern):
             return False
 
         if card not in {0, 1}:
@@ -258,16 +516,15 @@ class Game(TerraFuturaInterface):
         if player is None:
             return False
         player.activation_patterns[card].select()
-        self._state = GameState.ActivateCard
-        
-        self._notifyObservers()
+        self._transition(ActionKind.SelectActivationPattern)
         return True
 
+    @_synchronized
     def selectScoring(self, playerId: int, card: int) -> bool:
         if not self.isPlayerOnTurn(playerId):
             return False
         
-        if self._state != GameState.SelectScoringMethod:
+        if not self._allows(ActionKind.SelectScoring):
             return False
         
         if card not in {0, 1}:
@@ -280,9 +537,17 @@ class Game(TerraFuturaInterface):
         scoring_method = player.scoring_methods[card]
         scoring_method.selectThisMethodAndCalculate()
 
-        self._advanceTurn()
-        if self._onTurn == 0:
-            self._state = GameState.Finish
-
-        self._notifyObservers()
+        self._transition(ActionKind.SelectScoring)
         return True
+
+
+_LEGAL_ACTION_GENERATORS: dict[ActionKind, Callable[[Game, Player], Iterable[Action]]] = {
+    ActionKind.TakeCard: Game._legalTakeCard,
+    ActionKind.DiscardLastCard: Game._legalDiscard,
+    ActionKind.ActivateCard: Game._legalActivateCard,
+    ActionKind.ActivateCardAssistance: Game._legalActivateCardAssistance,
+    ActionKind.SelectReward: Game._legalSelectReward,
+    ActionKind.TurnFinished: Game._legalTurnFinished,
+    ActionKind.SelectActivationPattern: Game._legalSelectActivationPattern,
+    ActionKind.SelectScoring: Game._legalSelectScoring,
+}
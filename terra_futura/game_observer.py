@@ -11,6 +11,17 @@ class GameObserver:
     def observers(self) -> Dict[int, TerraFuturaObserverInterface]:
         return self._observers.copy()
         
+    def subscribe(self, playerId: int, observer: TerraFuturaObserverInterface) -> None:
+        """Replaces the observer of the player."""
+        self._observers[playerId] = observer
+
+    def unsubscribe(self, playerId: int, observer: TerraFuturaObserverInterface) -> None:
+        if self._observers.get(playerId) is observer:
+            del self._observers[playerId]
+
+    def hasObservers(self) -> bool:
+        return bool(self._observers)
+
     def notifyAll(self, newState: Dict[int, str]) -> None:
         for player_id in newState:
             if player_id in self._observers:
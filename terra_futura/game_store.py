@@ -0,0 +1,263 @@
+"""
+Queryable SQLite storage of played games.
+
+The store keeps a row per game (players, state, final scores) and a row per
+accepted action, indexed by (game id, turn) and by player id. Writes are
+write-behind: record() only queues the row, a writer thread takes everything
+queued (from all tables) and inserts it in one WAL transaction with the same
+few statements, which sqlite3 prepares once and reuses. Games never wait on
+the disk; flush() waits until the queued rows are committed. A row the
+database rejects (such as a duplicate action) is left out on its own, the
+rest of its batch is committed.
+"""
+from __future__ import annotations
+import json
+import queue
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional, Union
+from .game import Game
+from .actions import Action, ACTIONS, ACTION_INDEX
+from .environment import finalScore
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    game_id  TEXT PRIMARY KEY,
+    players  INTEGER NOT NULL,
+    state    TEXT NOT NULL,
+    started  REAL NOT NULL,
+    finished REAL,
+    scores   TEXT
+);
+CREATE TABLE IF NOT EXISTS actions (
+    game_id   TEXT NOT NULL,
+    sequence  INTEGER NOT NULL,
+    turn      INTEGER NOT NULL,
+    player_id INTEGER NOT NULL,
+    action    INTEGER NOT NULL,
+    time      REAL NOT NULL,
+    PRIMARY KEY (game_id, sequence)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS actions_game_turn ON actions (game_id, turn);
+CREATE INDEX IF NOT EXISTS actions_player ON actions (player_id);
+"""
+
+_INSERT_GAME = "INSERT INTO games (game_id, players, state, started) VALUES (?, ?, ?, ?)"
+_INSERT_ACTION = "INSERT INTO actions VALUES (?, ?, ?, ?, ?, ?)"
+_FINISH_GAME = "UPDATE games SET state = ?, finished = ?, scores = ? WHERE game_id = ?"
+
+_GAME, _ACTION, _FINISH = range(3)
+
+
+@dataclass(frozen=True)
+class ActionRecord:
+    gameId: str
+    sequence: int
+    turn: int
+    playerId: int
+    action: Action
+    time: float
+
+
+@dataclass(frozen=True)
+class GameRecord:
+    gameId: str
+    players: int
+    state: str
+    started: float
+    finished: Optional[float]
+    scores: Optional[dict[int, int]]
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+class GameStore:
+    """
+    Games and their actions in an SQLite database at `path`.
+
+    At most `batchSize` rows go into one transaction. The writer's errors are
+    raised by the next flush() or close(), the store keeps writing.
+    """
+
+    def __init__(self, path: Union[str, Path], batchSize: int = 10_000) -> None:
+        if batchSize < 1:
+            raise ValueError("batchSize must be positive")
+        self._path = str(path)
+        self._batchSize = batchSize
+        self._sequences: dict[str, int] = {}
+        self._queue: queue.SimpleQueue[Any] = queue.SimpleQueue()
+        self._errors: list[BaseException] = []
+        self._errorLock = threading.Lock()
+        connection = _connect(self._path)
+        connection.executescript(_SCHEMA)
+        self._reader = connection
+        self._readerLock = threading.Lock()
+        self._writer = threading.Thread(target=self._write, name="GameStore writer", daemon=True)
+        self._writer.start()
+
+    def start(self, gameId: str, game: Game) -> None:
+        """Stores a new game, its actions are numbered from 0. Game ids cannot be reused."""
+        if gameId in self._sequences or self._query("SELECT 1 FROM games WHERE game_id = ?", (gameId,)):
+            raise ValueError(f"Game {gameId!r} was already started")
+        self._sequences[gameId] = 0
+        self._queue.put((_GAME, (gameId, len(game.players), game.state.name, time.time())))
+
+    def apply(self, gameId: str, game: Game, playerId: int, action: Action) -> bool:
+        """Plays the action and stores it if the game accepted it."""
+        turn = game.turnNumber
+        if not action.apply(game, playerId):
+            return False
+        self.record(gameId, playerId, action, turn)
+        return True
+
+    def record(self, gameId: str, playerId: int, action: Action, turn: int) -> None:
+        """Stores an action accepted in `turn`, returns without waiting for the disk."""
+        sequence = self._sequences[gameId]
+        self._sequences[gameId] = sequence + 1
+        self._queue.put((_ACTION, (gameId, sequence, turn, playerId, ACTION_INDEX[action], time.time())))
+
+    def finish(self, gameId: str, game: Game) -> None:
+        """Stores the state and the scores the game ended with."""
+        self._sequences.pop(gameId, None)
+        scores = json.dumps({player.id: finalScore(game, player.id) for player in game.players})
+        self._queue.put((_FINISH, (game.state.name, time.time(), scores, gameId)))
+
+    def _write(self) -> None:
+        connection = _connect(self._path)
+        try:
+            while True:
+                item = self._queue.get()
+                batch: list[Any] = []
+                waiting: list[threading.Event] = []
+                stop = False
+                while True:
+                    if item is None:
+                        stop = True
+                    elif isinstance(item, threading.Event):
+                        waiting.append(item)
+                    else:
+                        batch.append(item)
+                    if stop or len(batch) >= self._batchSize:
+                        break
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                if batch:
+                    try:
+                        errors = self._commit(connection, batch)
+                    except Exception as error:
+                        errors = [error]
+                    with self._errorLock:
+                        self._errors.extend(errors)
+                for event in waiting:
+                    event.set()
+                if stop:
+                    return
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _commit(connection: sqlite3.Connection, batch: list[Any]) -> list[BaseException]:
+        """
+        Commits the batch, returns the errors of rows that were rejected. Only
+        if the batch fails as a whole are its rows inserted one by one.
+        """
+        # rows keep their order across the statements: a game row precedes its
+        # actions and its finish in the queue, so it is inserted first
+        statements = ((_INSERT_GAME, [row for kind, row in batch if kind == _GAME]),
+                      (_INSERT_ACTION, [row for kind, row in batch if kind == _ACTION]),
+                      (_FINISH_GAME, [row for kind, row in batch if kind == _FINISH]))
+        connection.execute("BEGIN")
+        try:
+            for sql, rows in statements:
+                connection.executemany(sql, rows)
+        except sqlite3.IntegrityError:
+            connection.execute("ROLLBACK")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        else:
+            connection.execute("COMMIT")
+            return []
+        # a failing statement only undoes its own row, the transaction goes on
+        errors: list[BaseException] = []
+        connection.execute("BEGIN")
+        try:
+            for sql, rows in statements:
+                for row in rows:
+                    try:
+                        connection.execute(sql, row)
+                    except sqlite3.IntegrityError as error:
+                        errors.append(error)
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+        return errors
+
+    def _raise(self) -> None:
+        with self._errorLock:
+            errors, self._errors = self._errors, []
+        if errors:
+            raise RuntimeError(f"Writing the game store failed ({len(errors)} errors)") from errors[0]
+
+    def flush(self) -> None:
+        """Waits until everything recorded so far is committed."""
+        if self._writer.is_alive():
+            event = threading.Event()
+            self._queue.put(event)
+            event.wait()
+        self._raise()
+
+    def close(self) -> None:
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        with self._readerLock:
+            self._reader.close()
+        self._raise()
+
+    def __enter__(self) -> GameStore:
+        return self
+
+    def __exit__(self, *exception: object) -> None:
+        self.close()
+
+    def _query(self, sql: str, parameters: tuple[Any, ...]) -> list[Any]:
+        with self._readerLock:
+            return self._reader.execute(sql, parameters).fetchall()
+
+    def actions(self, gameId: str, turn: Optional[int] = None) -> list[ActionRecord]:
+        """Committed actions of the game (in one turn), in the order played."""
+        if turn is None:
+            rows = self._query("SELECT * FROM actions WHERE game_id = ? ORDER BY sequence", (gameId,))
+        else:
+            rows = self._query("SELECT * FROM actions WHERE game_id = ? AND turn = ? ORDER BY sequence",
+                               (gameId, turn))
+        return [ActionRecord(row[0], row[1], row[2], row[3], ACTIONS[row[4]], row[5]) for row in rows]
+
+    def playerActions(self, playerId: int) -> list[ActionRecord]:
+        """Committed actions of the player id in all games."""
+        rows = self._query("SELECT * FROM actions WHERE player_id = ? ORDER BY game_id, sequence", (playerId,))
+        return [ActionRecord(row[0], row[1], row[2], row[3], ACTIONS[row[4]], row[5]) for row in rows]
+
+    def games(self, finished: Optional[bool] = None) -> list[GameRecord]:
+        """Committed games, only the finished or unfinished ones if asked."""
+        sql = "SELECT * FROM games"
+        if finished is not None:
+            sql += " WHERE finished IS NOT NULL" if finished else " WHERE finished IS NULL"
+        records = []
+        for gameId, players, state, started, ended, scores in self._query(sql + " ORDER BY game_id", ()):
+            records.append(GameRecord(gameId, players, state, started, ended,
+                                      None if scores is None else
+                                      {int(player): score for player, score in json.loads(scores).items()}))
+        return records
@@ -1,31 +1,119 @@
+from __future__ import annotations
+import json
+from collections import Counter
+from typing import Any, Optional, List
 from terra_futura.interfaces import InterfaceGrid, InterfaceCard
-from typing import Optional, List
-from terra_futura.simple_types import *
+from terra_futura.simple_types import GridPosition
 
 class Grid (InterfaceGrid):
+    """
+    Player's tableau of cards.
+
+    - Cards are kept on relative coordinates -2..2, the first card goes to (0,0).
+    - Every further card has to touch an already placed card and the whole
+      tableau has to fit into 3x3.
+    - Placing a card allows one activation of every card in its row and column,
+      the activation pattern (end of the game) allows activations of given positions.
+    """
+    SIZE = 3
+    __slots__ = ("_cards", "_allowed", "_activated", "_placeable")
+
     def __init__(self) ->None:
-        pass
-    
+        self._cards: dict[GridPosition, InterfaceCard] = {}
+        self._allowed: Counter[GridPosition] = Counter()
+        self._activated: Counter[GridPosition] = Counter()
+        # positions where a card can be put, updated with every placed card
+        self._placeable: set[GridPosition] = {GridPosition(0, 0)}
+
+    def reset(self) -> None:
+        """Empties the grid for reuse in another game."""
+        self._cards.clear()
+        self._allowed.clear()
+        self._activated.clear()
+        self._placeable.clear()
+        self._placeable.add(GridPosition(0, 0))
+
+    @property
+    def positions(self) -> List[GridPosition]:
+        return list(self._cards)
+
+    @property
+    def placeablePositions(self) -> frozenset[GridPosition]:
+        return frozenset(self._placeable)
+
     def getCard(self, coordinate: GridPosition)-> Optional[InterfaceCard]:
-        ...
+        return self._cards.get(coordinate)
 
     def canPutCard(self, coordinate: GridPosition)-> bool:
-        return False
+        return coordinate in self._placeable
 
     def putCard(self, coordinate: GridPosition, card: InterfaceCard) -> None:
-        ...
+        if not self.canPutCard(coordinate):
+            raise ValueError(f"Cannot put card on {coordinate}")
+        self._cards[coordinate] = card
+
+        # new neighbours become candidates, the bounding box can only shrink the set
+        self._placeable.discard(coordinate)
+        for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            x, y = coordinate.x + dx, coordinate.y + dy
+            if -2 <= x <= 2 and -2 <= y <= 2 and GridPosition(x, y) not in self._cards:
+                self._placeable.add(GridPosition(x, y))
+        minX, maxX = min(position.x for position in self._cards), max(position.x for position in self._cards)
+        minY, maxY = min(position.y for position in self._cards), max(position.y for position in self._cards)
+        self._placeable = {position for position in self._placeable
+                           if max(maxX, position.x) - min(minX, position.x) < self.SIZE
+                           and max(maxY, position.y) - min(minY, position.y) < self.SIZE}
+
+        self._allowed = Counter(position for position in self._cards
+                                if position.x == coordinate.x or position.y == coordinate.y)
+        self._activated = Counter()
 
     def canBeActivated(self, coordinate: GridPosition)-> bool:
-        return False
-        
+        card = self._cards.get(coordinate)
+        if card is None or not card.isActive():
+            return False
+        return self._activated[coordinate] < self._allowed[coordinate]
+
+    def remainingActivations(self, coordinate: GridPosition) -> int:
+        return max(0, self._allowed[coordinate] - self._activated[coordinate])
+
+    def activatedCount(self, coordinate: GridPosition) -> int:
+        """How many times the card was activated since the last card placement / pattern."""
+        return self._activated[coordinate]
+
     def setActivated(self, coordinate: GridPosition) -> None:
-        ...
+        if not self.canBeActivated(coordinate):
+            raise ValueError(f"Card on {coordinate} cannot be activated")
+        self._activated[coordinate] += 1
 
     def setActivationPattern(self, pattern: List[GridPosition]) -> None:
-        ...
-        
+        self._allowed = Counter(pattern)
+        self._activated = Counter()
+
     def endTurn(self) -> None:
-        ...
+        self._allowed = Counter()
+        self._activated = Counter()
+
+    def clone(self, cards: Optional[dict[int, InterfaceCard]] = None) -> Grid:
+        """
+        Independent copy of the grid and its cards (effects are shared).
+        `cards` collects id(original card) -> copy.
+        """
+        grid = Grid()
+        for position, card in self._cards.items():
+            grid._cards[position] = card.clone()
+            if cards is not None:
+                cards[id(card)] = grid._cards[position]
+        grid._allowed = self._allowed.copy()
+        grid._activated = self._activated.copy()
+        grid._placeable = self._placeable.copy()
+        return grid
 
     def state(self) -> str:
-        return ""
\ No newline at end of file
+        state: Any = {
+            "cards": [{"x": position.x, "y": position.y, "card": card.state()}
+                      for position, card in self._cards.items()],
+            "activations": [[position.x, position.y, self._allowed[position] - self._activated[position]]
+                            for position in self._allowed],
+        }
+        return json.dumps(state)
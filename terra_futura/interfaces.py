@@ -4,6 +4,7 @@ from terra_futura.simple_types import *
 
 from abc import ABC, abstractmethod
 from typing import List
+import copy
 
 # Zostalo z pôvodného...
 class InterfaceActivateGrid(Protocol):
@@ -38,14 +39,17 @@ class Effect(ABC):
 
 # Card
 class InterfaceCard(ABC):
+    __slots__ = ("resources",)
+
+    # printed part, stored by subclasses (Card reads it from its template)
+    pollutionSpacesL: int
+    # Multiplicity 0..1 — may be None or an Effect instance
+    upperEffect: Optional[Effect]
+    lowerEffect: Optional[Effect]
+
     def __init__(self) ->None:
         # Attributes
         self.resources: List[Resource] = []
-        self.pollutionSpacesL: int = 0
-
-        # Multiplicity 0..1 — may be None or an Effect instance
-        self.upperEffect: Optional[Effect] = None
-        self.lowerEffect: Optional[Effect] = None
 
     # --- Interface methods ---
     @abstractmethod
@@ -94,9 +98,17 @@ class InterfaceCard(ABC):
     def state(self) -> str:
         pass
 
+    def clone(self) -> "InterfaceCard":
+        """Copy of the card with its own resources, effects are shared."""
+        duplicate = copy.copy(self)
+        duplicate.resources = self.resources.copy()
+        return duplicate
+
 # Pile
 class InterfacePile(Protocol):
     """Only gives the card information, does not change anything"""
+    __slots__ = ()
+
     def getCard(self, index:int) ->Optional[InterfaceCard]:
         ...
 
@@ -112,6 +124,8 @@ class InterfacePile(Protocol):
 
 # Grid
 class InterfaceGrid(Protocol):
+    __slots__ = ()
+
     def getCard(self, coordinate: GridPosition)-> Optional[InterfaceCard]:
         ...
 
@@ -145,6 +159,8 @@ class InterfaceMoveCard(Protocol):
         
 
 class TerraFuturaInterface(Protocol):
+    __slots__ = ()
+
     def takeCard(self, playerId: int, source: CardSource, cardIndex: int, destination: GridPosition) -> bool:
         ...
     
@@ -182,6 +198,8 @@ class ProcessActionInterface(Protocol):
         ...
 
 class PlayerInterface(Protocol):
+    __slots__ = ()
+
     def getGrid(self) -> InterfaceGrid:
         ...
 
@@ -0,0 +1,260 @@
+from __future__ import annotations
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Hashable, Optional, Union
+from .simple_types import GameState
+from .game import Game
+from .actions import Action
+from .canonical import keyHash
+from .evaluation_store import EvaluationStore
+
+# action -> (visits, total reward of the player who made the action)
+RootStatistics = dict[Action, tuple[int, float]]
+
+
+@dataclass(frozen=True)
+class SearchResult:
+    action: Action
+    iterations: int
+    statistics: RootStatistics
+    storeHits: int = 0
+    storeMisses: int = 0
+
+    @property
+    def storeHitRate(self) -> float:
+        lookups = self.storeHits + self.storeMisses
+        return self.storeHits / lookups if lookups else 0.0
+
+
+MARGIN_WEIGHT = 0.1
+
+
+def finalRewards(game: Game) -> dict[int, float]:
+    """
+    1 for the best final score, 0 for the worst, ties share. A small bonus
+    (below MARGIN_WEIGHT) for the margin to the best opponent breaks ties
+    between moves that win or lose anyway.
+    """
+    scores: dict[int, int] = {}
+    for player in game.players:
+        totals = [method.calculatedTotal.value for method in player.scoring_methods
+                  if method.calculatedTotal is not None]
+        scores[player.id] = totals[0] if totals else 0
+    others = max(1, len(scores) - 1)
+    rewards: dict[int, float] = {}
+    for playerId, score in scores.items():
+        rank = (sum(1.0 for other in scores.values() if other < score)
+                + 0.5 * (sum(1.0 for other in scores.values() if other == score) - 1)) / others
+        margin = score - max((other for otherId, other in scores.items() if otherId != playerId), default=score)
+        rewards[playerId] = rank + MARGIN_WEIGHT * margin / (abs(margin) + 10)
+    return rewards
+
+
+class _Node:
+    def __init__(self, player: Optional[int]) -> None:
+        self.player = player  # player who made the action leading here
+        self.children: dict[Action, _Node] = {}
+        self.visits = 0
+        self.value = 0.0
+        # part of visits/value that was loaded from an EvaluationStore
+        self.priorVisits = 0
+        self.priorValue = 0.0
+
+
+def _mean(node: _Node) -> float:
+    return node.value / node.visits if node.visits else 0.0
+
+
+def _rollout(game: Game, rng: random.Random) -> dict[int, float]:
+    while game.state != GameState.Finish:
+        actions = game.legalActions()
+        if not actions:
+            break
+        rng.choice(actions).apply(game, game.actingPlayerId)
+    return finalRewards(game)
+
+
+def edgeKey(game: Game, action: Action) -> int:
+    """
+    Store key of `action` played in `game`. Keyed by the position before the
+    action, because the position after it depends on the hidden card drawn.
+    """
+    return keyHash((game.canonicalKey(), action))
+
+
+_STORES: dict[str, EvaluationStore] = {}
+
+
+def _openStore(store: Union[EvaluationStore, str, None]) -> Optional[EvaluationStore]:
+    """Worker processes get the path and keep one read-only mapping per process."""
+    if store is None or isinstance(store, EvaluationStore):
+        return store
+    if store not in _STORES:
+        _STORES[store] = EvaluationStore(store)
+    return _STORES[store]
+
+
+@dataclass(frozen=True)
+class TreeStatistics:
+    statistics: RootStatistics
+    iterations: int
+    storeHits: int = 0
+    storeMisses: int = 0
+
+
+def search(game: Game, thinkTime: float, seed: int, exploration: float = 1.4,
+           maxIterations: Optional[int] = None,
+           store: Union[EvaluationStore, str, None] = None) -> TreeStatistics:
+    """
+    Single-tree search over determinisations: every iteration reshuffles the hidden
+    pile cards, descends through children that are legal in that determinisation
+    (UCB1), expands one untried action and finishes the game randomly.
+
+    Nodes are shared through a transposition table keyed by the canonical game
+    key, so lines that reach the same position (up to translation of the grids)
+    pool their statistics. New nodes found in `store` (or the store file at that
+    path) start with its statistics, scaled down to at most PRIOR_VISITS visits.
+    The returned statistics only count the visits of this search.
+    """
+    rng = random.Random(seed)
+    deadline = time.time() + thinkTime
+    evaluations = _openStore(store)
+    hits, misses = (evaluations.hits, evaluations.misses) if evaluations is not None else (0, 0)
+    root = _Node(None)
+    nodes: dict[tuple[int, Hashable], _Node] = {}
+    iterations = 0
+    while time.time() < deadline and (maxIterations is None or iterations < maxIterations):
+        state = game.clone(rng)
+        node = root
+        path = [root]
+        while state.state != GameState.Finish:
+            legal = state.legalActions()
+            if not legal:
+                break
+            untried = [action for action in legal if action not in node.children]
+            actor = state.actingPlayerId
+            expanded = False
+            if untried:
+                action = rng.choice(untried)
+                stored = evaluations.get(edgeKey(state, action)) if evaluations is not None else None
+                action.apply(state, actor)
+                key = (actor, state.canonicalKey())
+                child = nodes.get(key)
+                if child is None:
+                    child = nodes[key] = _Node(actor)
+                    expanded = True
+                    _warmStart(child, stored)
+                node.children[action] = child
+            else:
+                logVisits = math.log(max(1, node.visits))
+                action = max(legal, key=lambda action: _mean(node.children[action])
+                             + exploration * math.sqrt(logVisits / max(1, node.children[action].visits)))
+                action.apply(state, actor)
+            node = node.children[action]
+            if node in path:
+                break
+            path.append(node)
+            if expanded:
+                break
+
+        rewards = _rollout(state, rng)
+        for visited in path:
+            visited.visits += 1
+            if visited.player is not None:
+                visited.value += rewards.get(visited.player, 0.0)
+        iterations += 1
+
+    statistics = {action: (child.visits - child.priorVisits, child.value - child.priorValue)
+                  for action, child in root.children.items()}
+    if evaluations is None:
+        return TreeStatistics(statistics, iterations)
+    return TreeStatistics(statistics, iterations, evaluations.hits - hits, evaluations.misses - misses)
+
+
+PRIOR_VISITS = 20
+
+
+def _warmStart(node: _Node, record: Optional[tuple[int, float]]) -> None:
+    if record is None or record[0] == 0:
+        return
+    visits, value = record
+    node.priorVisits = min(visits, PRIOR_VISITS)
+    node.priorValue = value * node.priorVisits / visits
+    node.visits, node.value = node.priorVisits, node.priorValue
+
+
+class MctsPlayer:
+    """
+    Monte Carlo tree search bot playing through the game interface.
+
+    The search is root-parallel: each of `workers` processes grows its own tree
+    for `thinkTime` seconds on a copy of the game, the visit counts of the root
+    actions are summed and the most visited action is played.
+
+    With an EvaluationStore the trees are warm-started from it (workers open the
+    file read-only) and, if the store is writable, the root statistics of every
+    search are added to it.
+    """
+
+    def __init__(self, thinkTime: float = 1.0, workers: int = 1, exploration: float = 1.4,
+                 seed: Optional[int] = None, maxIterations: Optional[int] = None,
+                 store: Optional[EvaluationStore] = None) -> None:
+        if workers < 1:
+            raise ValueError("At least one worker")
+        self._thinkTime = thinkTime
+        self._workers = workers
+        self._exploration = exploration
+        self._maxIterations = maxIterations
+        self._rng = random.Random(seed)
+        self._store = store
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def search(self, game: Game) -> SearchResult:
+        legal = game.legalActions()
+        if not legal:
+            raise ValueError("No legal action")
+        snapshot = game.clone()
+        seeds = [self._rng.getrandbits(64) for _ in range(self._workers)]
+        if self._workers == 1:
+            results = [search(snapshot, self._thinkTime, seeds[0], self._exploration, self._maxIterations,
+                              self._store)]
+        else:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self._workers)
+            if self._store is not None:
+                self._store.flush()
+            path = self._store.path if self._store is not None else None
+            futures = [self._executor.submit(search, snapshot, self._thinkTime, seed, self._exploration,
+                                             self._maxIterations, path) for seed in seeds]
+            results = [future.result() for future in futures]
+
+        merged: RootStatistics = {}
+        for result in results:
+            for action, (visits, value) in result.statistics.items():
+                total = merged.get(action, (0, 0.0))
+                merged[action] = (total[0] + visits, total[1] + value)
+        if self._store is not None and self._store.writable:
+            self._record(game, merged)
+        candidates = [action for action in legal if action in merged] or list(legal)
+        best = max(candidates, key=lambda action: merged.get(action, (0, 0.0)))
+        return SearchResult(best, sum(result.iterations for result in results), merged,
+                            sum(result.storeHits for result in results),
+                            sum(result.storeMisses for result in results))
+
+    def _record(self, game: Game, statistics: RootStatistics) -> None:
+        assert self._store is not None
+        for action, (visits, value) in statistics.items():
+            if visits > 0:
+                self._store.add(edgeKey(game, action), visits, value)
+
+    def play(self, game: Game, playerId: int) -> bool:
+        """Searches and performs the chosen action for `playerId`."""
+        return self.search(game).action.apply(game, playerId)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
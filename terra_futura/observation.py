@@ -0,0 +1,78 @@
+from __future__ import annotations
+from typing import Any
+from weakref import WeakKeyDictionary
+import numpy as np
+import numpy.typing as npt
+from .simple_types import Resource
+from .interfaces import InterfaceCard
+from .card import Card
+from .grid import Grid
+
+Features = npt.NDArray[np.float32]
+
+_RESOURCE_CHANNEL = {resource: channel for channel, resource in enumerate(Resource)}
+
+# channels of the (CHANNELS, 5, 5) feature array, x and y are shifted by 2
+OCCUPIED = len(_RESOURCE_CHANNEL)
+ACTIVE = OCCUPIED + 1
+POLLUTION = OCCUPIED + 2
+POLLUTION_SPACES = OCCUPIED + 3
+CARD_CHANNELS = OCCUPIED + 4     # channels that only depend on the card
+CAN_ACTIVATE = CARD_CHANNELS
+ACTIVATED = CARD_CHANNELS + 1
+CHANNELS = CARD_CHANNELS + 2
+SIDE = 5
+
+
+class GridEncoder:
+    """
+    Writes a grid into fixed-shape arrays supplied by the caller.
+
+    - features: float32 (CHANNELS, 5, 5): resource counts per Resource, occupied,
+      active, pollution, pollution spaces, can be activated, activations this turn
+    - signatures: (5, 5) CardTemplate.signatureId of the card, stable for a
+      catalog file (0 for empty cells and cards not dealt from a catalog)
+
+    The card channels of a Card are cached and only recomputed when the card
+    version changes, grid flags are read on every call.
+    """
+
+    def __init__(self) -> None:
+        self._cache: WeakKeyDictionary[InterfaceCard, tuple[int, Features, int]] = WeakKeyDictionary()
+
+    @staticmethod
+    def allocate(batch: int) -> tuple[Features, npt.NDArray[np.int32]]:
+        return (np.zeros((batch, CHANNELS, SIDE, SIDE), dtype=np.float32),
+                np.zeros((batch, SIDE, SIDE), dtype=np.int32))
+
+    def _encodeCard(self, card: InterfaceCard) -> tuple[Features, int]:
+        version = card.version if isinstance(card, Card) else None
+        cached = self._cache.get(card)
+        if cached is not None and version is not None and cached[0] == version:
+            return cached[1], cached[2]
+
+        row = np.zeros(CARD_CHANNELS, dtype=np.float32)
+        for resource in card.resources:
+            row[_RESOURCE_CHANNEL[resource]] += 1.0
+        row[OCCUPIED] = 1.0
+        row[ACTIVE] = card.isActive()
+        row[POLLUTION] = card.pollution if isinstance(card, Card) else 0.0
+        row[POLLUTION_SPACES] = card.pollutionSpacesL
+        template = card.template if isinstance(card, Card) else None
+        signature = template.signatureId if template is not None else 0
+        if version is not None:
+            self._cache[card] = (version, row, signature)
+        return row, signature
+
+    def encode(self, grid: Grid, features: Features, signatures: npt.NDArray[Any]) -> None:
+        features.fill(0.0)
+        signatures.fill(0)
+        for position in grid.positions:
+            card = grid.getCard(position)
+            assert card is not None
+            x, y = position.x + 2, position.y + 2
+            row, signature = self._encodeCard(card)
+            features[:CARD_CHANNELS, x, y] = row
+            features[CAN_ACTIVATE, x, y] = grid.canBeActivated(position)
+            features[ACTIVATED, x, y] = grid.activatedCount(position)
+            signatures[x, y] = signature
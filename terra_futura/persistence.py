@@ -0,0 +1,248 @@
+"""
+Event-sourced storage of running games.
+
+Every game gets a directory with an append-only log of the accepted actions
+(numbers into actions.ACTIONS and the player id) and a snapshot of the whole
+game taken every `snapshotEvery` actions (pickled, or in the binary format of
+snapshot.GameCodec for games dealt from a card catalog). A game is recovered
+by loading the snapshot and replaying the log records written after it. The
+snapshot of the dealt game is kept as well, so finished games can be replayed
+from the start (see analytics.py), and games of a seeded batch keep the
+seeds of their random streams (seeding.GameSeeds) in seeds.json, so they can
+be played again on their own. Only Action moves are
+logged (activations go through AutoPay), which is what the bots, the server
+and the environments play.
+"""
+from __future__ import annotations
+import json
+import os
+import pickle
+import struct
+import time
+from pathlib import Path
+from typing import Iterator, Optional, Union
+from .game import Game
+from .actions import Action, ACTIONS, ACTION_INDEX
+from .snapshot import GameCodec, MAGIC as CODEC_MAGIC
+from .seeding import GameSeeds
+
+_LOG_MAGIC = b"TFLOG001"
+_SNAPSHOT_MAGIC = b"TFSNAP01"
+_RECORD = struct.Struct("<HB")           # action number, player id
+_SNAPSHOT_HEADER = struct.Struct("<8sQ")  # magic, number of actions before the snapshot
+
+LOG = "actions.log"
+SNAPSHOT = "snapshot.bin"
+START = "start.bin"
+SEEDS = "seeds.json"
+
+
+def encodeSnapshot(game: Game) -> bytes:
+    """Whole game without its observer (and lock)."""
+    return pickle.dumps(game.clone(), pickle.HIGHEST_PROTOCOL)
+
+
+def decodeSnapshot(data: bytes) -> Game:
+    try:
+        game = pickle.loads(data)
+    except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, IndexError) as error:
+        raise ValueError(f"Corrupted snapshot: {error!r}") from error
+    if not isinstance(game, Game):
+        raise ValueError("Not a game snapshot")
+    return game
+
+
+class ActionLog:
+    """Log file of one game, records are buffered and written in batches."""
+
+    def __init__(self, path: Path, batchSize: int = 64) -> None:
+        self._path = path
+        self._batchSize = batchSize
+        self._buffer = bytearray()
+        self._buffered = 0
+        size = path.stat().st_size if path.exists() else 0
+        self._file = open(path, "ab")
+        if size == 0:
+            self._file.write(_LOG_MAGIC)
+            self._file.flush()
+            size = len(_LOG_MAGIC)
+        # drop a record torn by a crash, new records have to stay aligned
+        self.count = (size - len(_LOG_MAGIC)) // _RECORD.size
+        aligned = len(_LOG_MAGIC) + self.count * _RECORD.size
+        if aligned != size:
+            self._file.truncate(aligned)
+
+    def append(self, playerId: int, action: Action) -> None:
+        self._buffer += _RECORD.pack(ACTION_INDEX[action], playerId)
+        self._buffered += 1
+        self.count += 1
+        if self._buffered >= self._batchSize:
+            self.flush()
+
+    def flush(self, sync: bool = False) -> None:
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._buffer.clear()
+            self._buffered = 0
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self.flush(sync=True)
+        self._file.close()
+
+
+def iterLog(path: Path, start: int = 0, chunkRecords: int = 4096) -> Iterator[tuple[int, Action]]:
+    """(player id, action) records from the `start`-th on, read in chunks, a torn last record is ignored."""
+    with open(path, "rb") as file:
+        if file.read(len(_LOG_MAGIC)) != _LOG_MAGIC:
+            raise ValueError(f"{path} is not an action log")
+        file.seek(start * _RECORD.size, os.SEEK_CUR)
+        while chunk := file.read(chunkRecords * _RECORD.size):
+            for number, playerId in _RECORD.iter_unpack(chunk[:len(chunk) - len(chunk) % _RECORD.size]):
+                if number >= len(ACTIONS):
+                    raise ValueError(f"{path} holds unknown action number {number}")
+                yield playerId, ACTIONS[number]
+            if len(chunk) % _RECORD.size:
+                return
+
+
+def logLength(path: Path) -> int:
+    """Number of complete records in a log, from its size."""
+    return max(0, path.stat().st_size - len(_LOG_MAGIC)) // _RECORD.size
+
+
+def readLog(path: Path, start: int = 0) -> list[tuple[int, Action]]:
+    return list(iterLog(path, start))
+
+
+def loadSnapshot(path: Path, codec: Optional[GameCodec] = None) -> tuple[Game, int]:
+    """Game of a snapshot file and the number of logged actions it includes."""
+    with open(path, "rb") as file:
+        data = file.read()
+    if len(data) < _SNAPSHOT_HEADER.size or not data.startswith(_SNAPSHOT_MAGIC):
+        raise ValueError(f"{path} is not a snapshot")
+    _, count = _SNAPSHOT_HEADER.unpack_from(data)
+    payload = data[_SNAPSHOT_HEADER.size:]
+    if payload.startswith(CODEC_MAGIC):
+        if codec is None:
+            raise ValueError(f"{path} needs a GameCodec to be decoded")
+        return codec.decode(payload), count
+    return decodeSnapshot(payload), count
+
+
+class GameJournal:
+    """
+    Logs and snapshots of many games under `root`.
+
+    Log records are written in batches of `batchSize` and fsynced at most every
+    `fsyncInterval` seconds (checked on every record, call flush() from a timer
+    to bound the delay of idle games). Snapshots are written atomically every
+    `snapshotEvery` actions, with `codec` in its binary format (recovering
+    them needs a codec of the same catalog).
+    """
+
+    def __init__(self, root: Union[str, Path], snapshotEvery: int = 100, batchSize: int = 64,
+                 fsyncInterval: float = 1.0, codec: Optional[GameCodec] = None) -> None:
+        if snapshotEvery < 1 or batchSize < 1:
+            raise ValueError("snapshotEvery and batchSize must be positive")
+        self._root = Path(root)
+        self._root.mkdir(parents=True, exist_ok=True)
+        self._snapshotEvery = snapshotEvery
+        self._batchSize = batchSize
+        self._fsyncInterval = fsyncInterval
+        self._codec = codec
+        self._lastSync = time.monotonic()
+        self._logs: dict[str, ActionLog] = {}
+
+    def gameIds(self) -> list[str]:
+        return sorted(path.name for path in self._root.iterdir() if (path / SNAPSHOT).exists())
+
+    def _directory(self, gameId: str) -> Path:
+        if not gameId or "/" in gameId or gameId.startswith("."):
+            raise ValueError(f"Invalid game id {gameId!r}")
+        return self._root / gameId
+
+    def start(self, gameId: str, game: Game, seeds: Optional[GameSeeds] = None) -> None:
+        """Starts logging a game (a new one or a recovered one) dealt with `seeds`, if given."""
+        directory = self._directory(gameId)
+        directory.mkdir(exist_ok=True)
+        if seeds is not None and not (directory / SEEDS).exists():
+            temporary = directory / (SEEDS + ".tmp")
+            temporary.write_text(json.dumps(seeds.toJson()), encoding="utf-8")
+            os.replace(temporary, directory / SEEDS)
+        log = ActionLog(directory / LOG, self._batchSize)
+        self._logs[gameId] = log
+        if not (directory / SNAPSHOT).exists():
+            self._snapshot(gameId, game)
+        if log.count == 0 and not (directory / START).exists():
+            self._snapshot(gameId, game, START)
+
+    def apply(self, gameId: str, game: Game, playerId: int, action: Action) -> bool:
+        """Plays the action and logs it if the game accepted it."""
+        if not action.apply(game, playerId):
+            return False
+        self.record(gameId, game, playerId, action)
+        return True
+
+    def record(self, gameId: str, game: Game, playerId: int, action: Action) -> None:
+        """Logs an action already accepted by `game`."""
+        log = self._logs[gameId]
+        log.append(playerId, action)
+        if log.count % self._snapshotEvery == 0:
+            self._snapshot(gameId, game)
+        if time.monotonic() - self._lastSync >= self._fsyncInterval:
+            self.flush(sync=True)
+
+    def _snapshot(self, gameId: str, game: Game, name: str = SNAPSHOT) -> None:
+        log = self._logs[gameId]
+        log.flush(sync=True)        # the snapshot must not be ahead of the log
+        directory = self._directory(gameId)
+        temporary = directory / (name + ".tmp")
+        with open(temporary, "wb") as file:
+            file.write(_SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, log.count))
+            file.write(self._codec.encode(game) if self._codec is not None else encodeSnapshot(game))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, directory / name)
+
+    def flush(self, sync: bool = True) -> None:
+        for log in self._logs.values():
+            log.flush(sync)
+        if sync:
+            self._lastSync = time.monotonic()
+
+    def finish(self, gameId: str) -> None:
+        """Stops logging the game, its files stay."""
+        log = self._logs.pop(gameId, None)
+        if log is not None:
+            log.close()
+
+    def close(self) -> None:
+        for gameId in list(self._logs):
+            self.finish(gameId)
+
+    def seeds(self, gameId: str) -> Optional[GameSeeds]:
+        """Seeds the game was started with, None if they were not recorded."""
+        path = self._directory(gameId) / SEEDS
+        if not path.exists():
+            return None
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError as error:
+            raise ValueError(f"Corrupted {path}: {error}") from error
+        return GameSeeds.fromJson(data)
+
+    def recover(self, gameId: str) -> Game:
+        """The game as of its last logged action."""
+        directory = self._directory(gameId)
+        game, count = loadSnapshot(directory / SNAPSHOT, self._codec)
+        for playerId, action in iterLog(directory / LOG, count):
+            if not action.apply(game, playerId):
+                raise ValueError(f"Logged action {action} of player {playerId} was rejected on replay")
+        return game
+
+    def recoverAll(self) -> dict[str, Game]:
+        return {gameId: self.recover(gameId) for gameId in self.gameIds()}
+
@@ -1,5 +1,77 @@
-from terra_futura.interfaces import InterfacePile
+from __future__ import annotations
+import json
+import random
+from typing import Any, List, Optional
+from terra_futura.interfaces import InterfacePile, InterfaceCard
 
 class Pile(InterfacePile):
-    def __init__(self) -> None:
-        pass
\ No newline at end of file
+    """
+    Four visible cards (1 is the newest, 4 the oldest) and a stack of hidden cards.
+
+    Whenever a visible card is taken or the oldest one is discarded, the top
+    hidden card becomes the newest visible card. Hidden cards are shuffled with
+    `rng`, pass a seeded random.Random to control the order (or None to keep
+    the given order, the last card is on top).
+    """
+    VISIBLE = 4
+    __slots__ = ("_visible", "_hidden", "_discarded")
+
+    def __init__(self, visibleCards: List[InterfaceCard], hiddenCards: List[InterfaceCard],
+                 rng: Optional[random.Random] = None) -> None:
+        if len(visibleCards) > self.VISIBLE:
+            raise ValueError("At most four visible cards")
+        self._visible: List[InterfaceCard] = visibleCards.copy()
+        self._hidden: List[InterfaceCard] = hiddenCards.copy()
+        if rng is not None:
+            rng.shuffle(self._hidden)
+        self._discarded: List[InterfaceCard] = []
+
+    @property
+    def visibleCards(self) -> List[InterfaceCard]:
+        return self._visible.copy()
+
+    @property
+    def hiddenCount(self) -> int:
+        return len(self._hidden)
+
+    def clone(self, rng: Optional[random.Random] = None) -> Pile:
+        """Copy with copied cards, hidden cards are reshuffled with `rng` if given."""
+        pile = Pile([card.clone() for card in self._visible], [card.clone() for card in self._hidden], rng)
+        pile._discarded = self._discarded.copy()
+        return pile
+
+    def reset(self, cards: List[InterfaceCard]) -> None:
+        """Deals `cards` again (the first four face up), reusing the pile's lists."""
+        self._visible.clear()
+        self._visible.extend(cards[:self.VISIBLE])
+        self._hidden.clear()
+        self._hidden.extend(cards[self.VISIBLE:])
+        self._discarded.clear()
+
+    def getCard(self, index: int) -> Optional[InterfaceCard]:
+        if index < 1 or index > len(self._visible):
+            return None
+        return self._visible[index - 1]
+
+    def _draw(self) -> None:
+        if self._hidden:
+            self._visible.insert(0, self._hidden.pop())
+
+    def takeCard(self, index: int) -> None:
+        if self.getCard(index) is None:
+            raise ValueError(f"No visible card with index {index}")
+        del self._visible[index - 1]
+        self._draw()
+
+    def removeLastCard(self) -> None:
+        if not self._visible:
+            raise ValueError("No visible card to discard")
+        self._discarded.append(self._visible.pop())
+        self._draw()
+
+    def state(self) -> str:
+        state: Any = {
+            "visible": [card.state() for card in self._visible],
+            "hidden": len(self._hidden),
+        }
+        return json.dumps(state)
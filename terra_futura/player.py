@@ -2,9 +2,9 @@ from dataclasses import dataclass
 from .activation_pattern import ActivationPattern
 from .scoring_method import ScoringMethod
 from .grid import Grid
-from .interfaces import PlayerInterface
+from .interfaces import PlayerInterface, InterfaceCard
 
-@dataclass
+@dataclass(slots=True)
 class Player(PlayerInterface):
     id: int
     activation_patterns: list[ActivationPattern]
@@ -20,3 +20,18 @@ class Player(PlayerInterface):
         
     def getGrid(self) -> Grid:
         return self.grid
+
+    def reset(self) -> None:
+        """Empty grid, unselected patterns and scorings, for reuse in another game."""
+        self.grid.reset()
+        for pattern in self.activation_patterns:
+            pattern.reset()
+        for method in self.scoring_methods:
+            method.reset()
+        self.hasBeenAssisted = False
+
+    def clone(self, cards: dict[int, InterfaceCard]) -> "Player":
+        """Copy with its own grid, `cards` collects id(original card) -> copy."""
+        grid = self.grid.clone(cards)
+        return Player(self.id, [pattern.clone(grid) for pattern in self.activation_patterns],
+                      [method.clone(grid) for method in self.scoring_methods], grid, self.hasBeenAssisted)
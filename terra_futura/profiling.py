@@ -0,0 +1,175 @@
+"""
+Sampling profiler for simulations.
+
+StackSampler runs a thread that reads the stack of the profiled thread every
+`interval` seconds (sys._current_frames(), so the profiled code runs
+untraced at full speed). Samples are kept as collapsed stacks, the format of
+flamegraph.pl, inferno and speedscope:
+
+    terra_futura.tournament:playGame;terra_futura.game:Game.legalActions 42
+
+Profiles are plain counts, so profiles of pool workers are merged by adding
+them up. table() ranks the functions of a package by self time, where time
+spent in code outside the package (Counter, json, ...) is charged to the
+innermost package function that called it: the cost of Counter construction
+in Card.canGetResources or of json.dumps in Card.state shows up on those
+functions.
+
+    python -m terra_futura.tournament random --games 20 --profile stacks.txt
+"""
+from __future__ import annotations
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Optional, Union
+
+_LABELS: dict[CodeType, str] = {}
+
+
+def _label(frame: FrameType) -> str:
+    code = frame.f_code
+    label = _LABELS.get(code)
+    if label is None:
+        name = getattr(code, "co_qualname", code.co_name)     # co_qualname is new in Python 3.11
+        label = _LABELS[code] = f"{frame.f_globals.get('__name__', '?')}:{name}"
+    return label
+
+
+@dataclass(frozen=True)
+class ProfileRow:
+    function: str
+    selfSeconds: float
+    totalSeconds: float
+    selfShare: float
+
+
+@dataclass
+class Profile:
+    samples: int = 0
+    seconds: float = 0.0        # wall time covered by the samples
+    stacks: dict[str, int] = field(default_factory=dict)       # collapsed stack -> samples
+
+    def merge(self, other: Profile) -> None:
+        self.samples += other.samples
+        self.seconds += other.seconds
+        for stack, count in other.stacks.items():
+            self.stacks[stack] = self.stacks.get(stack, 0) + count
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+    def writeCollapsed(self, path: Union[str, Path]) -> None:
+        Path(path).write_text(self.collapsed(), encoding="utf-8")
+
+    def table(self, prefix: str = "terra_futura.", top: int = 20) -> list[ProfileRow]:
+        """The `top` functions of modules starting with `prefix`, most self time first."""
+        perSample = self.seconds / self.samples if self.samples else 0.0
+        selfCounts: dict[str, int] = {}
+        totalCounts: dict[str, int] = {}
+        for stack, count in self.stacks.items():
+            frames = [frame for frame in stack.split(";") if frame.startswith(prefix)]
+            if not frames:
+                continue
+            selfCounts[frames[-1]] = selfCounts.get(frames[-1], 0) + count
+            for frame in set(frames):       # recursion counts once
+                totalCounts[frame] = totalCounts.get(frame, 0) + count
+        ranked = sorted(selfCounts.items(), key=lambda item: (-item[1], item[0]))[:top]
+        return [ProfileRow(function, count * perSample, totalCounts[function] * perSample,
+                           count / self.samples) for function, count in ranked]
+
+    def formatTable(self, prefix: str = "terra_futura.", top: int = 20) -> str:
+        lines = [f"{self.samples} samples, {self.seconds:.2f} s",
+                 f"{'self s':>9} {'self %':>7} {'total s':>9}  function"]
+        for row in self.table(prefix, top):
+            lines.append(f"{row.selfSeconds:9.3f} {100 * row.selfShare:6.1f}% {row.totalSeconds:9.3f}  {row.function}")
+        return "\n".join(lines)
+
+
+class StackSampler:
+    """
+    Samples the thread that starts it until stop(), usable as a context
+    manager. Stacks begin at the function that called start() (or holds the
+    with statement), the frames above it are left out. While sampling, the
+    interpreter's switch interval is lowered to `interval` (the default of
+    5 ms would otherwise keep the sampler waiting for the GIL).
+    """
+
+    def __init__(self, interval: float = 0.001, profile: Optional[Profile] = None) -> None:
+        if interval <= 0:
+            raise ValueError("Interval must be positive")
+        self.interval = interval
+        self.profile = profile if profile is not None else Profile()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._target = 0
+        self._base = 0
+        self._started = 0.0
+        self._switchInterval = 0.0
+        self._stopping = False
+
+    def start(self) -> None:
+        self._start(sys._getframe(1))
+
+    def _start(self, caller: Optional[FrameType]) -> None:
+        if self._thread is not None:
+            raise RuntimeError("Sampler already running")
+        self._base = 0
+        while caller is not None:
+            self._base += 1
+            caller = caller.f_back
+        self._stopping = False
+        self._target = threading.get_ident()
+        self._stop.clear()
+        self._switchInterval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switchInterval, self.interval))
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Profile:
+        if self._thread is None:
+            return self.profile
+        self._stopping = True
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        sys.setswitchinterval(self._switchInterval)
+        self.profile.seconds += time.perf_counter() - self._started
+        return self.profile
+
+    def __enter__(self) -> StackSampler:
+        self._start(sys._getframe(1))
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        stacks = self.profile.stacks
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            labels: list[str] = []
+            inSampler = False
+            while frame is not None:
+                inSampler = inSampler or frame.f_code in _SAMPLER_CODE
+                labels.append(_label(frame))
+                frame = frame.f_back
+            del frame
+            if self._stopping:
+                break
+            if inSampler:           # the thread is still starting or already stopping the sampler
+                continue
+            # only the caller of start() is kept of the outermost frames
+            labels = labels[:max(0, len(labels) - self._base + 1)]
+            if not labels:
+                continue
+            stack = ";".join(reversed(labels))
+            stacks[stack] = stacks.get(stack, 0) + 1
+            self.profile.samples += 1
+
+
+_SAMPLER_CODE = frozenset(method.__code__ for method in (StackSampler.start, StackSampler._start, StackSampler.stop,
+                                                         StackSampler.__enter__, StackSampler.__exit__))
@@ -9,7 +9,17 @@ from terra_futura.simple_types import Resource, Points, GridPosition
 from typing import Optional
 from terra_futura.interfaces import InterfaceGrid
 
+BASE_SCORES: dict[Resource, int] = {Resource.RED: 1,
+                                    Resource.GREEN: 1,
+                                    Resource.YELLOW: 1,
+                                    Resource.CONSTRUCTION: 5,
+                                    Resource.FOOD: 5,
+                                    Resource.GOODS: 6,
+                                    Resource.POLLUTION: 0,
+                                    Resource.MONEY: 0}
+
 class ScoringMethod:
+    __slots__ = ("resources", "pointsPerCombination", "calculatedTotal", "grid")
     resources: list[Resource]
     pointsPerCombination: Points
     calculatedTotal: Optional[Points]
@@ -21,16 +31,17 @@ class ScoringMethod:
         self.calculatedTotal = None
         self.grid = grid
 
+    def clone(self, grid: InterfaceGrid) -> "ScoringMethod":
+        method = ScoringMethod(self.resources, self.pointsPerCombination, grid)
+        method.calculatedTotal = self.calculatedTotal
+        return method
+
+    def reset(self) -> None:
+        self.calculatedTotal = None
+
     def selectThisMethodAndCalculate(self) -> None:
         resources = {resource: 0 for resource in Resource}
-        baseScores = {Resource.RED: 1,
-                      Resource.GREEN: 1,
-                      Resource.YELLOW: 1,
-                      Resource.CONSTRUCTION: 5,
-                      Resource.FOOD: 5,
-                      Resource.GOODS: 6,
-                      Resource.POLLUTION: 0,
-                      Resource.MONEY: 0}
+        baseScores = BASE_SCORES
         calculatedTotal = 0
 
         for row in range(-2, 3):
@@ -0,0 +1,59 @@
+"""
+Reproducible random streams for batches of simulated games.
+
+Game `index` of a batch with seed `seed` gets the seed sequence
+np.random.SeedSequence(seed, spawn_key=(index,)). Its children seed one
+random.Random per deck (shuffling that pile) and one per seat (for the bot
+playing it). A child only depends on the root and its position, so any game
+of a batch, and each of its streams, can be rebuilt from (seed, index) on
+any worker without generating the games before it. The derived seeds are
+plain integers, GameJournal keeps them next to the log of the game.
+"""
+from __future__ import annotations
+import random
+from dataclasses import dataclass
+from typing import Any
+import numpy as np
+from .simple_types import Deck
+
+_DECKS = tuple(Deck)
+
+
+def streamSeed(sequence: np.random.SeedSequence) -> int:
+    """Seed for random.Random from a seed sequence (128 bits of its state)."""
+    return int.from_bytes(sequence.generate_state(4, np.uint32).tobytes(), "little")
+
+
+@dataclass(frozen=True)
+class GameSeeds:
+    seed: int
+    index: int
+    piles: dict[Deck, int]
+    bots: tuple[int, ...]       # by seat
+
+    @classmethod
+    def derive(cls, seed: int, index: int, seats: int) -> GameSeeds:
+        """Streams of game `index` of the batch: the decks come first, so they do not depend on `seats`."""
+        children = np.random.SeedSequence(seed, spawn_key=(index,)).spawn(len(_DECKS) + seats)
+        return cls(seed, index, {deck: streamSeed(child) for deck, child in zip(_DECKS, children)},
+                   tuple(streamSeed(child) for child in children[len(_DECKS):]))
+
+    def pileRngs(self) -> dict[Deck, random.Random]:
+        """Fresh shuffling streams for GamePool.acquire()."""
+        return {deck: random.Random(seed) for deck, seed in self.piles.items()}
+
+    def botRng(self, seat: int) -> random.Random:
+        return random.Random(self.bots[seat])
+
+    def toJson(self) -> dict[str, Any]:
+        return {"seed": self.seed, "index": self.index,
+                "piles": {deck.name: seed for deck, seed in self.piles.items()}, "bots": list(self.bots)}
+
+    @classmethod
+    def fromJson(cls, data: dict[str, Any]) -> GameSeeds:
+        try:
+            return cls(int(data["seed"]), int(data["index"]),
+                       {Deck[name]: int(seed) for name, seed in data["piles"].items()},
+                       tuple(int(seed) for seed in data["bots"]))
+        except (KeyError, TypeError, AttributeError) as error:
+            raise ValueError(f"Invalid game seeds: {error!r}") from error
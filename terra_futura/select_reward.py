@@ -0,0 +1,63 @@
+from __future__ import annotations
+import json
+from typing import Any, List, Optional
+from terra_futura.interfaces import InterfaceSelectReward, InterfaceCard
+from terra_futura.simple_types import Resource
+
+class SelectReward(InterfaceSelectReward):
+    """
+    Reward of the assisting player: one resource out of `reward`,
+    put on the assisting card.
+    """
+
+    def __init__(self) -> None:
+        self._player: int = -1
+        self._card: Optional[InterfaceCard] = None
+        self._selection: List[Resource] = []
+
+    @property
+    def player(self) -> int:
+        return self._player
+
+    @property
+    def selection(self) -> List[Resource]:
+        return self._selection.copy()
+
+    def clone(self, cards: dict[int, InterfaceCard]) -> SelectReward:
+        """Copy that rewards the copy of the card (`cards` maps id(original) -> copy)."""
+        selectReward = SelectReward()
+        selectReward._player = self._player
+        selectReward._card = None if self._card is None else cards.get(id(self._card), self._card)
+        selectReward._selection = self._selection.copy()
+        return selectReward
+
+    def reset(self) -> None:
+        self._player = -1
+        self._card = None
+        self._selection = []
+
+    def setReward(self, player: int, card: InterfaceCard, reward: List[Resource]) -> None:
+        self._player = player
+        self._card = card
+        self._selection = reward.copy()
+
+    def canSelectReward(self, resource: Resource) -> bool:
+        if self._card is None or resource not in self._selection:
+            return False
+        return self._card.canPutResources([resource])
+
+    def selectReward(self, resource: Resource) -> None:
+        if not self.canSelectReward(resource):
+            raise ValueError(f"Cannot select {resource}")
+        assert self._card is not None
+        self._card.putResources([resource])
+        self._player = -1
+        self._card = None
+        self._selection = []
+
+    def state(self) -> str:
+        state: Any = {
+            "player": self._player,
+            "selection": [resource.name for resource in self._selection],
+        }
+        return json.dumps(state)
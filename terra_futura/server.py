@@ -0,0 +1,302 @@
+"""
+Asyncio server hosting many games, one JSON object per line in each direction.
+
+Requests carry an "id" echoed in the reply and an "op":
+
+    {"id": 1, "op": "create", "players": 2, "seed": 7}       -> {"table": 1}
+    {"id": 2, "op": "join", "table": 1, "player": 1}          -> subscribes to the player's state
+    {"id": 3, "op": "legalActions", "table": 1}               -> {"player": 1, "actions": [...]}
+    {"id": 4, "op": "takeCard", "table": 1, "player": 1, "deck": "LEVEL_I",
+     "cardIndex": 2, "destination": [0, 0]}
+    {"id": 5, "op": "close", "table": 1}
+
+The other ops are the TerraFuturaInterface methods with their arguments as
+fields: discardLastCardFromDeck (deck), activateCard (card, inputs, outputs,
+pollution, otherPlayerId, otherCard), activateCardAutoPay (card, option),
+selectReward (resource), turnFinished, selectActivationPattern (card),
+selectScoring (card). Positions are [x, y], resources and decks are names,
+inputs/outputs are [[resource, [x, y]], ...]. Replies are
+{"id": .., "ok": true, "result": .., "state": <GameState name>} or
+{"id": .., "ok": false, "error": ..}. Observed states arrive as
+{"event": "state", "table": .., "player": .., "time": <unix time sent>, "state": {...}}.
+
+Every table is an actor (AsyncGame): a task that owns the Game and runs its
+commands one after another, so the game needs no locks and commands of one
+table keep their order while tables interleave freely. Observed states are
+sent by the observer's delivery task, off the command path.
+"""
+from __future__ import annotations
+import asyncio
+import json
+import random
+import time
+from typing import Any, Callable, Optional
+from .simple_types import CardSource, Deck, GridPosition, Resource
+from .interfaces import GameObserverInterface, TerraFuturaObserverInterface
+from .game import Game
+from .async_game import AsyncGame, AsyncGameObserver
+from .actions import Action, ActionKind
+from .factories import CardCatalog, GamePool
+
+GameFactory = Callable[[int, random.Random, GameObserverInterface], Game]
+GameRelease = Callable[[Game], None]
+Command = Callable[[Game], Any]
+
+
+def _position(value: Any) -> GridPosition:
+    x, y = value
+    return GridPosition(int(x), int(y))
+
+
+def _optionalPosition(value: Any) -> Optional[GridPosition]:
+    return None if value is None else _position(value)
+
+
+def _placed(values: Any) -> list[tuple[Resource, GridPosition]]:
+    return [(Resource[resource], _position(position)) for resource, position in values]
+
+
+def _command(request: dict[str, Any]) -> Command:
+    """The call of the game method named by the request."""
+    op = request["op"]
+    player = int(request["player"])
+    if op == "takeCard":
+        deck = Deck[request["deck"]]
+        index = int(request["cardIndex"])
+        destination = _position(request["destination"])
+        return lambda game: game.takeCard(player, CardSource(deck, index), index, destination)
+    if op == "discardLastCardFromDeck":
+        deck = Deck[request["deck"]]
+        return lambda game: game.discardLastCardFromDeck(player, deck)
+    if op == "activateCard":
+        card = _position(request["card"])
+        inputs, outputs = _placed(request.get("inputs", [])), _placed(request.get("outputs", []))
+        pollution = [_position(position) for position in request.get("pollution", [])]
+        otherPlayer = request.get("otherPlayerId")
+        otherCard = _optionalPosition(request.get("otherCard"))
+        return lambda game: game.activateCard(player, card, inputs, outputs, pollution,
+                                              None if otherPlayer is None else int(otherPlayer), otherCard)
+    if op == "activateCardAutoPay":
+        card = _position(request["card"])
+        option = int(request.get("option", 0))
+        return lambda game: game.activateCardAutoPay(player, card, option)
+    if op == "selectReward":
+        resource = Resource[request["resource"]]
+        return lambda game: game.selectReward(player, resource)
+    if op == "turnFinished":
+        return lambda game: game.turnFinished(player)
+    if op == "selectActivationPattern":
+        pattern = int(request["card"])
+        return lambda game: game.selectActivationPattern(player, pattern)
+    if op == "selectScoring":
+        scoring = int(request["card"])
+        return lambda game: game.selectScoring(player, scoring)
+    raise ValueError(f"Unknown op {op}")
+
+
+def actionRequest(action: Action, table: int, player: int) -> dict[str, Any]:
+    """Request performing a legal action (see the legalActions op)."""
+    request: dict[str, Any] = {"table": table, "player": player}
+    if action.kind == ActionKind.TakeCard:
+        assert action.deck is not None and action.position is not None
+        request.update(op="takeCard", deck=action.deck.name, cardIndex=action.cardIndex,
+                       destination=[action.position.x, action.position.y])
+    elif action.kind == ActionKind.DiscardLastCard:
+        assert action.deck is not None
+        request.update(op="discardLastCardFromDeck", deck=action.deck.name)
+    elif action.kind == ActionKind.ActivateCard:
+        assert action.position is not None
+        request.update(op="activateCardAutoPay", card=[action.position.x, action.position.y],
+                       option=action.option)
+    elif action.kind == ActionKind.SelectReward:
+        assert action.resource is not None
+        request.update(op="selectReward", resource=action.resource.name)
+    elif action.kind == ActionKind.TurnFinished:
+        request.update(op="turnFinished")
+    elif action.kind == ActionKind.SelectActivationPattern:
+        request.update(op="selectActivationPattern", card=action.cardIndex)
+    elif action.kind == ActionKind.SelectScoring:
+        request.update(op="selectScoring", card=action.cardIndex)
+    else:
+        raise ValueError(f"Cannot request {action.kind}")
+    return request
+
+
+class Table(AsyncGame):
+    """Game hosted by the server, its observer is wired to connections."""
+
+    def __init__(self, tableId: int, game: Game, observer: AsyncGameObserver) -> None:
+        super().__init__(game, observer)
+        self.id = tableId
+        self.tableObserver = observer
+
+
+class ConnectionObserver(TerraFuturaObserverInterface):
+    """Forwards the states of one player at one table to a connection."""
+
+    def __init__(self, connection: Connection, table: int, player: int) -> None:
+        self._connection = connection
+        self._table = table
+        self._player = player
+
+    def notify(self, game_state: str) -> None:
+        self._connection.send({"event": "state", "table": self._table, "player": self._player,
+                               "time": time.time(), "state": json.loads(game_state)})
+
+
+class Connection:
+    """Client connection, replies and notifications are written by one writer task."""
+
+    def __init__(self, writer: asyncio.StreamWriter) -> None:
+        self._writer = writer
+        self._outbox: asyncio.Queue[Optional[bytes]] = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._write())
+        self.subscriptions: list[tuple[Table, int, ConnectionObserver]] = []
+
+    def send(self, message: dict[str, Any]) -> None:
+        self._outbox.put_nowait(json.dumps(message).encode() + b"\n")
+
+    async def _write(self) -> None:
+        while True:
+            line = await self._outbox.get()
+            if line is None:
+                return
+            self._writer.write(line)
+            if self._outbox.empty():
+                try:
+                    await self._writer.drain()
+                except ConnectionError:
+                    return
+
+    async def close(self) -> None:
+        for table, player, observer in self.subscriptions:
+            table.tableObserver.unsubscribe(player, observer)
+        self._outbox.put_nowait(None)
+        await self._task
+        self._writer.close()
+
+
+class GameServer:
+    """
+    Hosts tables created by clients. `gameFactory(players, rng, observer)` builds
+    a game notifying `observer` and `gameRelease(game)`, if given, is called
+    with the game of every closed table (by default games are dealt from the
+    card catalog by a GamePool and released back to it, so new tables reuse
+    the games of closed ones).
+    """
+
+    def __init__(self, gameFactory: Optional[GameFactory] = None,
+                 gameRelease: Optional[GameRelease] = None) -> None:
+        if gameFactory is None:
+            pool = GamePool(CardCatalog.load())
+            gameFactory, gameRelease = pool.acquire, pool.release
+        self._gameFactory = gameFactory
+        self._gameRelease = gameRelease
+        self._tables: dict[int, Table] = {}
+        self._nextTable = 1
+        self._server: Optional[asyncio.Server] = None
+
+    @property
+    def tables(self) -> dict[int, Table]:
+        return self._tables.copy()
+
+    async def startTcp(self, host: str = "127.0.0.1", port: int = 0) -> asyncio.Server:
+        self._server = await asyncio.start_server(self.handle, host, port)
+        return self._server
+
+    async def startUnix(self, path: str) -> asyncio.Server:
+        self._server = await asyncio.start_unix_server(self.handle, path)
+        return self._server
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for table in list(self._tables.values()):
+            await self.closeTable(table)
+
+    def createTable(self, players: int, seed: Optional[int] = None) -> Table:
+        observer = AsyncGameObserver()
+        table = Table(self._nextTable, self._gameFactory(players, random.Random(seed), observer), observer)
+        self._tables[table.id] = table
+        self._nextTable += 1
+        return table
+
+    async def closeTable(self, table: Table) -> None:
+        """Stops the table and releases its game."""
+        if self._tables.pop(table.id, None) is None:
+            return
+        await table.close()
+        if self._gameRelease is not None:
+            self._gameRelease(table.game)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        connection = Connection(writer)
+        pending: set[asyncio.Task[None]] = set()
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    connection.send({"id": None, "ok": False, "error": "Invalid JSON"})
+                    continue
+                if not isinstance(request, dict):
+                    connection.send({"id": None, "ok": False, "error": "Requests must be JSON objects"})
+                    continue
+                task = asyncio.get_running_loop().create_task(self._reply(connection, request))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+        except ConnectionError:
+            pass
+        except ValueError:          # line longer than the stream limit, the rest cannot be framed
+            connection.send({"id": None, "ok": False, "error": "Request too long"})
+        finally:
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            await connection.close()
+
+    async def _reply(self, connection: Connection, request: dict[str, Any]) -> None:
+        requestId = request.get("id")
+        try:
+            reply = await self._dispatch(connection, request)
+        except (KeyError, TypeError, ValueError) as error:
+            connection.send({"id": requestId, "ok": False, "error": f"{type(error).__name__}: {error}"})
+            return
+        reply["id"] = requestId
+        reply["ok"] = True
+        connection.send(reply)
+
+    async def _dispatch(self, connection: Connection, request: dict[str, Any]) -> dict[str, Any]:
+        op = request["op"]
+        if op == "create":
+            return {"table": self.createTable(int(request["players"]), request.get("seed")).id}
+        table = self._tables.get(int(request["table"]))
+        if table is None:
+            raise KeyError(f"No table {request['table']}")
+        if op == "join":
+            player = int(request["player"])
+            observer = ConnectionObserver(connection, table.id, player)
+            table.tableObserver.subscribe(player, observer)
+            connection.subscriptions.append((table, player, observer))
+            return {}
+        if op == "close":
+            await self.closeTable(table)
+            return {}
+        if op == "legalActions":
+            player, actions = await table.call(lambda game: (game.actingPlayerId, game.legalActions()))
+            return {"player": player,
+                    "actions": [actionRequest(action, table.id, player) for action in actions]}
+        command = _command(request)
+        result, state = await table.call(lambda game: (command(game), game.state))
+        return {"result": result, "state": state.name}
+
+
+async def serve(host: str = "127.0.0.1", port: int = 8765) -> None:
+    server = GameServer()
+    listening = await server.startTcp(host, port)
+    async with listening:
+        await listening.serve_forever()
+
+
+if __name__ == "__main__":
+    asyncio.run(serve())
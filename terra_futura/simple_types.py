@@ -3,6 +3,7 @@ from enum import Enum, auto
 from dataclasses import dataclass
 
 class GridPosition:
+    __slots__ = ("_x", "_y")
     _x: int
     _y: int
 
@@ -66,4 +67,10 @@ class GameState(Enum):
     SelectReward = auto()
     SelectActivationPattern = auto()
     SelectScoringMethod = auto()
-    Finish = auto()
\ No newline at end of file
+    Finish = auto()
+
+@dataclass(frozen=True)
+class GameConfig:
+    rounds: int = 9
+    minPlayers: int = 2
+    maxPlayers: int = 4
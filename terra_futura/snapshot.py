@@ -0,0 +1,275 @@
+"""
+Compact binary snapshots of whole games.
+
+Layout (little endian, version 1):
+
+    header   "TFGS", version, rounds, min players, max players, GameState,
+             player on turn, turn number (H), assistance used, player count
+    player   id, assisted, 2x pattern (length | selected << 7, cells),
+             2x scoring (length | has total << 7, resources, points H, [total h])
+    grid     placeable cells (I), cells with activations (I), allowed << 4 |
+             activated for each of those, card count, then the cards in the
+             order they were placed (payments look at them in that order):
+             cell, template id (H), pollution, resource count, the resources
+             in their order (AutoPay pays in it) two per byte
+    pile     per deck: visible, hidden (H), discarded (H) counts, template ids (H)
+    reward   player (b), owner index and cell of the rewarded card (0xFF if
+             none), selection length, resources
+
+Cells are numbered (x + 2) * 5 + (y + 2), resources and states by their
+position in the enums. Cards are referenced by CardTemplate.signatureId, so a
+game encodes only if all its cards come from a CardCatalog, and decodes with
+the same catalog. Cards in piles are always in their initial state and are
+stored as template ids. Like Game.clone() the codec reads and writes the
+internals of the game objects.
+"""
+from __future__ import annotations
+import struct
+from typing import Optional
+from .simple_types import Deck, GameConfig, GameState, GridPosition, Points, Resource
+from .interfaces import GameObserverInterface, InterfaceCard, InterfacePile
+from .card import Card, CardTemplate
+from .grid import Grid
+from .pile import Pile
+from .activation_pattern import ActivationPattern
+from .scoring_method import ScoringMethod
+from .player import Player
+from .select_reward import SelectReward
+from .game import Game
+from .game_observer import GameObserver
+from .move_card import MoveCard
+from .process_action import ProcessAction
+from .process_action_assistance import ProcessActionAssistance
+from .factories import CardCatalog
+
+MAGIC = b"TFGS"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sBBBBBBHBB")
+_H = struct.Struct("<H")
+_h = struct.Struct("<h")
+_GRID = struct.Struct("<II")
+_PILE = struct.Struct("<BHH")
+_REWARD = struct.Struct("<bBBB")
+_NONE = 0xFF
+
+_STATES = tuple(GameState)
+_STATE_INDEX = {state: index for index, state in enumerate(_STATES)}
+_RESOURCES = tuple(Resource)
+_RESOURCE_INDEX = {resource: index for index, resource in enumerate(_RESOURCES)}
+_DECKS = tuple(Deck)
+_CELLS = tuple(GridPosition(x, y) for x in range(-2, 3) for y in range(-2, 3))
+
+
+def _cell(position: GridPosition) -> int:
+    return (position.x + 2) * 5 + position.y + 2
+
+
+def _templateId(card: InterfaceCard) -> int:
+    if not isinstance(card, Card) or card.template is None:
+        raise ValueError("Only cards dealt from a CardCatalog can be encoded")
+    return card.template.signatureId
+
+
+class GameCodec:
+    """Encodes games built from `catalog` and decodes them into new games."""
+
+    def __init__(self, catalog: CardCatalog) -> None:
+        self._templates: dict[int, CardTemplate] = {
+            template.signatureId: template for deck in catalog.decks for template in catalog.templates(deck)}
+
+    def encode(self, game: Game) -> bytes:
+        config = game.config
+        players = game._players
+        out = bytearray(_HEADER.pack(MAGIC, VERSION, config.rounds, config.minPlayers, config.maxPlayers,
+                                     _STATE_INDEX[game._state], game._onTurn, game._turnNumber,
+                                     game._assistanceUsed, len(players)))
+        for player in players:
+            self._encodePlayer(out, player)
+        for deck in _DECKS:
+            self._encodePile(out, game._piles[deck])
+        self._encodeReward(out, game)
+        return bytes(out)
+
+    @staticmethod
+    def _encodePlayer(out: bytearray, player: Player) -> None:
+        out.append(player.id)
+        out.append(player.hasBeenAssisted)
+        for pattern in player.activation_patterns:
+            out.append(len(pattern._pattern) | pattern._selected << 7)
+            out.extend(_cell(position) for position in pattern._pattern)
+        for method in player.scoring_methods:
+            total = method.calculatedTotal
+            out.append(len(method.resources) | (total is not None) << 7)
+            out.extend(_RESOURCE_INDEX[resource] for resource in method.resources)
+            out += _H.pack(method.pointsPerCombination.value)
+            if total is not None:
+                out += _h.pack(total.value)
+
+        grid = player.grid
+        counts = [0] * 25
+        for position, allowed in grid._allowed.items():
+            counts[_cell(position)] |= allowed << 4
+        for position, activated in grid._activated.items():
+            counts[_cell(position)] |= activated
+        placeable = active = 0
+        for position in grid._placeable:
+            placeable |= 1 << _cell(position)
+        for cell, count in enumerate(counts):
+            if count:
+                active |= 1 << cell
+        out += _GRID.pack(placeable, active)
+        if max(grid._allowed.values(), default=0) > 15 or max(grid._activated.values(), default=0) > 15:
+            raise ValueError("Too many activations to encode")
+        out.extend(count for count in counts if count)
+        out.append(len(grid._cards))
+        for position, card in grid._cards.items():
+            out.append(_cell(position))
+            out += _H.pack(_templateId(card))
+            assert isinstance(card, Card)
+            out.append(card._pollution)
+            resources = card.resources
+            out.append(len(resources))
+            for index in range(0, len(resources) - 1, 2):
+                out.append(_RESOURCE_INDEX[resources[index]] | _RESOURCE_INDEX[resources[index + 1]] << 4)
+            if len(resources) % 2:
+                out.append(_RESOURCE_INDEX[resources[-1]])
+
+    @staticmethod
+    def _encodePile(out: bytearray, pile: InterfacePile) -> None:
+        if not isinstance(pile, Pile):
+            raise ValueError("Only Pile can be encoded")
+        out += _PILE.pack(len(pile._visible), len(pile._hidden), len(pile._discarded))
+        for cards in (pile._visible, pile._hidden, pile._discarded):
+            for card in cards:
+                out += _H.pack(_templateId(card))
+                assert isinstance(card, Card)
+                if card.resources or card._pollution:
+                    raise ValueError("Cards in piles have to be in their initial state")
+
+    @staticmethod
+    def _encodeReward(out: bytearray, game: Game) -> None:
+        selectReward = game._selectReward
+        if not isinstance(selectReward, SelectReward):
+            raise ValueError("Only SelectReward can be encoded")
+        owner = cell = _NONE
+        if selectReward._card is not None:
+            for index, player in enumerate(game._players):
+                for position, card in player.grid._cards.items():
+                    if card is selectReward._card:
+                        owner, cell = index, _cell(position)
+            if owner == _NONE:
+                raise ValueError("The rewarded card is not on a grid")
+        out += _REWARD.pack(selectReward._player, owner, cell, len(selectReward._selection))
+        out.extend(_RESOURCE_INDEX[resource] for resource in selectReward._selection)
+
+    def decode(self, data: bytes, gameObserver: Optional[GameObserverInterface] = None,
+               threadSafe: bool = False) -> Game:
+        """New game equal to the encoded one, notifying `gameObserver` (nobody by default)."""
+        try:
+            return self._decode(data, gameObserver, threadSafe)
+        except (struct.error, IndexError, KeyError) as error:
+            raise ValueError(f"Corrupted game snapshot: {error!r}") from error
+
+    def _decode(self, data: bytes, gameObserver: Optional[GameObserverInterface], threadSafe: bool) -> Game:
+        (magic, version, rounds, minPlayers, maxPlayers, state, onTurn, turnNumber, assistanceUsed,
+         playerCount) = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Not a game snapshot")
+        if version != VERSION:
+            raise ValueError(f"Unsupported snapshot version {version}")
+        offset = _HEADER.size
+        players: list[Player] = []
+        for _ in range(playerCount):
+            player, offset = self._decodePlayer(data, offset)
+            players.append(player)
+        piles: dict[Deck, InterfacePile] = {}
+        for deck in _DECKS:
+            piles[deck], offset = self._decodePile(data, offset)
+        selectReward, offset = self._decodeReward(data, offset, players)
+        if offset != len(data):
+            raise ValueError("Trailing data after the game snapshot")
+
+        game = Game(players, piles, MoveCard(), ProcessAction(), ProcessActionAssistance(), selectReward,
+                    gameObserver or GameObserver({}), config=GameConfig(rounds, minPlayers, maxPlayers),
+                    threadSafe=threadSafe)
+        game._state = _STATES[state]
+        game._onTurn = onTurn
+        game._turnNumber = turnNumber
+        game._assistanceUsed = bool(assistanceUsed)
+        return game
+
+    def _decodePlayer(self, data: bytes, offset: int) -> tuple[Player, int]:
+        playerId, assisted = data[offset], data[offset + 1]
+        offset += 2
+        grid = Grid()
+        patterns = []
+        for _ in range(2):
+            length, selected = data[offset] & 0x7F, data[offset] >> 7
+            pattern = ActivationPattern(grid, [_CELLS[cell] for cell in data[offset + 1:offset + 1 + length]])
+            pattern._selected = bool(selected)
+            patterns.append(pattern)
+            offset += 1 + length
+        methods = []
+        for _ in range(2):
+            length, hasTotal = data[offset] & 0x7F, data[offset] >> 7
+            resources = [_RESOURCES[index] for index in data[offset + 1:offset + 1 + length]]
+            offset += 1 + length
+            method = ScoringMethod(resources, Points(_H.unpack_from(data, offset)[0]), grid)
+            offset += _H.size
+            if hasTotal:
+                method.calculatedTotal = Points(_h.unpack_from(data, offset)[0])
+                offset += _h.size
+            methods.append(method)
+
+        placeable, active = _GRID.unpack_from(data, offset)
+        offset += _GRID.size
+        grid._placeable = {_CELLS[cell] for cell in range(25) if placeable >> cell & 1}
+        for cell in range(25):
+            if active >> cell & 1:
+                if data[offset] >> 4:
+                    grid._allowed[_CELLS[cell]] = data[offset] >> 4
+                if data[offset] & 0x0F:
+                    grid._activated[_CELLS[cell]] = data[offset] & 0x0F
+                offset += 1
+        count = data[offset]
+        offset += 1
+        for _ in range(count):
+            cell = data[offset]
+            card = Card.fromTemplate(self._templates[_H.unpack_from(data, offset + 1)[0]])
+            card._pollution = data[offset + 3]
+            length = data[offset + 4]
+            offset += 5
+            resources = card.resources
+            for packed in data[offset:offset + (length + 1) // 2]:
+                resources.append(_RESOURCES[packed & 0x0F])
+                resources.append(_RESOURCES[packed >> 4])
+            del resources[length:]
+            offset += (length + 1) // 2
+            grid._cards[_CELLS[cell]] = card
+        return Player(playerId, patterns, methods, grid, bool(assisted)), offset
+
+    def _decodePile(self, data: bytes, offset: int) -> tuple[Pile, int]:
+        counts = _PILE.unpack_from(data, offset)
+        offset += _PILE.size
+        lists: list[list[InterfaceCard]] = []
+        for count in counts:
+            templates = struct.unpack_from(f"<{count}H", data, offset)
+            lists.append([Card.fromTemplate(self._templates[template]) for template in templates])
+            offset += count * _H.size
+        pile = Pile(lists[0], lists[1])
+        pile._discarded = lists[2]
+        return pile, offset
+
+    @staticmethod
+    def _decodeReward(data: bytes, offset: int, players: list[Player]) -> tuple[SelectReward, int]:
+        player, owner, cell, length = _REWARD.unpack_from(data, offset)
+        offset += _REWARD.size
+        selectReward = SelectReward()
+        selectReward._player = player
+        if owner != _NONE:
+            selectReward._card = players[owner].grid.getCard(_CELLS[cell])
+            if selectReward._card is None:
+                raise ValueError("The rewarded card is not on the grid")
+        selectReward._selection = [_RESOURCES[index] for index in data[offset:offset + length]]
+        return selectReward, offset + length
@@ -0,0 +1,159 @@
+from __future__ import annotations
+import functools
+from dataclasses import dataclass
+from enum import Enum, auto
+from typing import Iterable, Optional
+from .simple_types import GameState, GameConfig
+from .actions import ActionKind
+
+
+class TurnPhase(Enum):
+    Regular = auto()     # regular rounds, except the last player of the last one
+    RoundsOver = auto()  # last player of the last regular round
+    Final = auto()       # final activations and scoring
+    FinalOver = auto()   # last player of the final activations / scoring
+
+
+@dataclass(frozen=True)
+class Transition:
+    nextState: GameState
+    advance: bool = False  # the next player is on turn
+
+
+@dataclass(frozen=True)
+class MachineState:
+    state: GameState
+    turnNumber: int
+    onTurn: int
+
+
+_TAKE = (TurnPhase.Regular, TurnPhase.RoundsOver)
+_FINAL = (TurnPhase.Final, TurnPhase.FinalOver)
+_ALL = tuple(TurnPhase)
+
+# (state, action, phases) -> transition
+_RULES: list[tuple[GameState, ActionKind, tuple[TurnPhase, ...], Transition]] = [
+    (GameState.TakeCardNoCardDiscarded, ActionKind.DiscardLastCard, _TAKE,
+     Transition(GameState.TakeCardCardDiscarded)),
+    (GameState.TakeCardNoCardDiscarded, ActionKind.TakeCard, _TAKE, Transition(GameState.ActivateCard)),
+    (GameState.TakeCardCardDiscarded, ActionKind.TakeCard, _TAKE, Transition(GameState.ActivateCard)),
+    (GameState.ActivateCard, ActionKind.ActivateCard, _ALL, Transition(GameState.ActivateCard)),
+    (GameState.ActivateCard, ActionKind.ActivateCardAssistance, _ALL, Transition(GameState.SelectReward)),
+    (GameState.SelectReward, ActionKind.SelectReward, _ALL, Transition(GameState.ActivateCard)),
+    (GameState.ActivateCard, ActionKind.TurnFinished, (TurnPhase.Regular,),
+     Transition(GameState.TakeCardNoCardDiscarded, True)),
+    (GameState.ActivateCard, ActionKind.TurnFinished, (TurnPhase.RoundsOver, TurnPhase.Final),
+     Transition(GameState.SelectActivationPattern, True)),
+    (GameState.ActivateCard, ActionKind.TurnFinished, (TurnPhase.FinalOver,),
+     Transition(GameState.SelectScoringMethod, True)),
+    (GameState.SelectActivationPattern, ActionKind.SelectActivationPattern, _FINAL,
+     Transition(GameState.ActivateCard)),
+    (GameState.SelectScoringMethod, ActionKind.SelectScoring, (TurnPhase.Final,),
+     Transition(GameState.SelectScoringMethod, True)),
+    (GameState.SelectScoringMethod, ActionKind.SelectScoring, (TurnPhase.FinalOver,),
+     Transition(GameState.Finish, True)),
+]
+
+
+class GameStateMachine:
+    """
+    Turn and round logic of the game as precomputed tables.
+
+    The transition table is keyed by (GameState, ActionKind, TurnPhase), the
+    phase of every (turnNumber, player on turn) pair is precomputed from the
+    configured number of rounds and players. The same tables give the action
+    kinds allowed in a state and validate replays of recorded games.
+    """
+
+    def __init__(self, players: int, config: GameConfig = GameConfig()) -> None:
+        if players < config.minPlayers or players > config.maxPlayers:
+            raise ValueError(f"Number of players not in interval {config.minPlayers}..{config.maxPlayers}")
+        self._players = players
+        self._config = config
+        self._rounds = config.rounds
+
+        self._transitions: dict[tuple[GameState, ActionKind, TurnPhase], Transition] = {
+            (state, kind, phase): transition
+            for state, kind, phases, transition in _RULES for phase in phases
+        }
+        self._allowed: dict[GameState, tuple[ActionKind, ...]] = {
+            state: tuple(kind for kind in ActionKind
+                         if any((state, kind, phase) in self._transitions for phase in TurnPhase))
+            for state in GameState
+        }
+        self._allowedPairs = frozenset((state, kind) for state, kinds in self._allowed.items() for kind in kinds)
+
+        last = players - 1
+        self._phases: dict[tuple[int, int], TurnPhase] = {}
+        for turn in range(1, config.rounds + 3):
+            for onTurn in range(players):
+                if turn < config.rounds:
+                    phase = TurnPhase.Regular
+                elif turn == config.rounds:
+                    phase = TurnPhase.RoundsOver if onTurn == last else TurnPhase.Regular
+                else:
+                    phase = TurnPhase.FinalOver if onTurn == last else TurnPhase.Final
+                self._phases[(turn, onTurn)] = phase
+
+    @property
+    def players(self) -> int:
+        return self._players
+
+    @property
+    def config(self) -> GameConfig:
+        return self._config
+
+    @property
+    def rounds(self) -> int:
+        return self._rounds
+
+    def start(self) -> MachineState:
+        return MachineState(GameState.TakeCardNoCardDiscarded, 1, 0)
+
+    def allowedKinds(self, state: GameState) -> tuple[ActionKind, ...]:
+        return self._allowed[state]
+
+    def allows(self, state: GameState, kind: ActionKind) -> bool:
+        return (state, kind) in self._allowedPairs
+
+    def phase(self, turnNumber: int, onTurn: int) -> TurnPhase:
+        return self._phases[(turnNumber, onTurn)]
+
+    def transition(self, state: GameState, kind: ActionKind, turnNumber: int, onTurn: int) -> Optional[Transition]:
+        phase = self._phases.get((turnNumber, onTurn))
+        if phase is None:
+            return None
+        return self._transitions.get((state, kind, phase))
+
+    def step(self, current: MachineState, kind: ActionKind) -> Optional[MachineState]:
+        """State after `kind` is performed in `current`, None if it is not allowed."""
+        transition = self.transition(current.state, kind, current.turnNumber, current.onTurn)
+        if transition is None:
+            return None
+        turnNumber, onTurn = current.turnNumber, current.onTurn
+        if transition.advance:
+            onTurn = (onTurn + 1) % self._players
+            if onTurn == 0:
+                turnNumber += 1
+        return MachineState(transition.nextState, turnNumber, onTurn)
+
+    def replay(self, actions: Iterable[tuple[int, ActionKind]]) -> MachineState:
+        """
+        Validates a recorded sequence of (seat, action) pairs.
+        Raises ValueError at the first action that is out of turn or not allowed.
+        """
+        current = self.start()
+        for number, (seat, kind) in enumerate(actions):
+            if kind not in (ActionKind.SelectReward,) and seat != current.onTurn:
+                raise ValueError(f"Action {number} ({kind.name}) played by seat {seat} out of turn")
+            following = self.step(current, kind)
+            if following is None:
+                raise ValueError(f"Action {number} ({kind.name}) not allowed in {current.state.name}")
+            current = following
+        return current
+
+
+@functools.lru_cache(maxsize=None)
+def sharedMachine(players: int, config: GameConfig = GameConfig()) -> GameStateMachine:
+    """Machines never change after construction, games with the same setup share one."""
+    return GameStateMachine(players, config)
@@ -0,0 +1,323 @@
+"""
+Round-robin tournaments between registered bot policies.
+
+For every player count every ordered choice of distinct entrants (so every
+seating) plays `gamesPerSeating` games. Game `index` is dealt and played
+with the streams of seeding.GameSeeds.derive(seed, index, seats), so
+results do not depend on which worker played the game or in which order,
+and playGame() of the task alone plays it again.
+
+Finished games are appended, with their seeds, to a JSON-lines checkpoint
+(the first line is the tournament setup). Running the same tournament with the same checkpoint
+skips the games already played. Ratings are Bradley-Terry strengths fitted
+to the pairwise results of all finished games (a win for the better final
+score, a draw for equal ones) on the Elo scale, with bootstrap confidence
+intervals over games.
+
+    python -m terra_futura.tournament random mcts [--players 2 3 4] [--games N]
+           [--seed S] [--checkpoint FILE] [--workers N] [--profile FILE [--top N]]
+
+With --profile every game is played under a profiling.StackSampler (in the
+worker that plays it), the merged collapsed stacks are written to FILE and
+the terra_futura functions with the most self time are printed.
+"""
+from __future__ import annotations
+import argparse
+import json
+import math
+import os
+import random
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from itertools import permutations
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional, Sequence, Union
+import numpy as np
+from .simple_types import GameState
+from .game import Game
+from .actions import Action
+from .environment import finalScore
+from .factories import DEFAULT_CATALOG, CardCatalog, GamePool
+from .mcts import MctsPlayer
+from .seeding import GameSeeds
+from .profiling import Profile, StackSampler
+
+Policy = Callable[[Game], Action]
+PolicyFactory = Callable[[random.Random], Policy]
+
+POLICIES: dict[str, PolicyFactory] = {}
+
+
+def registerPolicy(name: str, factory: PolicyFactory) -> None:
+    """
+    Makes `factory(rng)` available as entrant `name`. Worker processes look
+    policies up by name, so register them when a module is imported.
+    """
+    POLICIES[name] = factory
+
+
+def _randomPolicy(rng: random.Random) -> Policy:
+    return lambda game: rng.choice(game.legalActions())
+
+
+def _mctsPolicy(rng: random.Random) -> Policy:
+    player = MctsPlayer(thinkTime=60.0, seed=rng.getrandbits(64), maxIterations=50)
+    return lambda game: player.search(game).action
+
+
+registerPolicy("random", _randomPolicy)
+registerPolicy("mcts", _mctsPolicy)
+
+
+@dataclass(frozen=True)
+class GameTask:
+    index: int
+    seats: tuple[str, ...]
+    seed: int
+    maxActions: int
+    catalog: str = str(DEFAULT_CATALOG)
+
+
+@dataclass(frozen=True)
+class GameResult:
+    index: int
+    seats: tuple[str, ...]
+    scores: tuple[int, ...]
+    finished: bool
+    actions: int
+    seeds: Optional[GameSeeds] = None
+
+
+@dataclass(frozen=True)
+class Rating:
+    name: str
+    elo: float
+    low: float
+    high: float
+    games: int
+
+
+_POOLS: dict[str, GamePool] = {}
+
+
+def playGame(task: GameTask) -> GameResult:
+    """Plays one game of the schedule (worker processes keep one GamePool per catalog)."""
+    pool = _POOLS.get(task.catalog)
+    if pool is None:
+        pool = _POOLS[task.catalog] = GamePool(CardCatalog.load(task.catalog), capacity=8)
+    seeds = GameSeeds.derive(task.seed, task.index, len(task.seats))
+    game = pool.acquire(len(task.seats), seeds.pileRngs())
+    policies = {player.id: POLICIES[name](seeds.botRng(seat))
+                for seat, (player, name) in enumerate(zip(game.players, task.seats))}
+    actions = 0
+    while game.state != GameState.Finish and actions < task.maxActions and game.legalActions():
+        playerId = game.actingPlayerId
+        if not policies[playerId](game).apply(game, playerId):
+            raise ValueError(f"{task.seats} played an illegal action in game {task.index}")
+        actions += 1
+    finished = game.state == GameState.Finish
+    scores = tuple(finalScore(game, player.id) if finished else 0 for player in game.players)
+    pool.release(game)
+    return GameResult(task.index, task.seats, scores, finished, actions, seeds)
+
+
+def _playTask(task: GameTask, interval: Optional[float]) -> tuple[GameResult, Optional[Profile]]:
+    if interval is None:
+        return playGame(task), None
+    with StackSampler(interval) as sampler:
+        result = playGame(task)
+    return result, sampler.profile
+
+
+def fitRatings(results: Sequence[GameResult], names: Sequence[str], iterations: int = 200) -> dict[str, float]:
+    """
+    Bradley-Terry strengths by minorization-maximization, on the Elo scale
+    (400 points are 10:1 odds) with mean 1500. Every entrant gets one virtual
+    draw against an average opponent so unbeaten entrants stay finite.
+    """
+    index = {name: number for number, name in enumerate(names)}
+    count = len(names)
+    wins = np.full(count, 0.5)
+    games = np.zeros((count, count))
+    for result in results:
+        if not result.finished:
+            continue
+        for a in range(len(result.seats)):
+            for b in range(a + 1, len(result.seats)):
+                i, j = index[result.seats[a]], index[result.seats[b]]
+                games[i, j] += 1
+                games[j, i] += 1
+                if result.scores[a] == result.scores[b]:
+                    wins[i] += 0.5
+                    wins[j] += 0.5
+                else:
+                    wins[i if result.scores[a] > result.scores[b] else j] += 1
+    strength = np.ones(count)
+    for _ in range(iterations):
+        denominator = (games / (strength[:, None] + strength[None, :])).sum(axis=1) + 1.0 / (strength + 1.0)
+        strength = wins / denominator
+        strength /= math.exp(float(np.log(strength).mean()))
+    return {name: 1500.0 + 400.0 * math.log10(float(strength[index[name]])) for name in names}
+
+
+def ratings(results: Sequence[GameResult], names: Sequence[str], bootstrap: int = 200,
+            confidence: float = 0.95, seed: int = 0) -> list[Rating]:
+    """Ratings, best first, with percentile bootstrap intervals."""
+    finished = [result for result in results if result.finished]
+    point = fitRatings(finished, names)
+    rng = np.random.default_rng(seed)
+    samples: dict[str, list[float]] = {name: [] for name in names}
+    for _ in range(bootstrap if finished else 0):
+        resampled = [finished[number] for number in rng.integers(0, len(finished), len(finished))]
+        for name, elo in fitRatings(resampled, names).items():
+            samples[name].append(elo)
+    tail = (1.0 - confidence) / 2 * 100
+    table = []
+    for name in names:
+        low, high = (np.percentile(samples[name], [tail, 100 - tail]) if samples[name]
+                     else (point[name], point[name]))
+        played = sum(result.seats.count(name) for result in finished)
+        table.append(Rating(name, point[name], float(low), float(high), played))
+    return sorted(table, key=lambda rating: -rating.elo)
+
+
+class Tournament:
+    """
+    Round robin of `entrants` (names of registered policies) for the given
+    player counts, counts without enough entrants are skipped.
+    """
+
+    def __init__(self, entrants: Sequence[str], playerCounts: Sequence[int] = (2, 3, 4),
+                 gamesPerSeating: int = 1, seed: int = 0, maxActions: int = 2000,
+                 checkpoint: Union[str, Path, None] = None) -> None:
+        unknown = [name for name in entrants if name not in POLICIES]
+        if unknown:
+            raise ValueError(f"Unknown policies {unknown}")
+        if len(set(entrants)) != len(entrants):
+            raise ValueError("Entrants must be distinct")
+        self.entrants = tuple(entrants)
+        self.playerCounts = tuple(playerCounts)
+        self.gamesPerSeating = gamesPerSeating
+        self.seed = seed
+        self.maxActions = maxActions
+        self._checkpoint = Path(checkpoint) if checkpoint is not None else None
+        self.results: dict[int, GameResult] = {}
+
+    def _setup(self) -> dict[str, Any]:
+        return {"entrants": list(self.entrants), "playerCounts": list(self.playerCounts),
+                "gamesPerSeating": self.gamesPerSeating, "seed": self.seed, "maxActions": self.maxActions}
+
+    def schedule(self) -> list[GameTask]:
+        tasks: list[GameTask] = []
+        for players in self.playerCounts:
+            for seats in permutations(self.entrants, players):
+                for _ in range(self.gamesPerSeating):
+                    tasks.append(GameTask(len(tasks), seats, self.seed, self.maxActions))
+        return tasks
+
+    def _resume(self) -> None:
+        """Results of the checkpoint, a line torn by an interruption is dropped."""
+        assert self._checkpoint is not None
+        if not self._checkpoint.exists():
+            self._checkpoint.write_text(json.dumps(self._setup()) + "\n", encoding="utf-8")
+            return
+        with open(self._checkpoint, encoding="utf-8") as file:
+            lines = file.read().split("\n")
+        if len(lines) == 1:             # interrupted while writing the setup
+            self._checkpoint.write_text(json.dumps(self._setup()) + "\n", encoding="utf-8")
+            return
+        if json.loads(lines[0]) != self._setup():
+            raise ValueError(f"{self._checkpoint} belongs to a different tournament")
+        complete = lines[1:-1]          # text after the last newline is torn
+        for line in complete:
+            data = json.loads(line)
+            result = GameResult(data["index"], tuple(data["seats"]), tuple(data["scores"]),
+                                data["finished"], data["actions"],
+                                GameSeeds.fromJson(data["seeds"]) if data.get("seeds") else None)
+            self.results[result.index] = result
+        with open(self._checkpoint, "r+", encoding="utf-8") as file:
+            file.truncate(sum(len(line.encode()) + 1 for line in lines[:-1]))
+
+    def run(self, workers: Optional[int] = 1, progress: Optional[Callable[[GameResult], None]] = None,
+            profile: Optional[Profile] = None, interval: float = 0.001) -> list[GameResult]:
+        """
+        Plays the games missing from the checkpoint on `workers` processes
+        (1 plays here, None uses all cores) and returns all results in
+        schedule order. The stacks of the games, sampled every `interval`
+        seconds, are added to `profile` if given.
+        """
+        if self._checkpoint is not None:
+            self._resume()
+        pending = [task for task in self.schedule() if task.index not in self.results]
+        log = open(self._checkpoint, "a", encoding="utf-8") if self._checkpoint is not None else None
+        try:
+            for result, sampled in self._play(pending, workers or os.cpu_count() or 1,
+                                              interval if profile is not None else None):
+                self.results[result.index] = result
+                if profile is not None and sampled is not None:
+                    profile.merge(sampled)
+                if log is not None:
+                    log.write(json.dumps({"index": result.index, "seats": list(result.seats),
+                                          "scores": list(result.scores), "finished": result.finished,
+                                          "actions": result.actions,
+                                          "seeds": result.seeds.toJson() if result.seeds else None}) + "\n")
+                    log.flush()
+                if progress is not None:
+                    progress(result)
+        finally:
+            if log is not None:
+                log.close()
+        return [self.results[index] for index in sorted(self.results)]
+
+    @staticmethod
+    def _play(tasks: list[GameTask], workers: int,
+              interval: Optional[float]) -> Iterator[tuple[GameResult, Optional[Profile]]]:
+        if workers == 1:
+            for task in tasks:
+                yield _playTask(task, interval)
+            return
+        with ProcessPoolExecutor(workers) as executor:
+            queued = iter(tasks)
+            running: set[Future[tuple[GameResult, Optional[Profile]]]] = set()
+            for task in queued:
+                running.add(executor.submit(_playTask, task, interval))
+                if len(running) >= 2 * workers:
+                    break
+            while running:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+                    following = next(queued, None)
+                    if following is not None:
+                        running.add(executor.submit(_playTask, following, interval))
+
+    def ratings(self, bootstrap: int = 200) -> list[Rating]:
+        return ratings([self.results[index] for index in sorted(self.results)], self.entrants, bootstrap,
+                       seed=self.seed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Round-robin tournament between bot policies.")
+    parser.add_argument("entrants", nargs="+", choices=sorted(POLICIES))
+    parser.add_argument("--players", type=int, nargs="+", default=[2, 3, 4])
+    parser.add_argument("--games", type=int, default=1, help="games per seating")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--checkpoint")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--profile", help="write collapsed stacks of the games to this file")
+    parser.add_argument("--interval", type=float, default=0.001, help="seconds between stack samples")
+    parser.add_argument("--top", type=int, default=25, help="functions in the self time table")
+    args = parser.parse_args()
+    tournament = Tournament(args.entrants, args.players, args.games, args.seed, checkpoint=args.checkpoint)
+    profile = Profile() if args.profile else None
+    results = tournament.run(args.workers, profile=profile, interval=args.interval)
+    print(f"{len(results)} games, {sum(result.finished for result in results)} finished")
+    if profile is not None:
+        profile.writeCollapsed(args.profile)
+        print(profile.formatTable(top=args.top))
+    for rating in tournament.ratings():
+        print(f"{rating.name:>12} {rating.elo:7.1f}  [{rating.low:7.1f}, {rating.high:7.1f}]  {rating.games} games")
+
+
+if __name__ == "__main__":
+    main()
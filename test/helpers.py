@@ -0,0 +1,63 @@
+"""Small complete games for tests that need a running Game, and a policy to play them."""
+import random
+from typing import Optional
+
+from terra_futura.actions import Action
+from terra_futura.activation_pattern import ActivationPattern
+from terra_futura.arbitrary_basic import ArbitraryBasic
+from terra_futura.card import Card
+from terra_futura.effect_or import EffectOr
+from terra_futura.game import Game
+from terra_futura.game_observer import GameObserver
+from terra_futura.grid import Grid
+from terra_futura.interfaces import InterfaceCard, InterfacePile
+from terra_futura.move_card import MoveCard
+from terra_futura.pile import Pile
+from terra_futura.player import Player
+from terra_futura.process_action import ProcessAction
+from terra_futura.process_action_assistance import ProcessActionAssistance
+from terra_futura.scoring_method import ScoringMethod
+from terra_futura.select_reward import SelectReward
+from terra_futura.simple_types import Deck, GridPosition, Points, Resource
+from terra_futura.tournament import Policy
+from terra_futura.transformation_fixed import TransformationFixed
+
+RAW = (Resource.RED, Resource.GREEN, Resource.YELLOW)
+
+
+def makeCard(rng: random.Random) -> Card:
+    raw = rng.choice(RAW)
+    product = rng.choice((Resource.GOODS, Resource.FOOD, Resource.CONSTRUCTION))
+    return Card(pollutionSpacesL=rng.randint(1, 3), upperEffect=EffectOr([
+        TransformationFixed([], [raw], 0),
+        ArbitraryBasic(from_=2, to=[product], pollution=1),
+    ]), lowerEffect=TransformationFixed([raw, raw], [product], 0))
+
+
+def makePile(rng: random.Random, size: int = 40) -> Pile:
+    cards: list[InterfaceCard] = [makeCard(rng) for _ in range(size)]
+    return Pile(cards[:4], cards[4:], rng)
+
+
+def makePlayer(playerId: int) -> Player:
+    grid = Grid()
+    patterns = [ActivationPattern(grid, [GridPosition(-1, 0), GridPosition(0, 0), GridPosition(1, 0)]),
+                ActivationPattern(grid, [GridPosition(0, -1), GridPosition(0, 0), GridPosition(0, 1)])]
+    scorings = [ScoringMethod([Resource.GOODS, Resource.FOOD], Points(5), grid),
+                ScoringMethod([Resource.RED, Resource.GREEN, Resource.YELLOW], Points(3), grid)]
+    return Player(playerId, patterns, scorings, grid)
+
+
+def makeGame(rng: Optional[random.Random] = None, playerCount: int = 2, threadSafe: bool = False) -> Game:
+    rng = rng or random.Random(0)
+    piles: dict[Deck, InterfacePile] = {Deck.LEVEL_I: makePile(rng), Deck.LEVEL_II: makePile(rng)}
+    return Game([makePlayer(playerId) for playerId in range(1, playerCount + 1)], piles, MoveCard(),
+                ProcessAction(), ProcessActionAssistance(), SelectReward(), GameObserver({}),
+                threadSafe=threadSafe)
+
+
+def firstPolicy(rng: random.Random) -> Policy:
+    """Tournament policy that always plays the first legal action."""
+    def policy(game: Game) -> Action:
+        return game.legalActions()[0]
+    return policy
@@ -0,0 +1,93 @@
+import threading
+
+import pytest
+
+from terra_futura import activation_advisor
+from terra_futura.activation_advisor import ActivationPatternAdvisor
+from terra_futura.activation_pattern import ActivationPattern
+from terra_futura.arbitrary_basic import ArbitraryBasic
+from terra_futura.card import Card
+from terra_futura.effect_or import EffectOr
+from terra_futura.grid import Grid
+from terra_futura.interfaces import Effect
+from terra_futura.player import Player
+from terra_futura.scoring_method import ScoringMethod
+from terra_futura.simple_types import GridPosition, Points, Resource
+from terra_futura.transformation_fixed import TransformationFixed
+
+
+def _player() -> Player:
+    grid = Grid()
+    # (0,0) turns a raw material into goods, (1,0) produces a raw material
+    factory = Card(pollutionSpacesL=3, upperEffect=EffectOr([
+        ArbitraryBasic(from_=1, to=[Resource.GOODS], pollution=1),
+        TransformationFixed([], [], 0),
+    ]))
+    farm = Card(pollutionSpacesL=1, upperEffect=TransformationFixed([], [Resource.GREEN], 0))
+    farm.putResources([Resource.GREEN, Resource.GREEN])
+    grid.putCard(GridPosition(0, 0), factory)
+    grid.putCard(GridPosition(1, 0), farm)
+    grid.endTurn()
+
+    patterns = [ActivationPattern(grid, [GridPosition(0, 0), GridPosition(0, 0)]),
+                ActivationPattern(grid, [GridPosition(1, 0)])]
+    scorings = [ScoringMethod([Resource.GOODS], Points(10), grid),
+                ScoringMethod([Resource.GREEN], Points(1), grid)]
+    return Player(1, patterns, scorings, grid)
+
+
+def test_advisor_prefers_pattern_with_better_activations() -> None:
+    player = _player()
+
+    advice = ActivationPatternAdvisor(timeBudget=5.0).advise(player)
+
+    assert advice.complete
+    assert [evaluation.pattern for evaluation in advice.evaluations] == [0, 1]
+    # two goods (6 + 10 points each) instead of two greens
+    assert advice.evaluations[0].scores == (32, 12)
+    assert advice.evaluations[1].scores == (3, 6)
+    assert advice.bestPattern == 0
+    assert advice.bestScoring == 0
+    assert advice.bestScore == 32
+
+
+def test_advisor_does_not_touch_players_grid() -> None:
+    player = _player()
+    ActivationPatternAdvisor(timeBudget=5.0).advise(player)
+
+    farm = player.grid.getCard(GridPosition(1, 0))
+    assert farm is not None
+    assert farm.resources == [Resource.GREEN, Resource.GREEN]
+    assert not player.activation_patterns[0].is_selected()
+
+
+def test_advisor_returns_current_score_when_out_of_time() -> None:
+    advice = ActivationPatternAdvisor(timeBudget=0.0).advise(_player())
+
+    assert not advice.complete
+    assert [evaluation.scores for evaluation in advice.evaluations] == [(2, 4), (2, 4)]
+
+
+def test_advisor_returns_progress_of_unfinished_pattern(monkeypatch: pytest.MonkeyPatch) -> None:
+    release = threading.Event()
+    calls: list[GridPosition] = []
+    activate = activation_advisor._activate
+
+    def slowActivate(grid: Grid, position: GridPosition, effect: Effect) -> bool:
+        calls.append(position)
+        # the second activation of the factory only ends after the deadline
+        if position == GridPosition(0, 0) and calls.count(position) > 2:
+            release.wait(5.0)
+        return activate(grid, position, effect)
+
+    monkeypatch.setattr(activation_advisor, "_activate", slowActivate)
+    try:
+        advice = ActivationPatternAdvisor(timeBudget=0.5).advise(_player())
+    finally:
+        release.set()
+
+    first, second = advice.evaluations
+    assert not first.complete and second.complete
+    # one green already turned into goods
+    assert first.scores == (17, 8)
+    assert advice.bestPattern == 0
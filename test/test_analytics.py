@@ -0,0 +1,94 @@
+import random
+import struct
+from pathlib import Path
+
+import numpy as np
+
+from terra_futura.actions import ACTION_INDEX, ActionKind
+from terra_futura.analytics import analyseArchive
+from terra_futura.factories import CardCatalog, GamePool
+from terra_futura.persistence import GameJournal
+from terra_futura.simple_types import GameState
+from terra_futura.snapshot import GameCodec
+
+
+def _record(archive: Path, games: int) -> tuple[int, int, int, int]:
+    """Random games in two journals, returns actions, cards taken, finished games and their players."""
+    catalog = CardCatalog.load()
+    pool = GamePool(catalog, capacity=0)
+    actions = takes = finished = players = 0
+    for index in range(games):
+        journal = GameJournal(archive / f"server{index % 2}", codec=GameCodec(catalog))
+        rng = random.Random(index)
+        game = pool.acquire(2 + index % 3, rng)
+        journal.start(f"game{index}", game)
+        # the last game is only started
+        while game.state != GameState.Finish and game.legalActions() and index < games - 1:
+            action = rng.choice(game.legalActions())
+            assert journal.apply(f"game{index}", game, game.actingPlayerId, action)
+            actions += 1
+            takes += action.kind == ActionKind.TakeCard
+        if game.state == GameState.Finish:
+            finished += 1
+            players += len(game.players)
+        journal.close()
+    return actions, takes, finished, players
+
+
+def test_statistics_of_archive(tmp_path: Path) -> None:
+    actions, takes, finished, players = _record(tmp_path / "archive", 5)
+    (tmp_path / "archive" / "broken").mkdir()
+    (tmp_path / "archive" / "broken" / "start.bin").write_bytes(b"garbage")
+    (tmp_path / "archive" / "broken" / "actions.log").write_bytes(b"")
+
+    statistics = analyseArchive(tmp_path / "archive", workers=1, chunkSize=2)
+
+    assert (statistics.games, statistics.finished, statistics.failed) == (5, finished, 1)
+    assert statistics.actions == actions
+    assert sum(counts.taken for counts in statistics.cards.values()) == takes
+    assert all(counts.offered >= counts.taken for counts in statistics.cards.values())
+    assert sum(games for games, _ in statistics.scorings.values()) == players
+
+    paths = statistics.write(tmp_path / "out")
+    cards = np.load(paths[0])
+    assert cards["taken"].sum() == takes
+    assert len(cards["card"]) == len(cards["takeRate"]) == len(statistics.cards)
+    resources = np.load(paths[2])
+    assert list(resources["turn"]) == sorted(statistics.turns)
+
+
+def test_process_pool_gives_the_same_counts(tmp_path: Path) -> None:
+    _record(tmp_path, 4)
+
+    assert analyseArchive(tmp_path, workers=2, chunkSize=1) == analyseArchive(tmp_path, workers=1)
+
+
+def test_failed_game_leaves_no_counts_behind(tmp_path: Path) -> None:
+    catalog = CardCatalog.load()
+    journal = GameJournal(tmp_path, codec=GameCodec(catalog))
+    rng = random.Random(3)
+    game = GamePool(catalog, capacity=0).acquire(2, rng)
+    journal.start("game", game)
+    for _ in range(40):
+        assert journal.apply("game", game, game.actingPlayerId, rng.choice(game.legalActions()))
+    journal.close()
+    # a scoring choice of a player who is not at the table
+    with open(tmp_path / "game" / "actions.log", "ab") as file:
+        file.write(struct.pack("<HB", ACTION_INDEX[next(action for action in ACTION_INDEX
+                                                          if action.kind == ActionKind.SelectScoring)], 9))
+
+    statistics = analyseArchive(tmp_path, workers=1)
+
+    assert (statistics.games, statistics.failed, statistics.actions) == (0, 1, 0)
+    assert not statistics.cards and not statistics.turns
+
+
+def test_unknown_action_number_fails_only_its_game(tmp_path: Path) -> None:
+    _, _, finished, _ = _record(tmp_path, 3)
+    with open(tmp_path / "server0" / "game0" / "actions.log", "ab") as file:
+        file.write(struct.pack("<HB", 60000, 1))
+
+    statistics = analyseArchive(tmp_path, workers=1)
+
+    assert (statistics.games, statistics.failed) == (2, 1)
+    assert statistics.finished == finished - 1
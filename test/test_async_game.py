@@ -0,0 +1,96 @@
+import asyncio
+import random
+
+import pytest
+
+from terra_futura.async_game import AsyncGame, AsyncGameObserver
+from terra_futura.interfaces import TerraFuturaObserverInterface
+from terra_futura.simple_types import CardSource, Deck, GameState, GridPosition
+from test.helpers import makeGame
+
+
+class _SlowObserver:
+    def __init__(self) -> None:
+        self.states: list[str] = []
+        self.release = asyncio.Event()
+
+    async def notify(self, game_state: str) -> None:
+        await self.release.wait()
+        self.states.append(game_state)
+
+
+async def _takeFirstCard(asyncGame: AsyncGame) -> bool:
+    return await asyncGame.takeCard(1, CardSource(Deck.LEVEL_I, 1), 1, GridPosition(0, 0))
+
+
+def test_calls_do_not_wait_for_observers() -> None:
+    async def scenario() -> None:
+        observer = AsyncGameObserver()
+        slow = _SlowObserver()
+        observer.subscribe(1, slow)
+        game = makeGame(random.Random(1))
+        game.reset(observer)
+        asyncGame = AsyncGame(game, observer)
+
+        assert await asyncio.wait_for(_takeFirstCard(asyncGame), timeout=1)
+        assert await asyncGame.turnFinished(1)
+        assert slow.states == []
+
+        slow.release.set()
+        await observer.drain()
+        assert len(slow.states) == 2
+        await asyncGame.close()
+
+    asyncio.run(scenario())
+
+
+def test_calls_of_one_game_keep_their_order() -> None:
+    async def scenario() -> None:
+        games = [AsyncGame(makeGame(random.Random(seed))) for seed in range(3)]
+        # sent without awaiting: finishing the turn only works after the card was taken
+        results = await asyncio.gather(*(call for asyncGame in games
+                                         for call in (_takeFirstCard(asyncGame), asyncGame.turnFinished(1))))
+        assert all(results)
+        for asyncGame in games:
+            assert asyncGame.game.state == GameState.TakeCardNoCardDiscarded
+            assert asyncGame.game.onTurn() == 2
+            await asyncGame.close()
+
+    asyncio.run(scenario())
+
+
+class _FailingObserver:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def notify(self, game_state: str) -> None:
+        self.calls += 1
+        raise RuntimeError("observer failed")
+
+
+class _Recorder(TerraFuturaObserverInterface):
+    def __init__(self) -> None:
+        self.states: list[str] = []
+
+    def notify(self, game_state: str) -> None:
+        self.states.append(game_state)
+
+
+def test_failing_observer_does_not_stop_delivery(caplog: pytest.LogCaptureFixture) -> None:
+    async def scenario() -> tuple[_FailingObserver, _Recorder]:
+        failing, recorder = _FailingObserver(), _Recorder()
+        observer = AsyncGameObserver({1: failing, 2: recorder})
+        game = makeGame(random.Random(1))
+        game.reset(observer)
+        asyncGame = AsyncGame(game, observer)
+        assert await _takeFirstCard(asyncGame)
+        assert await asyncGame.turnFinished(1)
+        await observer.drain()
+        await asyncGame.close()
+        await observer.close()
+        return failing, recorder
+
+    failing, recorder = asyncio.run(scenario())
+
+    assert failing.calls == len(recorder.states) == 2
+    assert "Observer of player 1 failed" in caplog.text
@@ -0,0 +1,107 @@
+from collections import Counter
+
+from terra_futura.arbitrary_basic import ArbitraryBasic
+from terra_futura.auto_pay import AutoPay, cardOptions
+from terra_futura.card import Card
+from terra_futura.effect_or import EffectOr
+from terra_futura.grid import Grid
+from terra_futura.process_action import ProcessAction
+from terra_futura.simple_types import GridPosition, Resource
+from terra_futura.transformation_fixed import TransformationFixed
+
+CENTER = GridPosition(0, 0)
+RIGHT = GridPosition(1, 0)
+TOP = GridPosition(0, 1)
+
+
+def _card(resources: list[Resource], pollutionSpacesL: int = 3) -> Card:
+    card = Card(pollutionSpacesL=pollutionSpacesL)
+    card.putResources(resources)
+    return card
+
+
+def test_card_options_flatten_or_effects() -> None:
+    fixed = TransformationFixed([Resource.RED], [Resource.GOODS], 0)
+    arbitrary = ArbitraryBasic(from_=2, to=[Resource.MONEY], pollution=0)
+    card = Card(upperEffect=EffectOr([fixed, arbitrary]), lowerEffect=fixed)
+
+    assert cardOptions(card) == [fixed, arbitrary, fixed]
+
+
+def test_fixed_payment_prefers_cards_that_will_not_be_activated_again() -> None:
+    grid = Grid()
+    grid.putCard(CENTER, _card([Resource.RED]))
+    grid.endTurn()
+    # RIGHT is placed last, so both cards in its row can still be activated; TOP is not
+    grid.putCard(TOP, _card([Resource.RED]))
+    grid.putCard(RIGHT, _card([Resource.RED]))
+    effect = TransformationFixed([Resource.RED, Resource.RED], [Resource.GOODS], 0)
+
+    payment = AutoPay().pay(grid, RIGHT, effect)
+
+    assert payment is not None
+    assert Counter(payment.inputs) == Counter([(Resource.RED, RIGHT), (Resource.RED, TOP)])
+    assert payment.outputs == [(Resource.GOODS, RIGHT)]
+    assert payment.pollution == []
+
+
+def test_arbitrary_payment_uses_least_valuable_resources() -> None:
+    grid = Grid()
+    grid.putCard(CENTER, _card([Resource.GOODS, Resource.GREEN, Resource.FOOD]))
+    effect = ArbitraryBasic(from_=2, to=[Resource.MONEY], pollution=0)
+
+    payment = AutoPay().pay(grid, CENTER, effect)
+
+    assert payment is not None
+    assert Counter(payment.inputs) == Counter([(Resource.GREEN, CENTER), (Resource.FOOD, CENTER)])
+
+
+def test_payment_fails_without_resources() -> None:
+    grid = Grid()
+    grid.putCard(CENTER, _card([Resource.GREEN]))
+
+    assert AutoPay().pay(grid, CENTER, TransformationFixed([Resource.RED], [], 0)) is None
+    assert AutoPay().pay(grid, CENTER, ArbitraryBasic(from_=2, to=[], pollution=0)) is None
+
+
+def test_pollution_avoids_deactivating_cards() -> None:
+    grid = Grid()
+    grid.putCard(CENTER, _card([], pollutionSpacesL=1))
+    grid.putCard(RIGHT, _card([], pollutionSpacesL=3))
+    effect = TransformationFixed([], [Resource.GREEN], 2)
+
+    payment = AutoPay().pay(grid, CENTER, effect)
+
+    assert payment is not None
+    assert payment.pollution == [RIGHT, RIGHT]
+
+
+def test_pollution_deactivates_least_valuable_card_when_it_must() -> None:
+    grid = Grid()
+    grid.putCard(CENTER, _card([], pollutionSpacesL=2))
+    grid.putCard(RIGHT, _card([Resource.GOODS], pollutionSpacesL=1))
+    grid.putCard(TOP, _card([Resource.RED], pollutionSpacesL=1))
+    grid.endTurn()
+    effect = TransformationFixed([], [Resource.GREEN], 2)
+
+    payment = AutoPay().pay(grid, CENTER, effect)
+
+    assert payment is not None
+    assert Counter(payment.pollution) == Counter([CENTER, TOP])
+
+
+def test_payment_is_accepted_by_process_action() -> None:
+    grid = Grid()
+    acting = Card(pollutionSpacesL=3, upperEffect=ArbitraryBasic(from_=2, to=[Resource.GOODS], pollution=1))
+    grid.putCard(CENTER, acting)
+    grid.putCard(RIGHT, _card([Resource.RED, Resource.YELLOW, Resource.FOOD]))
+    assert acting.upperEffect is not None
+
+    payment = AutoPay().pay(grid, CENTER, acting.upperEffect)
+
+    assert payment is not None
+    assert ProcessAction().activateCard(acting, grid, payment.inputs, payment.outputs, payment.pollution)
+    right = grid.getCard(RIGHT)
+    assert right is not None
+    assert right.resources == [Resource.FOOD]
+    assert acting.resources == [Resource.GOODS]
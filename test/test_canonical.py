@@ -0,0 +1,80 @@
+import random
+
+from terra_futura.activation_pattern import ActivationPattern
+from terra_futura.canonical import EvaluationCache, gridKey
+from terra_futura.card import Card
+from terra_futura.grid import Grid
+from terra_futura.simple_types import GridPosition, Resource
+from terra_futura.transformation_fixed import TransformationFixed
+from test.helpers import makeGame
+
+
+def _card(resource: Resource) -> Card:
+    return Card(pollutionSpacesL=2, upperEffect=TransformationFixed([], [resource], 0))
+
+
+def _grid(cards: list[tuple[int, int, Resource]]) -> Grid:
+    grid = Grid()
+    for x, y, resource in cards:
+        grid.putCard(GridPosition(x, y), _card(resource))
+    grid.endTurn()
+    return grid
+
+
+def test_translated_grids_share_the_key() -> None:
+    left = _grid([(0, 0, Resource.RED), (1, 0, Resource.GREEN)])
+    right = _grid([(0, 0, Resource.GREEN), (-1, 0, Resource.RED)])
+    mirrored = _grid([(0, 0, Resource.GREEN), (1, 0, Resource.RED)])
+
+    assert gridKey(left) == gridKey(right)
+    assert gridKey(left) != gridKey(mirrored)
+
+
+def test_key_tracks_resources_and_activations() -> None:
+    grid = _grid([(0, 0, Resource.RED)])
+    empty = gridKey(grid)
+
+    card = grid.getCard(GridPosition(0, 0))
+    assert card is not None
+    card.putResources([Resource.RED])
+    assert gridKey(grid) != empty
+
+    before = gridKey(grid)
+    grid.setActivationPattern([GridPosition(0, 0)])
+    assert gridKey(grid) != before
+
+
+def test_patterns_are_translated_with_the_grid() -> None:
+    left = _grid([(0, 0, Resource.RED), (1, 0, Resource.GREEN)])
+    right = _grid([(0, 0, Resource.GREEN), (-1, 0, Resource.RED)])
+
+    leftKey = gridKey(left, [ActivationPattern(left, [GridPosition(1, 0)])])
+    rightKey = gridKey(right, [ActivationPattern(right, [GridPosition(0, 0)])])
+    otherKey = gridKey(right, [ActivationPattern(right, [GridPosition(1, 0)])])
+
+    assert leftKey == rightKey
+    assert leftKey != otherKey
+
+
+def test_game_key_ignores_hidden_card_order() -> None:
+    game = makeGame(random.Random(3))
+    clone = game.clone(random.Random(4))
+    assert game.canonicalKey() == clone.canonicalKey()
+
+    action = game.legalActions()[0]
+    action.apply(clone, clone.actingPlayerId)
+    assert game.canonicalKey() != clone.canonicalKey()
+
+
+def test_evaluation_cache_evicts_least_recently_used() -> None:
+    cache: EvaluationCache[str, int] = EvaluationCache(capacity=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+    assert cache.hits == 2 and cache.misses == 1
+    assert cache.hitRate == 2 / 3
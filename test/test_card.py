@@ -1,4 +1,5 @@
 # test_card.py
+import weakref
 from collections import Counter
 from dataclasses import dataclass
 from typing import List
@@ -7,8 +8,9 @@ import pytest
 
 # Adjust these imports to your real module paths
 from terra_futura.card import Card
+from terra_futura.factories import CardCatalog
 from terra_futura.interfaces import Effect
-from terra_futura.simple_types import Resource
+from terra_futura.simple_types import Deck, Resource
 
 # ---------------------------------------------------------------------------
 # Dummy resource + dummy effects for testing
@@ -298,4 +300,27 @@ def test_has_this_effect() -> None:
 
     assert "true" not in c4.state()
     assert "false" not in c4.state()
-    assert "No effect" in c4.state()
\ No newline at end of file
+    assert "No effect" in c4.state()
+
+def test_card_is_slotted_and_weakly_referenceable() -> None:
+    c = Card(pollutionSpacesL=1)
+
+    assert not hasattr(c, "__dict__")
+    assert weakref.ref(c)() is c
+    with pytest.raises(AttributeError):
+        c.extra = 1  # type: ignore[attr-defined]
+
+
+def test_printed_part_is_read_from_the_template() -> None:
+    catalog = CardCatalog.fromData({"LEVEL_I": [
+        {"count": 2, "pollutionSpaces": 1, "upper": {"type": "fixed", "from": [], "to": ["RED"]}, "lower": None}]})
+    first, second = catalog.deal(Deck.LEVEL_I)
+
+    assert first.template is not None and first.template is second.template
+    assert first.upperEffect is first.template.upperEffect and first.pollutionSpacesL == 1
+    assert Card(pollutionSpacesL=1).template is None
+
+    # changing a printed field makes the card one built by hand, its copies keep the template
+    first.pollutionSpacesL = 2
+    assert first.template is None and first.pollutionSpacesL == 2
+    assert first.upperEffect is second.upperEffect and second.pollutionSpacesL == 1
@@ -0,0 +1,82 @@
+import random
+import struct
+from pathlib import Path
+
+import numpy as np
+
+from terra_futura.actions import ACTION_INDEX
+from terra_futura.dataset import TrainingData, exportArchive
+from terra_futura.factories import CardCatalog, GamePool
+from terra_futura.persistence import GameJournal
+from terra_futura.simple_types import GameState
+from terra_futura.snapshot import GameCodec
+
+
+def _record(archive: Path) -> list[list[int]]:
+    """Three games (the last one unfinished), returns the action numbers of each."""
+    catalog = CardCatalog.load()
+    pool = GamePool(catalog, capacity=0)
+    journal = GameJournal(archive, codec=GameCodec(catalog))
+    played: list[list[int]] = []
+    for index, steps in enumerate((1000, 1000, 7)):
+        rng = random.Random(index)
+        game = pool.acquire(2 + index, rng)
+        journal.start(f"game{index}", game)
+        actions: list[int] = []
+        while game.state != GameState.Finish and game.legalActions() and len(actions) < steps:
+            action = rng.choice(game.legalActions())
+            assert journal.apply(f"game{index}", game, game.actingPlayerId, action)
+            actions.append(ACTION_INDEX[action])
+        played.append(actions)
+    journal.close()
+    return played
+
+
+def test_export_and_sample(tmp_path: Path) -> None:
+    played = _record(tmp_path / "archive")
+    (tmp_path / "archive" / "broken").mkdir()
+    (tmp_path / "archive" / "broken" / "start.bin").write_bytes(b"garbage")
+    (tmp_path / "archive" / "broken" / "actions.log").write_bytes(b"TFLOG001\x00\x00\x01")
+
+    summary = exportArchive(tmp_path / "archive", tmp_path / "data")
+
+    assert (summary.games, summary.rows, summary.failed) == (3, sum(map(len, played)), 1)
+    data = TrainingData(tmp_path / "data")
+    assert len(data) == summary.rows and len(data.games) == 3
+    for index, actions in enumerate(played):
+        game = data.game(index)
+        assert list(game["actions"]) == actions
+        assert data.games[index]["players"] == 2 + index
+        # the first row is the dealt game: empty grids, first state
+        assert game["turns"][0] == 1 and game["grids"][0].sum() == 0
+        assert set(np.unique(game["seats"])) <= set(range(2 + index))
+    assert not data.games[2]["finished"] and not data.game(2)["scores"].any()
+    assert data.cards == [None] + CardCatalog.load().signatures()
+    assert data.columns["signatures"][:].max() < len(data.cards)
+
+    batch = data.sample(np.random.default_rng(0), 32, finishedOnly=True)
+    assert batch["grids"].shape == (32, 4, *data.columns["grids"].shape[2:])
+    assert (batch["turns"] >= 1).all()
+
+
+def test_log_of_unknown_player_skips_only_that_game(tmp_path: Path) -> None:
+    played = _record(tmp_path / "archive")
+    with open(tmp_path / "archive" / "game0" / "actions.log", "ab") as file:
+        file.write(struct.pack("<HB", played[0][0], 9))
+
+    summary = exportArchive(tmp_path / "archive", tmp_path / "data")
+
+    assert (summary.games, summary.rows, summary.failed) == (2, len(played[1]) + len(played[2]), 1)
+    assert list(TrainingData(tmp_path / "data").game(0)["actions"]) == played[1]
+
+
+def test_unknown_action_number_skips_only_that_game(tmp_path: Path) -> None:
+    played = _record(tmp_path / "archive")
+    with open(tmp_path / "archive" / "game1" / "actions.log", "ab") as file:
+        file.write(struct.pack("<HB", 60000, 1))
+
+    summary = exportArchive(tmp_path / "archive", tmp_path / "data")
+
+    assert (summary.games, summary.rows, summary.failed) == (2, len(played[0]) + len(played[2]), 1)
+    data = TrainingData(tmp_path / "data")
+    assert [list(data.game(index)["actions"]) for index in range(2)] == [played[0], played[2]]
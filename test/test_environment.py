@@ -0,0 +1,70 @@
+import random
+
+import numpy as np
+import pytest
+
+from terra_futura.actions import ACTIONS, ACTION_COUNT, ACTION_INDEX, Action, ActionKind
+from terra_futura.environment import OBSERVATION_SIZE, TerraFuturaEnv, VectorTerraFuturaEnv
+from terra_futura.simple_types import Deck, GridPosition
+from test.helpers import makeGame
+
+
+def test_action_encoding_round_trips() -> None:
+    assert len(set(ACTIONS)) == ACTION_COUNT
+    action = Action(ActionKind.TakeCard, deck=Deck.LEVEL_II, cardIndex=3, position=GridPosition(0, 0))
+    assert ACTIONS[ACTION_INDEX[action]] == action
+
+
+def test_reset_and_mask() -> None:
+    env = TerraFuturaEnv(makeGame)
+    observation, info = env.reset(seed=1)
+
+    assert observation.shape == (OBSERVATION_SIZE,)
+    assert info["player"] == 1
+    mask = env.actionMask()
+    legal = [ACTIONS[index] for index in np.flatnonzero(mask)]
+    # first card has to go to the center, from any of the 8 visible cards, or a card is discarded
+    assert len(legal) == 10
+    assert all(action.position in (None, GridPosition(0, 0)) for action in legal)
+
+
+def test_illegal_action_is_rejected() -> None:
+    env = TerraFuturaEnv(makeGame)
+    env.reset(seed=1)
+    with pytest.raises(ValueError):
+        env.step(ACTION_INDEX[Action(ActionKind.TurnFinished)])
+
+
+def test_random_games_finish() -> None:
+    rng = random.Random(3)
+    env = TerraFuturaEnv(makeGame)
+    env.reset(seed=3)
+    terminated = False
+    steps = 0
+    reward = 0.0
+    while not terminated:
+        action = rng.choice(np.flatnonzero(env.actionMask()).tolist())
+        _, reward, terminated, truncated, info = env.step(action)
+        assert not truncated
+        steps += 1
+    assert info["scores"].keys() == {1, 2}
+    assert reward == info["scores"][2]
+    assert steps > 2 * 9
+
+
+def test_vector_env_writes_into_preallocated_arrays() -> None:
+    envs = VectorTerraFuturaEnv(makeGame, count=3)
+    observations = envs.reset(seed=5)
+    assert observations is envs.observations
+    assert observations.shape == (3, OBSERVATION_SIZE)
+
+    rng = np.random.default_rng(5)
+    finished = 0
+    for _ in range(400):
+        actions = np.array([rng.choice(np.flatnonzero(mask)) for mask in envs.masks])
+        result, rewards, terminated, truncated = envs.step(actions)
+        assert result is envs.observations
+        assert not truncated.any()
+        finished += int(terminated.sum())
+        assert envs.masks.any(axis=1).all()
+    assert finished > 0
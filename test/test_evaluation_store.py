@@ -0,0 +1,52 @@
+import random
+from pathlib import Path
+
+import pytest
+
+from terra_futura.evaluation_store import EvaluationStore
+from terra_futura.mcts import MctsPlayer
+from test.helpers import makeGame
+
+
+def test_records_are_visible_to_readers(tmp_path: Path) -> None:
+    path = str(tmp_path / "evaluations")
+    with EvaluationStore(path, capacity=16, writable=True) as writer:
+        assert writer.add(5, 3, 1.5)
+        assert writer.add(21, 1, 0.5)     # same slot as 5, probes on
+        assert writer.add(5, 1, 0.5)
+        writer.flush()
+
+        with EvaluationStore(path) as reader:
+            assert reader.get(5) == (4, 2.0)
+            assert reader.get(21) == (1, 0.5)
+            assert reader.get(37) is None
+            assert len(reader) == 2
+            assert reader.hitRate == 2 / 3
+            with pytest.raises(RuntimeError):
+                reader.add(7, 1, 1.0)
+
+
+def test_single_writer(tmp_path: Path) -> None:
+    path = str(tmp_path / "evaluations")
+    with EvaluationStore(path, capacity=16, writable=True):
+        with pytest.raises(RuntimeError):
+            EvaluationStore(path, writable=True)
+
+
+def test_full_table_drops_new_keys(tmp_path: Path) -> None:
+    with EvaluationStore(str(tmp_path / "evaluations"), capacity=4, writable=True) as store:
+        assert all(store.add(key, 1, 1.0) for key in (1, 2, 3))
+        assert not store.add(4, 1, 1.0)
+        assert store.add(1, 1, 1.0)
+        assert store.get(1) == (2, 2.0)
+
+
+def test_mcts_warm_starts_from_store(tmp_path: Path) -> None:
+    game = makeGame(random.Random(5))
+    with EvaluationStore(str(tmp_path / "evaluations"), capacity=1 << 12, writable=True) as store:
+        first = MctsPlayer(thinkTime=60, seed=1, maxIterations=20, store=store).search(game)
+        assert len(store) == len(first.statistics)
+
+        second = MctsPlayer(thinkTime=60, seed=2, maxIterations=20, store=store).search(game)
+        assert second.storeHits > 0
+        assert sum(visits for visits, _ in second.statistics.values()) == 20
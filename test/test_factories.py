@@ -0,0 +1,123 @@
+import random
+
+import pytest
+
+from terra_futura.card import Card, effectSignature
+from terra_futura.factories import CardCatalog, GamePool
+from terra_futura.game import Game
+from terra_futura.simple_types import Deck, GameState, Resource
+
+
+def test_loads_both_decks() -> None:
+    catalog = CardCatalog.load()
+
+    assert set(catalog.decks) == {Deck.LEVEL_I, Deck.LEVEL_II}
+    assert len(catalog.deal(Deck.LEVEL_I)) == catalog.size(Deck.LEVEL_I) > 0
+    assert catalog.size(Deck.LEVEL_II) > 0
+
+
+def test_cards_share_templates_and_effects() -> None:
+    catalog = CardCatalog.fromData({"LEVEL_I": [
+        {"count": 2, "pollutionSpaces": 1, "upper": {"type": "fixed", "from": [], "to": ["RED"]}, "lower": None},
+        {"count": 1, "pollutionSpaces": 2, "upper": {"type": "fixed", "from": [], "to": ["RED"]},
+         "lower": {"type": "arbitrary", "from": 2, "to": ["FOOD"], "pollution": 1}},
+    ]})
+
+    first, second, third = catalog.deal(Deck.LEVEL_I)
+
+    assert first is not second
+    assert first.template is second.template
+    assert first.upperEffect is third.upperEffect
+    assert len(catalog.templates(Deck.LEVEL_I)) == 2
+    assert third.template is not None and third.template.signatureId == 2
+    assert catalog.signatures() == [effectSignature(first), effectSignature(third)]
+
+
+def test_dealt_cards_have_independent_state() -> None:
+    catalog = CardCatalog.load()
+    first, second = catalog.deal(Deck.LEVEL_I)[:2]
+
+    first.putResources([Resource.RED])
+    first.placePollution(1)
+
+    assert second.resources == [] and second.pollution == 0
+    assert isinstance(second, Card) and second.hasAssistance() is False
+
+
+def test_pile_is_shuffled_with_rng() -> None:
+    catalog = CardCatalog.load()
+    pile = catalog.pile(Deck.LEVEL_II, random.Random(1))
+    again = catalog.pile(Deck.LEVEL_II, random.Random(1))
+
+    assert [card.state() for card in pile.visibleCards] == [card.state() for card in again.visibleCards]
+    assert len(pile.visibleCards) + pile.hiddenCount == catalog.size(Deck.LEVEL_II)
+
+
+def test_unknown_effect_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        CardCatalog.fromData({"LEVEL_I": [{"pollutionSpaces": 1, "upper": {"type": "magic"}}]})
+
+
+def _playSome(game: Game, rng: random.Random, steps: int) -> None:
+    for _ in range(steps):
+        actions = game.legalActions()
+        if not actions:
+            break
+        rng.choice(actions).apply(game, game.actingPlayerId)
+
+
+def test_pool_recycles_released_games() -> None:
+    pool = GamePool(CardCatalog.load(), capacity=1)
+    game = pool.acquire(2, random.Random(1))
+    player = game.players[0]
+    _playSome(game, random.Random(2), 40)
+    assert game.turnNumber > 1 or player.grid.positions
+
+    pool.release(game)
+    again = pool.acquire(2, random.Random(1))
+
+    assert again is game and again.players[0] is player
+    assert pool.created == 1 and pool.reused == 1
+    assert again.state == GameState.TakeCardNoCardDiscarded and again.turnNumber == 1
+    assert player.grid.positions == [] and not player.activation_patterns[0].is_selected()
+    fresh = GamePool(CardCatalog.load()).acquire(2, random.Random(1))
+    assert again.canonicalKey() == fresh.canonicalKey()
+
+
+def test_pool_is_bounded() -> None:
+    pool = GamePool(CardCatalog.load(), capacity=1)
+    first, second = pool.acquire(2), pool.acquire(2)
+    pool.release(first)
+    pool.release(second)
+
+    assert len(pool) == 1
+    assert pool.acquire(3) is not first
+    with pytest.raises(ValueError):
+        pool.release(first)
+
+
+def test_pool_needs_a_stream_for_every_deck() -> None:
+    with pytest.raises(ValueError):
+        GamePool(CardCatalog.load()).acquire(2, {Deck.LEVEL_I: random.Random(0)})
+
+
+def test_bundled_decks_last_four_player_games() -> None:
+    catalog = CardCatalog.load()
+    assert all(catalog.supports(players) for players in (2, 3, 4))
+    pool = GamePool(catalog, capacity=1)
+    for seed in range(40):
+        rng = random.Random(seed)
+        game = pool.acquire(4, rng)
+        _playSome(game, rng, 10_000)
+        assert game.state == GameState.Finish, f"game {seed} got stuck on turn {game.turnNumber}"
+        pool.release(game)
+
+
+def test_pool_rejects_decks_too_small_for_the_players() -> None:
+    card = {"count": 20, "pollutionSpaces": 1, "upper": {"type": "fixed", "from": [], "to": ["RED"]}, "lower": None}
+    catalog = CardCatalog.fromData({"LEVEL_I": [card], "LEVEL_II": [card]})
+
+    assert catalog.supports(2) and not catalog.supports(3)
+    GamePool(catalog).acquire(2)
+    with pytest.raises(ValueError):
+        GamePool(catalog).acquire(3)
@@ -0,0 +1,48 @@
+import random
+
+from terra_futura.actions import Action, ActionKind
+from terra_futura.simple_types import Deck, GameState, GridPosition
+from test.helpers import makeGame
+
+
+def test_first_turn_actions() -> None:
+    game = makeGame()
+    legal = game.legalActions()
+
+    assert set(legal) == {Action(ActionKind.TakeCard, deck=deck, cardIndex=index, position=GridPosition(0, 0))
+                          for deck in Deck for index in (1, 2, 3, 4)} \
+        | {Action(ActionKind.DiscardLastCard, deck=deck) for deck in Deck}
+
+
+def test_legal_actions_are_cached_until_state_changes() -> None:
+    game = makeGame()
+    first = game.legalActions()
+    assert game.legalActions() is first
+
+    # rejected action does not change anything
+    assert not game.turnFinished(game.currentPlayerId)
+    assert game.legalActions() is first
+
+    assert game.discardLastCardFromDeck(game.currentPlayerId, Deck.LEVEL_I)
+    second = game.legalActions()
+    assert second is not first
+    assert all(action.kind == ActionKind.TakeCard for action in second)
+
+
+def test_every_legal_action_is_accepted() -> None:
+    game = makeGame(random.Random(4))
+    rng = random.Random(4)
+    while game.state != GameState.Finish:
+        legal = game.legalActions()
+        assert legal
+        for action in legal:
+            assert game.isLegal(action)
+        action = rng.choice(legal)
+        assert action.apply(game, game.actingPlayerId)
+    assert game.legalActions() == ()
+
+
+def test_illegal_actions_are_not_listed() -> None:
+    game = makeGame()
+    assert not game.isLegal(Action(ActionKind.TurnFinished))
+    assert not game.isLegal(Action(ActionKind.TakeCard, deck=Deck.LEVEL_I, cardIndex=1, position=GridPosition(1, 0)))
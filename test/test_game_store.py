@@ -0,0 +1,88 @@
+import random
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from terra_futura.game_store import GameStore
+from terra_futura.simple_types import GameState
+from test.helpers import makeGame
+
+
+def test_stores_actions_of_many_games(tmp_path: Path) -> None:
+    rng = random.Random(0)
+    played: dict[str, list[tuple[int, int]]] = {}
+    with GameStore(tmp_path / "games.db", batchSize=16) as store:
+        games = {f"table{index}": makeGame(random.Random(index)) for index in range(3)}
+        for gameId, game in games.items():
+            store.start(gameId, game)
+            played[gameId] = []
+        for _ in range(40):
+            for gameId, game in games.items():
+                if game.state == GameState.Finish:
+                    continue
+                playerId, turn = game.actingPlayerId, game.turnNumber
+                assert store.apply(gameId, game, playerId, rng.choice(game.legalActions()))
+                played[gameId].append((playerId, turn))
+        store.finish("table0", games["table0"])
+        store.flush()
+
+        for gameId, moves in played.items():
+            records = store.actions(gameId)
+            assert [(record.playerId, record.turn) for record in records] == moves
+            assert [record.sequence for record in records] == list(range(len(moves)))
+        assert store.actions("table1", turn=1) == [record for record in store.actions("table1") if record.turn == 1]
+        assert {record.playerId for record in store.playerActions(2)} == {2}
+
+        finished = store.games(finished=True)
+        assert [record.gameId for record in finished] == ["table0"]
+        assert finished[0].scores is not None and set(finished[0].scores) == {1, 2}
+        assert len(store.games(finished=False)) == 2
+
+
+def test_uses_wal_and_indexes(tmp_path: Path) -> None:
+    GameStore(tmp_path / "games.db").close()
+    connection = sqlite3.connect(tmp_path / "games.db")
+    assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    indexes = dict(connection.execute("SELECT name, sql FROM sqlite_master WHERE type = 'index'").fetchall())
+    assert "(game_id, turn)" in indexes["actions_game_turn"]
+    assert "(player_id)" in indexes["actions_player"]
+    connection.close()
+
+
+def test_game_ids_cannot_be_reused(tmp_path: Path) -> None:
+    game = makeGame(random.Random(0))
+    with GameStore(tmp_path / "games.db") as store:
+        store.start("table", game)
+        with pytest.raises(ValueError):
+            store.start("table", game)
+        store.finish("table", game)
+        store.flush()
+    with GameStore(tmp_path / "games.db") as store:
+        with pytest.raises(ValueError):
+            store.start("table", game)
+
+
+def test_rejected_row_does_not_lose_its_batch(tmp_path: Path) -> None:
+    rng = random.Random(1)
+    games = {gameId: makeGame(random.Random(index)) for index, gameId in enumerate(("first", "second"))}
+    with GameStore(tmp_path / "games.db") as store:
+        for gameId, game in games.items():
+            store.start(gameId, game)
+        for _ in range(3):
+            assert store.apply("first", games["first"], games["first"].actingPlayerId,
+                               rng.choice(games["first"].legalActions()))
+        store.flush()
+
+        store._sequences["first"] = 1           # a second action numbered 1
+        for gameId in ("second", "first", "second"):
+            game = games[gameId]
+            assert store.apply(gameId, game, game.actingPlayerId, rng.choice(game.legalActions()))
+        with pytest.raises(RuntimeError):
+            store.flush()
+
+        assert len(store.actions("first")) == 3 and len(store.actions("second")) == 2
+        game = games["second"]
+        assert store.apply("second", game, game.actingPlayerId, rng.choice(game.legalActions()))
+        store.flush()           # the store keeps writing
+        assert [record.sequence for record in store.actions("second")] == [0, 1, 2]
@@ -0,0 +1,77 @@
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from terra_futura.game import Game
+from terra_futura.game_observer import GameObserver
+from terra_futura.interfaces import TerraFuturaObserverInterface
+from terra_futura.simple_types import GameState
+from test.helpers import makeGame
+
+
+class _Recorder(TerraFuturaObserverInterface):
+    def __init__(self, game: Game) -> None:
+        self.game = game
+        self.states: list[str] = []
+        self.deliveredUnderLock = False
+        self.concurrent = False
+        self._delivering = threading.Lock()
+
+    def notify(self, game_state: str) -> None:
+        if not self._delivering.acquire(blocking=False):
+            self.concurrent = True
+            self._delivering.acquire()
+        # RLock._is_owned(): whether the delivering thread holds the game's lock
+        self.deliveredUnderLock |= bool(getattr(self.game._lock, "_is_owned")())
+        time.sleep(0)       # give other threads the chance to deliver concurrently
+        json.loads(game_state)
+        self.states.append(game_state)
+        self._delivering.release()
+
+
+def _race(game: Game, seed: int) -> int:
+    """Plays random legal actions for whoever acts until the game ends."""
+    rng = random.Random(seed)
+    applied = 0
+    while game.state != GameState.Finish:
+        actions = game.legalActions()
+        if not actions:
+            break
+        if rng.choice(actions).apply(game, game.actingPlayerId):
+            applied += 1
+    return applied
+
+
+def test_threads_racing_on_one_table_finish_the_game() -> None:
+    game = makeGame(random.Random(1), threadSafe=True)
+    recorder = _Recorder(game)
+    game.reset(GameObserver({1: recorder}))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        applied = sum(executor.map(lambda seed: _race(game, seed), range(8)))
+
+    assert game.state == GameState.Finish
+    assert applied > 0
+    # delivered outside the lock, in the order the game went through them
+    turns = [json.loads(state)["turn"] for state in recorder.states]
+    assert turns == sorted(turns)
+    assert json.loads(recorder.states[-1])["state"] == str(GameState.Finish.value)
+    assert not recorder.deliveredUnderLock and not recorder.concurrent
+
+
+def test_tables_on_separate_threads_are_independent() -> None:
+    games = [makeGame(random.Random(seed), threadSafe=True) for seed in range(8)]
+    threads = [threading.Thread(target=_race, args=(game, seed)) for seed, game in enumerate(games)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(game.state == GameState.Finish for game in games)
+
+
+def test_clone_of_thread_safe_game_has_no_lock() -> None:
+    game = makeGame(random.Random(1), threadSafe=True)
+    assert game.clone()._lock is None
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from terra_futura.card import Card
+from terra_futura.grid import Grid
+from terra_futura.simple_types import GridPosition, Resource
+
+
+def _grid_with(*positions: tuple[int, int]) -> Grid:
+    grid = Grid()
+    for x, y in positions:
+        grid.putCard(GridPosition(x, y), Card(pollutionSpacesL=2))
+    return grid
+
+
+def test_first_card_goes_to_center() -> None:
+    grid = Grid()
+    assert grid.canPutCard(GridPosition(1, 0)) is False
+    assert grid.canPutCard(GridPosition(0, 0)) is True
+
+
+def test_card_must_touch_existing_card() -> None:
+    grid = _grid_with((0, 0))
+    assert grid.canPutCard(GridPosition(1, 0)) is True
+    assert grid.canPutCard(GridPosition(1, 1)) is False
+    assert grid.canPutCard(GridPosition(0, 0)) is False
+
+
+def test_tableau_fits_into_three_by_three() -> None:
+    grid = _grid_with((0, 0), (1, 0), (2, 0))
+    assert grid.canPutCard(GridPosition(-1, 0)) is False
+    assert grid.canPutCard(GridPosition(2, 1)) is True
+
+    with pytest.raises(ValueError):
+        grid.putCard(GridPosition(-1, 0), Card(pollutionSpacesL=2))
+
+
+def test_placing_card_activates_its_row_and_column() -> None:
+    grid = _grid_with((0, 0), (1, 0), (1, 1))
+
+    assert grid.canBeActivated(GridPosition(1, 1)) is True
+    assert grid.canBeActivated(GridPosition(1, 0)) is True
+    assert grid.canBeActivated(GridPosition(0, 0)) is False
+
+    grid.setActivated(GridPosition(1, 0))
+    assert grid.canBeActivated(GridPosition(1, 0)) is False
+
+    grid.endTurn()
+    assert grid.canBeActivated(GridPosition(1, 1)) is False
+
+
+def test_activation_pattern_allows_repeated_activation() -> None:
+    grid = _grid_with((0, 0), (1, 0))
+    grid.setActivationPattern([GridPosition(0, 0), GridPosition(0, 0)])
+
+    grid.setActivated(GridPosition(0, 0))
+    assert grid.canBeActivated(GridPosition(0, 0)) is True
+    grid.setActivated(GridPosition(0, 0))
+    assert grid.canBeActivated(GridPosition(0, 0)) is False
+    assert grid.canBeActivated(GridPosition(1, 0)) is False
+
+
+def test_clone_is_independent() -> None:
+    grid = _grid_with((0, 0))
+    card = grid.getCard(GridPosition(0, 0))
+    assert card is not None
+    card.putResources([Resource.RED])
+
+    clone = grid.clone()
+    cloned_card = clone.getCard(GridPosition(0, 0))
+    assert cloned_card is not None
+    cloned_card.putResources([Resource.GREEN])
+    clone.setActivated(GridPosition(0, 0))
+
+    assert card.resources == [Resource.RED]
+    assert grid.canBeActivated(GridPosition(0, 0)) is True
+    assert json.loads(grid.state())["cards"][0]["card"] == card.state()
@@ -0,0 +1,68 @@
+import random
+
+from terra_futura.actions import ActionKind
+from terra_futura.mcts import MARGIN_WEIGHT, MctsPlayer, finalRewards
+from terra_futura.simple_types import GameState, GridPosition, Points, Resource
+from test.helpers import makeGame
+
+
+def test_clone_is_independent_of_the_game() -> None:
+    game = makeGame(random.Random(1))
+    clone = game.clone(random.Random(2))
+    action = clone.legalActions()[0]
+
+    assert action.apply(clone, clone.actingPlayerId)
+    assert clone.state == GameState.ActivateCard
+    assert game.state == GameState.TakeCardNoCardDiscarded
+    assert game.players[0].grid.getCard(GridPosition(0, 0)) is None
+
+
+def test_final_rewards_rank_players() -> None:
+    game = makeGame(random.Random(1), playerCount=3)
+    for player, points in zip(game.players, (5, 15, 5)):
+        player.scoring_methods[1].calculatedTotal = Points(points)
+
+    rewards = finalRewards(game)
+
+    assert rewards[2] == 1.0 + MARGIN_WEIGHT * 10 / 20
+    assert rewards[1] == rewards[3] == 0.25 - MARGIN_WEIGHT * 10 / 20
+
+
+def test_search_returns_legal_action() -> None:
+    game = makeGame(random.Random(5))
+    player = MctsPlayer(thinkTime=60, seed=1, maxIterations=30)
+
+    result = player.search(game)
+
+    assert result.iterations == 30
+    assert game.isLegal(result.action)
+    assert sum(visits for visits, _ in result.statistics.values()) == 30
+
+
+def test_mcts_prefers_scoring_the_better_method() -> None:
+    game = makeGame(random.Random(6))
+    rng = random.Random(6)
+    while game.state != GameState.SelectScoringMethod:
+        rng.choice(game.legalActions()).apply(game, game.actingPlayerId)
+    # first scoring method rewards goods and food, the second raw materials
+    grid = game.players[0].grid
+    card = grid.getCard(GridPosition(0, 0))
+    assert card is not None
+    card.resources.extend([Resource.RED, Resource.GREEN, Resource.YELLOW] * 5)
+
+    result = MctsPlayer(thinkTime=60, seed=2, maxIterations=60).search(game)
+
+    assert result.action.kind == ActionKind.SelectScoring
+    assert result.action.cardIndex == 1
+
+
+def test_root_parallel_workers_merge_statistics() -> None:
+    game = makeGame(random.Random(7))
+    player = MctsPlayer(thinkTime=60, workers=2, seed=3, maxIterations=10)
+    try:
+        result = player.search(game)
+        assert result.iterations == 20
+        assert player.play(game, game.currentPlayerId)
+    finally:
+        player.close()
+    assert game.state in (GameState.ActivateCard, GameState.TakeCardCardDiscarded)
@@ -0,0 +1,82 @@
+import numpy as np
+
+from terra_futura.card import Card
+from terra_futura.factories import CardCatalog
+from terra_futura.grid import Grid
+from terra_futura.observation import (ACTIVATED, ACTIVE, CAN_ACTIVATE, CHANNELS, OCCUPIED, POLLUTION,
+                                      POLLUTION_SPACES, GridEncoder)
+from terra_futura.simple_types import Deck, GridPosition, Resource
+from terra_futura.transformation_fixed import TransformationFixed
+
+_CATALOG = CardCatalog.fromData({"LEVEL_I": [
+    {"count": 1, "pollutionSpaces": 1, "upper": {"type": "fixed", "from": [], "to": ["GOODS"]}, "lower": None},
+    {"count": 2, "pollutionSpaces": 2, "upper": {"type": "fixed", "from": [], "to": ["RED"]}, "lower": None},
+]})
+
+
+def _card() -> Card:
+    return Card.fromTemplate(_CATALOG.templates(Deck.LEVEL_I)[1])
+
+
+def _resource(resource: Resource) -> int:
+    return list(Resource).index(resource)
+
+
+def test_encode_writes_into_supplied_buffers() -> None:
+    grid = Grid()
+    center, right = _card(), _card()
+    grid.putCard(GridPosition(0, 0), center)
+    grid.putCard(GridPosition(1, 0), right)
+    center.putResources([Resource.RED, Resource.RED, Resource.GOODS])
+    right.placePollution(1)
+    grid.setActivated(GridPosition(1, 0))
+
+    encoder = GridEncoder()
+    features, signatures = GridEncoder.allocate(2)
+    encoder.encode(grid, features[1], signatures[1])
+
+    assert features.shape == (2, CHANNELS, 5, 5)
+    assert not features[0].any()
+    cell = features[1, :, 2, 2]
+    assert cell[_resource(Resource.RED)] == 2
+    assert cell[_resource(Resource.GOODS)] == 1
+    assert cell[OCCUPIED] == 1 and cell[ACTIVE] == 1 and cell[CAN_ACTIVATE] == 1
+    assert cell[POLLUTION_SPACES] == 2 and cell[POLLUTION] == 0
+    other = features[1, :, 3, 2]
+    assert other[POLLUTION] == 1 and other[ACTIVATED] == 1 and other[CAN_ACTIVATE] == 0
+    assert features[1, OCCUPIED].sum() == 2
+
+    # copies of a card share the id of its template
+    assert signatures[1, 2, 2] == signatures[1, 3, 2] == 2
+    assert np.count_nonzero(signatures) == 2
+
+
+def test_signature_ids_do_not_depend_on_encounter_order() -> None:
+    grid = Grid()
+    grid.putCard(GridPosition(0, 0), _card())
+    grid.putCard(GridPosition(0, 1), Card(pollutionSpacesL=2, upperEffect=TransformationFixed([], [Resource.RED], 0)))
+    features, signatures = GridEncoder.allocate(1)
+
+    GridEncoder().encode(grid, features[0], signatures[0])
+
+    assert signatures[0, 2, 2] == 2
+    # a card that was not dealt from a catalog has no id, but is still occupied
+    assert signatures[0, 2, 3] == 0 and features[0, OCCUPIED, 2, 3] == 1
+
+
+def test_card_is_reencoded_only_after_change() -> None:
+    grid = Grid()
+    card = _card()
+    grid.putCard(GridPosition(0, 0), card)
+    encoder = GridEncoder()
+    features, signatures = GridEncoder.allocate(1)
+
+    encoder.encode(grid, features[0], signatures[0])
+    cached = encoder._cache[card]
+    encoder.encode(grid, features[0], signatures[0])
+    assert encoder._cache[card] is cached
+
+    card.putResources([Resource.GREEN])
+    encoder.encode(grid, features[0], signatures[0])
+    assert encoder._cache[card] is not cached
+    assert features[0, _resource(Resource.GREEN), 2, 2] == 1
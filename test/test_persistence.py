@@ -0,0 +1,94 @@
+import random
+from pathlib import Path
+
+import pytest
+
+from terra_futura.factories import CardCatalog, GamePool
+from terra_futura.game import Game
+from terra_futura.persistence import LOG, GameJournal
+from terra_futura.seeding import GameSeeds
+from terra_futura.simple_types import GameState
+from terra_futura.snapshot import GameCodec
+from test.helpers import makeGame
+
+
+def _play(journal: GameJournal, gameId: str, game: Game, rng: random.Random, steps: int) -> None:
+    for _ in range(steps):
+        actions = game.legalActions()
+        if not actions or game.state == GameState.Finish:
+            return
+        assert journal.apply(gameId, game, game.actingPlayerId, rng.choice(actions))
+
+
+def test_recovers_from_snapshot_and_log_tail(tmp_path: Path) -> None:
+    journal = GameJournal(tmp_path, snapshotEvery=7, batchSize=4, fsyncInterval=3600)
+    games = {f"table{index}": makeGame(random.Random(index)) for index in range(3)}
+    rng = random.Random(0)
+    for gameId, game in games.items():
+        journal.start(gameId, game)
+        _play(journal, gameId, game, rng, 30)
+    journal.flush(sync=False)         # the process dies without closing the journal
+
+    recovered = GameJournal(tmp_path).recoverAll()
+
+    assert sorted(recovered) == sorted(games)
+    for gameId, game in games.items():
+        assert recovered[gameId].canonicalKey() == game.canonicalKey()
+
+
+def test_unflushed_tail_is_lost_and_torn_record_dropped(tmp_path: Path) -> None:
+    journal = GameJournal(tmp_path, snapshotEvery=1000, batchSize=1000)
+    game = makeGame(random.Random(1))
+    journal.start("t", game)
+    before = game.canonicalKey()
+    _play(journal, "t", game, random.Random(2), 5)
+    # nothing flushed yet: recovery gives the initial snapshot
+    assert GameJournal(tmp_path).recover("t").canonicalKey() == before
+
+    journal.flush()
+    with open(tmp_path / "t" / LOG, "ab") as log:
+        log.write(b"\x01")
+    assert GameJournal(tmp_path).recover("t").canonicalKey() == game.canonicalKey()
+
+
+def test_recovered_game_continues_logging(tmp_path: Path) -> None:
+    journal = GameJournal(tmp_path, snapshotEvery=5)
+    game = makeGame(random.Random(3))
+    journal.start("t", game)
+    _play(journal, "t", game, random.Random(4), 12)
+    journal.close()
+
+    restarted = GameJournal(tmp_path, snapshotEvery=5)
+    recovered = restarted.recover("t")
+    restarted.start("t", recovered)
+    _play(restarted, "t", recovered, random.Random(5), 12)
+    restarted.close()
+
+    assert GameJournal(tmp_path).recover("t").canonicalKey() == recovered.canonicalKey()
+
+
+def test_binary_snapshots_of_catalog_games(tmp_path: Path) -> None:
+    catalog = CardCatalog.load()
+    codec = GameCodec(catalog)
+    game = GamePool(catalog, capacity=0).acquire(3, random.Random(6))
+    journal = GameJournal(tmp_path, snapshotEvery=4, codec=codec)
+    journal.start("t", game)
+    _play(journal, "t", game, random.Random(7), 10)
+    journal.close()
+
+    assert GameJournal(tmp_path, codec=codec).recover("t").canonicalKey() == game.canonicalKey()
+    with pytest.raises(ValueError):
+        GameJournal(tmp_path).recover("t")
+
+
+def test_records_the_seeds_of_the_game(tmp_path: Path) -> None:
+    seeds = GameSeeds.derive(11, 42, 2)
+    journal = GameJournal(tmp_path)
+    journal.start("seeded", GamePool(CardCatalog.load(), capacity=0).acquire(2, seeds.pileRngs()), seeds)
+    journal.start("plain", makeGame(random.Random(0)))
+    journal.close()
+
+    assert GameJournal(tmp_path).seeds("seeded") == seeds
+    assert GameJournal(tmp_path).seeds("plain") is None
+    dealt = GamePool(CardCatalog.load(), capacity=0).acquire(2, seeds.pileRngs())
+    assert GameJournal(tmp_path).recover("seeded").canonicalKey() == dealt.canonicalKey()
@@ -0,0 +1,55 @@
+import json
+import random
+import unittest
+
+from terra_futura.card import Card
+from terra_futura.interfaces import InterfaceCard
+from terra_futura.pile import Pile
+
+
+class TestPile(unittest.TestCase):
+    def setUp(self) -> None:
+        self.cards: list[InterfaceCard] = [Card(pollutionSpacesL=i) for i in range(8)]
+        self.pile = Pile(self.cards[:4], self.cards[4:])
+
+    def test_get_card_uses_indices_one_to_four(self) -> None:
+        self.assertIs(self.pile.getCard(1), self.cards[0])
+        self.assertIs(self.pile.getCard(4), self.cards[3])
+        self.assertIsNone(self.pile.getCard(0))
+        self.assertIsNone(self.pile.getCard(5))
+
+    def test_taken_card_is_replaced_by_newest_hidden_card(self) -> None:
+        self.pile.takeCard(2)
+        self.assertEqual(self.pile.visibleCards, [self.cards[7], self.cards[0], self.cards[2], self.cards[3]])
+        self.assertEqual(self.pile.hiddenCount, 3)
+
+    def test_remove_last_card_discards_oldest(self) -> None:
+        self.pile.removeLastCard()
+        self.assertEqual(self.pile.visibleCards, [self.cards[7], self.cards[0], self.cards[1], self.cards[2]])
+
+    def test_pile_runs_out_of_cards(self) -> None:
+        pile = Pile(self.cards[:1], [])
+        pile.takeCard(1)
+        self.assertIsNone(pile.getCard(1))
+        with self.assertRaises(ValueError):
+            pile.takeCard(1)
+        with self.assertRaises(ValueError):
+            pile.removeLastCard()
+
+    def test_seeded_shuffle_is_reproducible(self) -> None:
+        drawn: list[list[InterfaceCard]] = []
+        for _ in range(2):
+            pile = Pile(self.cards[:4], self.cards[4:], random.Random(7))
+            cards: list[InterfaceCard] = []
+            for _ in range(4):
+                pile.takeCard(4)
+                card = pile.getCard(1)
+                assert card is not None
+                cards.append(card)
+            drawn.append(cards)
+        self.assertEqual(drawn[0], drawn[1])
+        self.assertCountEqual(drawn[0], self.cards[4:])
+        self.assertEqual(json.loads(pile.state())["hidden"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
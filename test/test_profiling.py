@@ -0,0 +1,59 @@
+import time
+
+import pytest
+
+from terra_futura.profiling import Profile, StackSampler
+from terra_futura.tournament import Tournament, registerPolicy
+from test.helpers import firstPolicy
+
+registerPolicy("first", firstPolicy)
+
+
+def _busy(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(100))
+
+
+def _profiled() -> Profile:
+    with StackSampler(0.001) as sampler:
+        _busy(0.2)
+    return sampler.profile
+
+
+def test_samples_collapsed_stacks_of_the_profiled_code() -> None:
+    profile = _profiled()
+
+    assert profile.samples > 10 and profile.seconds >= 0.2
+    assert sum(profile.stacks.values()) == profile.samples
+    assert all(stack.startswith("test.test_profiling:_profiled;test.test_profiling:_busy")
+               for stack in profile.stacks)
+    for line in profile.collapsed().splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert profile.stacks[stack] == int(count)
+
+
+def test_table_charges_foreign_code_to_the_calling_function() -> None:
+    profile = Profile(10, 1.0, {"a.x:run;a.y:step;json:dumps": 6, "a.x:run;a.z:other": 3, "a.x:run": 1})
+
+    rows = profile.table(prefix="a.", top=2)
+
+    assert [row.function for row in rows] == ["a.y:step", "a.z:other"]
+    assert rows[0].selfSeconds == pytest.approx(0.6) and rows[0].selfShare == pytest.approx(0.6)
+    assert profile.table(prefix="a.")[-1].totalSeconds == pytest.approx(1.0)
+
+
+def test_merges_profiles_of_pool_workers() -> None:
+    first, second = _profiled(), _profiled()
+    merged = Profile()
+    merged.merge(first)
+    merged.merge(second)
+    assert merged.samples == first.samples + second.samples
+    assert sum(merged.stacks.values()) == merged.samples
+
+    profile = Profile()
+    Tournament(["random", "first"], playerCounts=(2,), gamesPerSeating=2).run(workers=2, profile=profile)
+    assert profile.samples > 0
+    assert all(stack.startswith("terra_futura.tournament:_playTask;terra_futura.tournament:playGame")
+               for stack in profile.stacks)
+    assert any(row.function.startswith("terra_futura.") for row in profile.table())
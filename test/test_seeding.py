@@ -0,0 +1,32 @@
+import random
+
+from terra_futura.factories import CardCatalog, GamePool
+from terra_futura.seeding import GameSeeds
+from terra_futura.simple_types import Deck
+
+
+def test_streams_depend_only_on_batch_seed_and_index() -> None:
+    seeds = GameSeeds.derive(7, 123_456, 3)
+
+    assert seeds == GameSeeds.derive(7, 123_456, 3)
+    assert GameSeeds.fromJson(seeds.toJson()) == seeds
+    # the decks are dealt the same whatever the player count
+    assert GameSeeds.derive(7, 123_456, 4).piles == seeds.piles
+    values = list(seeds.piles.values()) + list(seeds.bots)
+    assert len(set(values)) == len(values) == 2 + 3
+    assert GameSeeds.derive(7, 123_457, 3).piles != seeds.piles
+    assert GameSeeds.derive(8, 123_456, 3).piles != seeds.piles
+
+
+def test_piles_are_shuffled_by_their_own_stream() -> None:
+    pool = GamePool(CardCatalog.load(), capacity=0)
+    seeds = GameSeeds.derive(1, 0, 2)
+    game = pool.acquire(2, seeds.pileRngs())
+    again = pool.acquire(2, GameSeeds.fromJson(seeds.toJson()).pileRngs())
+    assert game.canonicalKey() == again.canonicalKey()
+
+    streams = seeds.pileRngs()
+    streams[Deck.LEVEL_II] = random.Random(99)
+    changed = pool.acquire(2, streams)
+    assert changed.pile(Deck.LEVEL_I).state() == game.pile(Deck.LEVEL_I).state()
+    assert changed.pile(Deck.LEVEL_II).state() != game.pile(Deck.LEVEL_II).state()
@@ -0,0 +1,75 @@
+import unittest
+from typing import List, Optional
+
+from terra_futura.interfaces import InterfaceCard, Effect
+from terra_futura.select_reward import SelectReward
+from terra_futura.simple_types import Resource
+
+
+class CardFake(InterfaceCard):
+    def __init__(self, active: bool = True) -> None:
+        self.resources: List[Resource] = []
+        self.pollutionSpacesL: int = 0
+        self.upperEffect: Optional[Effect] = None
+        self.lowerEffect: Optional[Effect] = None
+        self._active = active
+
+    def isActive(self) -> bool:
+        return self._active
+
+    def canPutResources(self, resources: List[Resource]) -> bool:
+        return self._active
+
+    def putResources(self, resources: List[Resource]) -> None:
+        self.resources.extend(resources)
+
+    def canGetResources(self, resources: List[Resource]) -> bool:
+        return False
+
+    def getResources(self, resources: List[Resource]) -> None:
+        pass
+
+    def canPlacePollution(self, amount: int = 1) -> bool:
+        return False
+
+    def placePollution(self, amount: int = 1) -> None:
+        pass
+
+    def check(self, input: List[Resource], output: List[Resource], pollution: int) -> bool:
+        return False
+
+    def checkLower(self, input: List[Resource], output: List[Resource], pollution: int) -> bool:
+        return False
+
+    def hasAssistance(self) -> bool:
+        return False
+
+    def state(self) -> str:
+        return ""
+
+
+class TestSelectReward(unittest.TestCase):
+    def setUp(self) -> None:
+        self.card = CardFake()
+        self.select_reward = SelectReward()
+        self.select_reward.setReward(2, self.card, [Resource.RED, Resource.GOODS])
+
+    def test_player_can_select_offered_resource(self) -> None:
+        self.assertEqual(self.select_reward.player, 2)
+        self.assertTrue(self.select_reward.canSelectReward(Resource.GOODS))
+        self.assertFalse(self.select_reward.canSelectReward(Resource.FOOD))
+
+        self.select_reward.selectReward(Resource.GOODS)
+
+        self.assertEqual(self.card.resources, [Resource.GOODS])
+        self.assertFalse(self.select_reward.canSelectReward(Resource.RED))
+
+    def test_reward_cannot_go_to_inactive_card(self) -> None:
+        self.select_reward.setReward(2, CardFake(active=False), [Resource.RED])
+        self.assertFalse(self.select_reward.canSelectReward(Resource.RED))
+        with self.assertRaises(ValueError):
+            self.select_reward.selectReward(Resource.RED)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import asyncio
+import json
+import random
+from typing import Any
+
+import pytest
+
+from terra_futura.factories import CardCatalog, GamePool
+from terra_futura.game import Game
+from terra_futura.interfaces import GameObserverInterface
+from terra_futura.server import GameServer
+from test.helpers import makeGame
+
+
+def _factory(players: int, rng: random.Random, observer: GameObserverInterface) -> Game:
+    game = makeGame(rng, players)
+    game.reset(observer)
+    return game
+
+
+class _Client:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader, self.writer = reader, writer
+        self.events: list[dict[str, Any]] = []
+        self._nextId = 0
+
+    async def request(self, **request: Any) -> dict[str, Any]:
+        self._nextId += 1
+        request["id"] = self._nextId
+        self.writer.write(json.dumps(request).encode() + b"\n")
+        await self.writer.drain()
+        while True:
+            message: dict[str, Any] = json.loads(await self.reader.readline())
+            if message.get("event"):
+                self.events.append(message)
+            elif message["id"] == self._nextId:
+                return message
+
+
+async def _play() -> tuple[list[dict[str, Any]], _Client]:
+    server = GameServer(_factory)
+    listening = await server.startTcp()
+    port = listening.sockets[0].getsockname()[1]
+    client = _Client(*await asyncio.open_connection("127.0.0.1", port))
+    try:
+        table = (await client.request(op="create", players=2, seed=1))["table"]
+        await client.request(op="join", table=table, player=1)
+        replies = []
+        for _ in range(6):
+            legal = await client.request(op="legalActions", table=table)
+            replies.append(await client.request(**legal["actions"][0]))
+        replies.append(await client.request(op="turnFinished", table=table, player=2))
+        replies.append(await client.request(op="fly", table=table, player=1))
+        replies.append(await client.request(op="turnFinished", table=99, player=1))
+        return replies, client
+    finally:
+        client.writer.close()
+        await server.close()
+
+
+def test_clients_play_over_tcp() -> None:
+    replies, client = asyncio.run(_play())
+
+    assert all(reply["ok"] and reply["result"] in (True, None) for reply in replies[:6])
+    assert replies[6]["ok"] and replies[6]["result"] is False
+    assert not replies[7]["ok"] and "Unknown op" in replies[7]["error"]
+    assert not replies[8]["ok"]
+    assert client.events and all(event["player"] == 1 for event in client.events)
+    assert client.events[0]["state"]["grid"]["cards"]
+
+
+async def _createAndClose(server: GameServer, tables: int) -> list[Game]:
+    listening = await server.startTcp()
+    port = listening.sockets[0].getsockname()[1]
+    client = _Client(*await asyncio.open_connection("127.0.0.1", port))
+    games = []
+    try:
+        for _ in range(tables):
+            table = (await client.request(op="create", players=2))["table"]
+            games.append(server.tables[table].game)
+            assert (await client.request(op="close", table=table))["ok"]
+        await client.request(op="create", players=3)       # left open until the server closes
+        games.append(next(iter(server.tables.values())).game)
+        return games
+    finally:
+        client.writer.close()
+        await server.close()
+
+
+def test_closed_tables_release_their_games() -> None:
+    pool = GamePool(CardCatalog.load(), capacity=0)
+    released: list[Game] = []
+
+    def release(game: Game) -> None:
+        pool.release(game)
+        released.append(game)
+
+    games = asyncio.run(_createAndClose(GameServer(pool.acquire, release), 20))
+
+    assert released == games and len(games) == 21
+    with pytest.raises(ValueError):      # the pool no longer tracks them
+        pool.release(games[0])
+
+
+async def _malformed() -> tuple[list[dict[str, Any]], bytes]:
+    server = GameServer(_factory)
+    listening = await server.startTcp()
+    port = listening.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(b'[1]\n"x"\n{"id": 1, "op": "create", "players": 2}\n')
+        replies = [json.loads(await reader.readline()) for _ in range(3)]
+        writer.write(b'{"id": 2, "op": "' + b"x" * 100_000 + b'"}\n')
+        replies.append(json.loads(await reader.readline()))
+        return replies, await reader.read()
+    finally:
+        writer.close()
+        await server.close()
+
+
+def test_malformed_requests_get_error_replies() -> None:
+    replies, rest = asyncio.run(_malformed())
+
+    assert [reply["ok"] for reply in replies] == [False, False, True, False]
+    assert "objects" in replies[0]["error"] and "too long" in replies[3]["error"]
+    assert rest == b""      # the connection was closed
+
+
+def test_default_server_reuses_games_of_closed_tables() -> None:
+    async def scenario() -> None:
+        server = GameServer()
+        first = server.createTable(2, seed=3)
+        game = first.game
+        await server.closeTable(first)
+
+        second = server.createTable(2, seed=3)
+        assert second.game is game and second.id != first.id
+        assert second.game.turnNumber == 1 and not second.game.players[0].grid.positions
+        await server.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from terra_futura.factories import CardCatalog, GamePool
+from terra_futura.select_reward import SelectReward
+from terra_futura.simple_types import Deck, GameState, GridPosition, Resource
+from terra_futura.snapshot import GameCodec
+from test.helpers import makeGame
+
+CATALOG = CardCatalog.load()
+
+
+def test_round_trip_during_whole_games() -> None:
+    codec = GameCodec(CATALOG)
+    pool = GamePool(CATALOG, capacity=0)
+    for seed, players in ((0, 2), (1, 3), (2, 4)):
+        rng = random.Random(seed)
+        game = pool.acquire(players, rng)
+        while game.state != GameState.Finish and game.legalActions():
+            data = codec.encode(game)
+            assert len(data) < 1024
+            decoded = codec.decode(data)
+            assert codec.encode(decoded) == data
+            assert decoded.canonicalKey() == game.canonicalKey()
+            assert decoded.legalActions() == game.legalActions()
+            action = rng.choice(game.legalActions())
+            # hidden cards, resource order and grid order are kept: both games go on the same
+            assert action.apply(game, game.actingPlayerId) == action.apply(decoded, decoded.actingPlayerId)
+            assert codec.encode(decoded) == codec.encode(game)
+
+
+def test_pending_reward_keeps_the_rewarded_card() -> None:
+    codec = GameCodec(CATALOG)
+    game = GamePool(CATALOG, capacity=0).acquire(2, random.Random(0))
+    card = CATALOG.deal(Deck.LEVEL_I)[0]
+    game.players[1].grid.putCard(GridPosition(0, 0), card)
+    game._selectReward.setReward(2, card, [Resource.RED, Resource.FOOD])
+
+    decoded = codec.decode(codec.encode(game))
+
+    assert decoded.actingPlayerId == game.actingPlayerId
+    assert isinstance(decoded._selectReward, SelectReward)
+    assert decoded._selectReward.player == 2
+    assert decoded._selectReward.selection == [Resource.RED, Resource.FOOD]
+    decoded._selectReward.selectReward(Resource.FOOD)
+    rewarded = decoded.players[1].grid.getCard(GridPosition(0, 0))
+    assert rewarded is not None and rewarded.resources == [Resource.FOOD]
+
+
+def test_rejects_foreign_cards_and_corrupted_data() -> None:
+    codec = GameCodec(CATALOG)
+    with pytest.raises(ValueError):
+        codec.encode(makeGame())
+    data = codec.encode(GamePool(CATALOG, capacity=0).acquire(2, random.Random(0)))
+    with pytest.raises(ValueError):
+        codec.decode(data[:-3])
+    with pytest.raises(ValueError):
+        codec.decode(b"XXXX" + data[4:])
@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+from terra_futura.actions import ActionKind
+from terra_futura.simple_types import GameConfig, GameState
+from terra_futura.state_machine import GameStateMachine, MachineState, TurnPhase
+from test.helpers import makeGame
+
+
+def test_phases_follow_configuration() -> None:
+    machine = GameStateMachine(3, GameConfig(rounds=2))
+
+    assert machine.phase(1, 2) == TurnPhase.Regular
+    assert machine.phase(2, 1) == TurnPhase.Regular
+    assert machine.phase(2, 2) == TurnPhase.RoundsOver
+    assert machine.phase(3, 0) == TurnPhase.Final
+    assert machine.phase(3, 2) == TurnPhase.FinalOver
+
+
+def test_player_count_is_validated() -> None:
+    with pytest.raises(ValueError):
+        GameStateMachine(1)
+    with pytest.raises(ValueError):
+        GameStateMachine(5)
+    assert GameStateMachine(5, GameConfig(maxPlayers=5)).players == 5
+
+
+def test_allowed_kinds_per_state() -> None:
+    machine = GameStateMachine(2)
+
+    assert machine.allowedKinds(GameState.TakeCardNoCardDiscarded) == (ActionKind.TakeCard, ActionKind.DiscardLastCard)
+    assert machine.allowedKinds(GameState.TakeCardCardDiscarded) == (ActionKind.TakeCard,)
+    assert machine.allowedKinds(GameState.Finish) == ()
+    assert machine.allows(GameState.ActivateCard, ActionKind.TurnFinished)
+    assert not machine.allows(GameState.ActivateCard, ActionKind.TakeCard)
+
+
+def test_turn_finished_moves_to_next_player_and_round() -> None:
+    machine = GameStateMachine(2, GameConfig(rounds=1))
+    assert machine.step(MachineState(GameState.ActivateCard, 1, 0), ActionKind.TurnFinished) == \
+        MachineState(GameState.TakeCardNoCardDiscarded, 1, 1)
+
+    current = MachineState(GameState.ActivateCard, 1, 1)
+    assert machine.step(current, ActionKind.TurnFinished) == MachineState(GameState.SelectActivationPattern, 2, 0)
+    assert machine.step(current, ActionKind.DiscardLastCard) is None
+
+
+def test_replay_validation() -> None:
+    machine = GameStateMachine(2, GameConfig(rounds=1))
+    regular = [(0, ActionKind.TakeCard), (0, ActionKind.ActivateCard), (0, ActionKind.TurnFinished),
+               (1, ActionKind.DiscardLastCard), (1, ActionKind.TakeCard), (1, ActionKind.TurnFinished)]
+    final = [(seat, kind) for seat in (0, 1)
+             for kind in (ActionKind.SelectActivationPattern, ActionKind.ActivateCard, ActionKind.TurnFinished)]
+    scoring = [(0, ActionKind.SelectScoring), (1, ActionKind.SelectScoring)]
+
+    assert machine.replay(regular + final + scoring).state == GameState.Finish
+
+    with pytest.raises(ValueError, match="out of turn"):
+        machine.replay([(1, ActionKind.TakeCard)])
+    with pytest.raises(ValueError, match="not allowed"):
+        machine.replay(regular[:1] + [(0, ActionKind.DiscardLastCard)])
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_game_follows_the_table(seed: int) -> None:
+    # fuzzing: random legal play must match the table step by step
+    rng = random.Random(seed)
+    players = 2 + seed % 3
+    game = makeGame(random.Random(seed), playerCount=players)
+    machine = GameStateMachine(players)
+    current = machine.start()
+    while game.state != GameState.Finish:
+        action = rng.choice(game.legalActions())
+        assert action.apply(game, game.actingPlayerId)
+        following = machine.step(current, action.kind)
+        assert following is not None
+        current = following
+        assert (game.state, game.turnNumber, game.players[current.onTurn].id) == \
+            (current.state, current.turnNumber, game.currentPlayerId)
+    assert game.turnNumber == machine.rounds + 3
@@ -0,0 +1,85 @@
+import json
+from pathlib import Path
+
+from terra_futura.tournament import GameResult, GameTask, Tournament, fitRatings, playGame, registerPolicy
+from test.helpers import firstPolicy
+
+registerPolicy("first", firstPolicy)
+
+
+def test_schedule_covers_all_seatings() -> None:
+    tournament = Tournament(["random", "first"], playerCounts=(2, 3), gamesPerSeating=2)
+    tasks = tournament.schedule()
+
+    # 3 players need 3 distinct entrants
+    assert [task.seats for task in tasks] == [("random", "first")] * 2 + [("first", "random")] * 2
+    assert [task.index for task in tasks] == [0, 1, 2, 3]
+
+
+def test_games_are_reproducible_and_independent_of_order() -> None:
+    tournament = Tournament(["random", "first"], playerCounts=(2,), gamesPerSeating=2, seed=5)
+    tasks = tournament.schedule()
+
+    forward = [playGame(task) for task in tasks]
+    backward = [playGame(task) for task in reversed(tasks)][::-1]
+
+    assert forward == backward
+    assert forward[0].scores != forward[1].scores       # the two games of a seating differ
+
+
+def test_resumes_from_checkpoint(tmp_path: Path) -> None:
+    checkpoint = tmp_path / "tournament.jsonl"
+    complete = Tournament(["random", "first"], playerCounts=(2,), gamesPerSeating=3, seed=1).run()
+
+    played: list[GameResult] = []
+    Tournament(["random", "first"], playerCounts=(2,), gamesPerSeating=3, seed=1,
+               checkpoint=checkpoint).run(progress=played.append)
+    lines = checkpoint.read_text().split("\n")
+    # interrupted after two games, in the middle of writing the third one
+    checkpoint.write_text("\n".join(lines[:3]) + "\n" + lines[3][:10])
+
+    resumed: list[GameResult] = []
+    tournament = Tournament(["random", "first"], playerCounts=(2,), gamesPerSeating=3, seed=1,
+                            checkpoint=checkpoint)
+    results = tournament.run(progress=resumed.append)
+
+    assert results == complete == played
+    assert [result.index for result in resumed] == [2, 3, 4, 5]
+    assert len(checkpoint.read_text().strip().split("\n")) == 1 + 6
+
+
+def test_ratings_order_and_intervals() -> None:
+    results = [GameResult(index, ("strong", "weak") if index % 2 else ("weak", "strong"),
+                          (30, 10) if index % 2 else (10, 30), True, 50) for index in range(16)]
+    results.append(GameResult(16, ("weak", "strong"), (20, 20), True, 50))
+
+    elo = fitRatings(results, ["strong", "weak"])
+    assert elo["strong"] > 1500 > elo["weak"]
+    assert abs(elo["strong"] + elo["weak"] - 3000) < 1e-6
+
+    tournament = Tournament(["random", "first"], playerCounts=(2,), gamesPerSeating=4)
+    tournament.run()
+    table = tournament.ratings(bootstrap=50)
+    assert {rating.name for rating in table} == {"random", "first"}
+    assert all(rating.low <= rating.elo <= rating.high for rating in table)
+    assert table[0].elo >= table[1].elo
+
+
+def test_process_pool_gives_the_same_results() -> None:
+    def tournament() -> Tournament:
+        return Tournament(["random", "first"], playerCounts=(2,), gamesPerSeating=2, seed=3)
+
+    assert tournament().run(workers=2) == tournament().run(workers=1)
+
+
+def test_single_game_replays_from_its_checkpoint_line(tmp_path: Path) -> None:
+    checkpoint = tmp_path / "tournament.jsonl"
+    results = Tournament(["random", "first"], playerCounts=(2,), gamesPerSeating=3, seed=9,
+                         checkpoint=checkpoint).run()
+    line = json.loads(checkpoint.read_text().split("\n")[5])
+    seeds = line["seeds"]
+
+    replayed = playGame(GameTask(seeds["index"], tuple(line["seats"]), seeds["seed"], 2000))
+
+    assert replayed == results[4] and replayed.seeds is not None
+    assert replayed.seeds.toJson() == seeds